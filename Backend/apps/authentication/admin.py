@@ -1,9 +1,24 @@
 from django.contrib import admin
-from .models import User, AuditLog
+
+from . import settings_store
+from .models import User, AuditLog, AuditLogDailyRollup, DeletionTombstone, SystemSetting, SlowQuery
+from .signals import collect_tombstones
+
+
+class TombstoneModelAdmin(admin.ModelAdmin):
+    """For backed-up models: admin deletes leave tombstones like the API ones."""
+
+    def delete_model(self, request, obj):
+        with collect_tombstones():
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with collect_tombstones():
+            super().delete_queryset(request, queryset)
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(TombstoneModelAdmin):
     list_display = ('username', 'email', 'role', 'is_active', 'is_flagged', 'date_joined')
     list_filter = ('role', 'is_active', 'is_flagged')
     search_fields = ('username', 'email', 'first_name', 'last_name')
@@ -12,8 +27,46 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
-    list_display = ('action', 'username', 'ip_address', 'timestamp')
-    list_filter = ('action',)
+    list_display = ('action', 'username', 'object_type', 'object_id', 'ip_address', 'timestamp')
+    list_filter = ('action', 'object_type')
     search_fields = ('username', 'details')
     ordering = ('-timestamp',)
-    readonly_fields = ('action', 'user', 'username', 'details', 'ip_address', 'timestamp')
+    readonly_fields = ('action', 'user', 'username', 'details', 'ip_address', 'timestamp',
+                       'object_type', 'object_id', 'changes')
+
+
+@admin.register(AuditLogDailyRollup)
+class AuditLogDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'action', 'username', 'count')
+    list_filter = ('action',)
+    search_fields = ('username',)
+    ordering = ('-date',)
+
+
+
+@admin.register(DeletionTombstone)
+class DeletionTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('table', 'object_id', 'key', 'deleted_at')
+    list_filter = ('table',)
+    search_fields = ('key',)
+    ordering = ('-deleted_at',)
+
+
+@admin.register(SystemSetting)
+class SystemSettingAdmin(admin.ModelAdmin):
+    list_display = ('key', 'revision', 'updated_by', 'updated_at')
+    readonly_fields = ('revision', 'updated_by', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        # through the store para ma-bump yung revision at makita ng ibang workers
+        settings_store.set(obj.key, obj.value, user=request.user)
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('captured_at', 'duration_ms', 'route', 'statement')
+    list_filter = ('route',)
+    search_fields = ('statement', 'path')
+    ordering = ('-captured_at',)
+    readonly_fields = ('fingerprint', 'statement', 'sql', 'params', 'duration_ms', 'route', 'path',
+                       'stack', 'plan', 'captured_at')
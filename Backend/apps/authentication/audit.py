@@ -0,0 +1,138 @@
+"""
+Buffered audit log writer.
+
+By default every ``log_action`` is a synchronous INSERT, committed with the
+request. With ``AUDIT_LOG_BUFFERED = True`` entries go into an in-process
+queue instead, and a daemon thread writes them with ``bulk_create`` every
+``AUDIT_LOG_FLUSH_EVERY`` entries or every ``AUDIT_LOG_FLUSH_INTERVAL_MS``
+milliseconds, whichever comes first. That trades durability for speed:
+entries still queued when a worker is killed (SIGKILL, OOM, gunicorn
+timeout) are lost, kaya opt-in lang.
+
+- Entries are queued on transaction commit, so a rolled-back request still
+  leaves no audit row (same as before).
+- Whatever is still queued is flushed at interpreter exit (atexit).
+- Per process lang 'to: each gunicorn worker has its own queue and thread.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from config import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogBuffer:
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._wakeup = threading.Event()
+
+    @property
+    def flush_every(self):
+        return max(getattr(settings, 'AUDIT_LOG_FLUSH_EVERY', 50), 1)
+
+    @property
+    def flush_interval(self):
+        return max(getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL_MS', 500), 10) / 1000
+
+    def enqueue(self, entry):
+        """Queue an unsaved AuditLog; starts the writer thread on first use."""
+        self._ensure_thread()
+        self._queue.put(entry)
+        if self._queue.qsize() >= self.flush_every:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything queued so far, in the calling thread. Returns rows written."""
+        from .models import AuditLog
+
+        with self._flush_lock:
+            entries = []
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not entries:
+                return 0
+            written = len(entries)
+            try:
+                AuditLog.objects.bulk_create(entries, batch_size=500)
+            except Exception:
+                # Isang sirang row (e.g. deleted user FK) shouldn't drop the whole batch
+                logger.exception('Audit log bulk insert failed; retrying %d entries one by one', len(entries))
+                for entry in entries:
+                    try:
+                        entry.save(force_insert=True)
+                    except Exception:
+                        written -= 1
+                        logger.exception('Dropping audit log entry: %s', entry)
+            metrics.inc('plmun_audit_writes_total', written)
+            return written
+
+    def _ensure_thread(self):
+        # gunicorn forks after import, kaya per-pid yung thread
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                self._queue = queue.Queue()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Audit log writer flush failed')
+
+
+_buffer = AuditLogBuffer()
+
+
+def write_entry(entry):
+    """Save or queue an unsaved AuditLog depending on AUDIT_LOG_BUFFERED."""
+    if not getattr(settings, 'AUDIT_LOG_BUFFERED', False):
+        entry.save(force_insert=True)
+        metrics.inc('plmun_audit_writes_total')
+        return
+    transaction.on_commit(lambda: _buffer.enqueue(entry))
+
+
+def flush():
+    """Force-write pending entries (e.g. before reading or clearing the log)."""
+    return _buffer.flush()
+
+
+def queue_depth():
+    """Entries queued in this worker and not yet written."""
+    return _buffer._queue.qsize() if _buffer._pid == os.getpid() else 0
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer._pid == os.getpid():
+        try:
+            _buffer.flush()
+        except Exception:
+            logger.exception('Audit log flush at shutdown failed')
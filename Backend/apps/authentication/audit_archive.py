@@ -0,0 +1,140 @@
+"""
+Audit log rollups and monthly archiving.
+
+Rollups: ``rollup_days(start, end)`` re-aggregates the raw ``audit_logs`` rows
+of those local days into ``AuditLogDailyRollup`` (one GROUP BY over a
+timestamp range, then an upsert) — idempotent, kaya safe i-rerun.
+
+Archiving: instead of one ever-growing table, old months are moved into
+per-month tables ``audit_logs_YYYYMM`` (``CREATE TABLE ... AS SELECT`` + a
+range DELETE on the timestamp index). Retention is then O(1): dropping a
+month is a ``DROP TABLE``, no row-by-row delete. Same SQL on PostgreSQL and
+SQLite. Native PostgreSQL declarative partitioning would need the primary key
+to include ``timestamp``, which the Django model can't express cleanly, kaya
+archive tables ang ginamit.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AuditLog, AuditLogDailyRollup
+
+ARCHIVE_PREFIX = 'audit_logs_'
+ARCHIVE_TABLE_RE = re.compile(r'^audit_logs_(\d{4})(\d{2})$')
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def rollup_days(start, end):
+    """Recompute rollups for local days start..end (inclusive). Returns rows upserted."""
+    rows = (
+        AuditLog.objects
+        .filter(timestamp__gte=_local_midnight(start), timestamp__lt=_local_midnight(end + timedelta(days=1)))
+        .annotate(day=TruncDate('timestamp'))
+        .values('day', 'action', 'username')
+        # username is snapshotted per row; Max(user) picks the account behind it
+        .annotate(total=Count('id'), user_ref=Max('user'))
+        .order_by()
+    )
+    rollups = [
+        AuditLogDailyRollup(
+            date=row['day'], action=row['action'], username=row['username'],
+            user_id=row['user_ref'], count=row['total'],
+        )
+        for row in rows
+    ]
+    AuditLogDailyRollup.objects.bulk_create(
+        rollups,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['date', 'action', 'username'],
+        update_fields=['count', 'user'],
+    )
+    return len(rollups)
+
+
+def daily_counts(start, end):
+    """Rollup rows for local days start..end as dicts. Today comes straight from
+    the raw log (small range scan) since its rollup is only refreshed nightly."""
+    today = timezone.localdate()
+    rows = list(
+        AuditLogDailyRollup.objects
+        .filter(date__gte=start, date__lte=min(end, today - timedelta(days=1)))
+        .values('date', 'action', 'username', 'user_id', 'count')
+    )
+    if start <= today <= end:
+        live = (
+            AuditLog.objects
+            .filter(timestamp__gte=_local_midnight(today))
+            .values('action', 'username')
+            .annotate(count=Count('id'), user_ref=Max('user'))
+            .order_by()
+        )
+        rows.extend(
+            {'date': today, 'action': row['action'], 'username': row['username'],
+             'user_id': row['user_ref'], 'count': row['count']}
+            for row in live
+        )
+    return rows
+
+
+def archive_table_name(month):
+    return f'{ARCHIVE_PREFIX}{month:%Y%m}'
+
+
+def archive_tables():
+    """``{date(YYYY, MM, 1): table_name}`` for every existing archive table."""
+    tables = {}
+    for name in connection.introspection.table_names():
+        match = ARCHIVE_TABLE_RE.match(name)
+        if match:
+            tables[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return tables
+
+
+def archive_month(month):
+    """Roll up, then move every raw row of ``month`` into ``audit_logs_YYYYMM``.
+    Returns rows moved. Re-running for the same month appends (INSERT ... SELECT)."""
+    month = month_start(month)
+    following = next_month(month)
+    rollup_days(month, following - timedelta(days=1))
+
+    # Raw SQL skips the field's adaptation: on SQLite an aware datetime would be
+    # compared as text ('...+08:00') against naive UTC, off by 8 hours
+    start, end = (
+        connection.ops.adapt_datetimefield_value(_local_midnight(day)) for day in (month, following)
+    )
+    qn = connection.ops.quote_name
+    source = qn(AuditLog._meta.db_table)
+    target = archive_table_name(month)
+    ts = qn('timestamp')
+    select = f'SELECT * FROM {source} WHERE {ts} >= %s AND {ts} < %s'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if target in connection.introspection.table_names(cursor):
+            cursor.execute(f'INSERT INTO {qn(target)} {select}', [start, end])
+        else:
+            cursor.execute(f'CREATE TABLE {qn(target)} AS {select}', [start, end])
+        cursor.execute(f'DELETE FROM {source} WHERE {ts} >= %s AND {ts} < %s', [start, end])
+        return cursor.rowcount
+
+
+def drop_archive(month):
+    """O(1) retention: drop one month's archive table."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(archive_table_name(month))}')
@@ -0,0 +1,158 @@
+"""
+JWT authentication na may cached user lookup.
+
+simplejwt's ``JWTAuthentication`` does ``SELECT ... FROM users`` on every
+request just to build ``request.user`` — and with the 10s/30s/60s polling loops
+per tab that single query was a big chunk of our DB load. Dito, a compact
+snapshot (id, username, role, is_active, is_flagged) is kept in the cache for
+``AUTH_USER_CACHE_TTL`` seconds and turned into a ``CachedUser`` with the other
+fields deferred, so permission checks (``has_min_role``) never hit the DB.
+
+Anything that changes a snapshot field must call ``invalidate_user_cache()``
+(role change, activate/deactivate, flag/unflag, password change, delete).
+Worst case if a call site is missed: stale for at most the TTL.
+
+Deleting the keys only reaches other workers when the cache is shared
+(Redis). Without REDIS_URL each worker has its own LocMemCache, kaya there
+``invalidate_user_cache()`` also bumps the settings_store revision and stamps
+a ``UserCacheVersion`` row per user with it. When a worker sees the revision
+move it reads the rows stamped since its last look and evicts only those
+users — one indexed query, and only after a change. Every worker then
+re-reads the user within ``SYSTEM_SETTINGS_POLL_MS`` (1s) of a deactivation
+or demotion, not the TTL, and everyone else's snapshot stays cached.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from config.instrumentation import count_cache
+
+from . import settings_store
+from .models import User, CachedUser, UserCacheVersion
+
+SNAPSHOT_FIELDS = ('id', 'username', 'role', 'is_active', 'is_flagged')
+CACHE_KEY = 'auth:user:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+_seen_lock = threading.Lock()
+_seen_version = None  # settings_store revision up to which other workers' invalidations were applied
+
+
+def _cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+    count_cache(outcome == 'hits')
+
+
+def get_cache_stats():
+    """Hit/miss counters for this worker process (reset on restart)."""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hitRate': round(hits / total, 4) if total else None,
+        'ttlSeconds': getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+    }
+
+
+def invalidate_user_cache(*user_ids):
+    """Drop cached snapshots para sa mga user na 'to (accepts ids or iterables of ids)."""
+    ids = set()
+    for user_id in user_ids:
+        if isinstance(user_id, (list, tuple, set, frozenset)):
+            ids.update(user_id)
+        else:
+            ids.add(user_id)
+    if ids:
+        cache.delete_many([_cache_key(uid) for uid in ids])
+        if _local_cache():
+            # the other workers' caches; same transaction as the bump para
+            # walang worker na makakita ng revision without its markers
+            with transaction.atomic():
+                version = settings_store.bump()
+                UserCacheVersion.objects.bulk_create(
+                    [UserCacheVersion(user_id=uid, version=version) for uid in ids],
+                    update_conflicts=True, unique_fields=['user_id'], update_fields=['version'],
+                )
+
+
+def _local_cache():
+    return isinstance(caches['default'], LocMemCache)
+
+
+def _evict_invalidated():
+    """Drop snapshots that other workers invalidated since this worker last looked."""
+    global _seen_version
+    revision = settings_store.revision()
+    if revision is None or (_seen_version is not None and revision <= _seen_version):
+        return
+    with _seen_lock:
+        if _seen_version is None:
+            _seen_version = revision  # nothing cached yet in this process
+            return
+        if revision <= _seen_version:
+            return
+        rows = list(UserCacheVersion.objects.filter(version__gt=_seen_version).values_list('user_id', 'version'))
+        if rows:
+            cache.delete_many([_cache_key(user_id) for user_id, _ in rows])
+        _seen_version = max([revision] + [version for _, version in rows])
+
+
+def _from_snapshot(snapshot):
+    # from_db() expects the values in model field order
+    names = [f.attname for f in CachedUser._meta.concrete_fields if f.attname in snapshot]
+    return CachedUser.from_db('default', names, [snapshot[name] for name in names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Drop-in replacement for ``JWTAuthentication`` (same errors, same checks)."""
+
+    def get_user(self, validated_token):
+        # Revoke-on-password-change needs the password hash, which we don't cache
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        if _local_cache():
+            _evict_invalidated()
+        key = _cache_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            _record('misses')
+            row = (
+                User.objects
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values(*SNAPSHOT_FIELDS)
+                .first()
+            )
+            if row is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            snapshot = row
+            cache.set(key, snapshot, getattr(settings, 'AUTH_USER_CACHE_TTL', 30))
+        else:
+            _record('hits')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return _from_snapshot(snapshot)
@@ -0,0 +1,110 @@
+"""
+Maintenance mode state + enforcement.
+
+State lives in the ``maintenance`` SystemSetting (see ``settings_store``),
+so every worker sees the same window without Redis; reads come from memory.
+Expiry is computed on read from ``endTime``. Each change bumps ``version``,
+which is what the status ETag is built from.
+
+``MaintenanceMiddleware`` (placed right after CorsMiddleware) does two jobs:
+
+1. Answers ``GET /api/auth/maintenance/`` by itself — no sessions, no auth,
+   no DRF — with ``Cache-Control: private, max-age`` and an ETag, kaya yung
+   10 s poll ng bawat tab is a cache read and usually a 304.
+2. While maintenance is on, rejects writes (POST/PUT/PATCH/DELETE under
+   /api/) from anyone below STAFF with 503, para hindi lang client polling
+   ang pumipigil. Login and token refresh stay open so staff can get in.
+"""
+
+import time
+
+from django.http import HttpResponse, JsonResponse
+
+from . import settings_store
+
+SETTING_KEY = 'maintenance'
+STATUS_PATH = '/api/auth/maintenance/'
+STATUS_MAX_AGE = 5  # seconds; well under the frontend's 10 s poll
+EXEMPT_WRITE_PATHS = ('/api/auth/login/', '/api/auth/token/refresh/')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_state():
+    """``{'enabled', 'endTime', 'version'}`` — expired windows read as disabled."""
+    data = settings_store.get(SETTING_KEY) or {}
+    version = data.get('version', 0)
+    if data.get('enabled') and data.get('endTime', 0) > _now_ms():
+        return {'enabled': True, 'endTime': data['endTime'], 'version': version}
+    return {'enabled': False, 'endTime': 0, 'version': version}
+
+
+def enable(duration_mins, user=None):
+    end_time = _now_ms() + duration_mins * 60 * 1000
+    state = {'enabled': True, 'endTime': end_time, 'version': _now_ms()}
+    settings_store.set(SETTING_KEY, state, user=user)
+    return state
+
+
+def disable(user=None):
+    state = {'enabled': False, 'endTime': 0, 'version': _now_ms()}
+    settings_store.set(SETTING_KEY, state, user=user)
+    return state
+
+
+def _etag(state):
+    return f'"m{state["version"]}-{int(state["enabled"])}"'
+
+
+class MaintenanceMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == STATUS_PATH and request.method in ('GET', 'HEAD'):
+            return self._status(request)
+        if request.method not in SAFE_METHODS and request.path.startswith('/api/') \
+                and request.path not in EXEMPT_WRITE_PATHS:
+            state = get_state()
+            if state['enabled'] and not self._is_staff(request):
+                return self._blocked(state)
+        return self.get_response(request)
+
+    def _status(self, request):
+        request.metrics_route = 'MaintenanceMiddleware.status'  # never reaches a view
+        state = get_state()
+        etag = _etag(state)
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponse(status=304)
+        else:
+            response = JsonResponse({'enabled': state['enabled'], 'endTime': state['endTime']})
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={STATUS_MAX_AGE}'
+        return response
+
+    @staticmethod
+    def _is_staff(request):
+        # JWT lang yung auth ng API; the cached authenticator makes this a cache hit
+        from rest_framework.exceptions import APIException
+        from .backends import CachedJWTAuthentication
+
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return bool(result) and result[0].has_min_role('STAFF')
+
+    @staticmethod
+    def _blocked(state):
+        retry_after = max((state['endTime'] - _now_ms()) // 1000, 1)
+        response = JsonResponse({
+            'error': 'The system is under maintenance. Please try again later.',
+            'code': 'MAINTENANCE',
+            'endTime': state['endTime'],
+        }, status=503)
+        response['Retry-After'] = str(retry_after)
+        return response
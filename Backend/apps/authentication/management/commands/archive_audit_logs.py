@@ -0,0 +1,68 @@
+"""
+Management command: archive_audit_logs
+Moves whole months of the raw audit log out of ``audit_logs`` into per-month
+``audit_logs_YYYYMM`` tables (rolled up first), and drops archive tables past
+retention — a DROP TABLE per month, hindi row-by-row delete.
+
+Schedule monthly (cron / Render cron job):
+    python manage.py archive_audit_logs --keep-months 3 --retain-months 24
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.authentication import audit
+from apps.authentication.audit_archive import (
+    archive_month, archive_tables, drop_archive, month_start,
+)
+from apps.authentication.models import AuditLog
+
+
+def _months_back(month, n):
+    year, index = divmod(month.year * 12 + month.month - 1 - n, 12)
+    return month.replace(year=year, month=index + 1, day=1)
+
+
+class Command(BaseCommand):
+    help = 'Archive old audit log months into per-month tables and drop expired archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=3,
+            help='Months (including the current one) kept in the live audit_logs table (default: 3)',
+        )
+        parser.add_argument(
+            '--retain-months', type=int, default=24,
+            help='Archive tables older than this many months are dropped; 0 = keep forever (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        audit.flush()
+        this_month = month_start(timezone.localdate())
+        cutoff = _months_back(this_month, max(options['keep_months'], 1) - 1)
+
+        # Jump from oldest row to oldest row (Min on the timestamp index) para
+        # walang empty archive tables for months with no activity
+        while True:
+            oldest = AuditLog.objects.aggregate(oldest=Min('timestamp'))['oldest']
+            if oldest is None:
+                break
+            month = month_start(timezone.localtime(oldest).date())
+            if month >= cutoff:
+                break
+            moved = archive_month(month)
+            self.stdout.write(f'Archived {moved} row(s) from {month:%Y-%m}')
+            if not moved:
+                # the oldest row should always be in its own month; bail out
+                # instead of looping forever if the bounds ever disagree
+                self.stderr.write(f'Oldest row ({oldest}) was not in {month:%Y-%m}; stopping.')
+                break
+
+        if options['retain_months'] > 0:
+            drop_before = _months_back(this_month, options['retain_months'])
+            for month, table in sorted(archive_tables().items()):
+                if month < drop_before:
+                    drop_archive(month)
+                    self.stdout.write(f'Dropped {table}')
+
+        self.stdout.write(self.style.SUCCESS('Audit log archiving done.'))
@@ -0,0 +1,90 @@
+"""
+Management command: benchmark_audit
+Compares request latency with the synchronous vs buffered audit log writer
+on two audit-heavy endpoints: POST /api/requests/{id}/approve/ and
+POST /api/auth/login/. Creates its own throwaway users/items/requests and
+deletes them (and their audit rows) afterwards.
+
+    python manage.py benchmark_audit --iterations 50
+
+Uses the MD5 password hasher during the run so login timings aren't
+dominated by PBKDF2.
+"""
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.authentication import audit
+from apps.authentication.models import AuditLog
+from apps.inventory.models import Item
+from apps.requests.models import Request
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure approve/login latency with the sync vs buffered audit writer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+
+    def handle(self, *args, **options):
+        iterations = max(options['iterations'], 1)
+        results = {}
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            for buffered in (False, True):
+                with override_settings(AUDIT_LOG_BUFFERED=buffered):
+                    results[buffered] = self._run(iterations)
+                audit.flush()
+
+        for endpoint in ('approve', 'login'):
+            sync_ms = statistics.median(results[False][endpoint])
+            buffered_ms = statistics.median(results[True][endpoint])
+            self.stdout.write(
+                f'{endpoint:8} median sync {sync_ms:6.2f} ms | buffered {buffered_ms:6.2f} ms | '
+                f'saved {sync_ms - buffered_ms:5.2f} ms ({(1 - buffered_ms / sync_ms) * 100:.0f}%)'
+            )
+
+    def _run(self, iterations):
+        tag = uuid.uuid4().hex[:8]
+        password = 'Bench-audit-123'
+        staff = User.objects.create_user(
+            username=f'__bench_staff_{tag}', email=f'bench-staff-{tag}@example.invalid',
+            password=password, role='STAFF',
+        )
+        student = User.objects.create_user(username=f'__bench_student_{tag}', password=password)
+        item = Item.objects.create(name=f'Benchmark item {tag}', quantity=iterations)
+        pending = Request.objects.bulk_create([
+            Request(item=item, item_name=item.name, requested_by=student, quantity=1, purpose='benchmark')
+            for _ in range(iterations)
+        ])
+
+        client = Client(HTTP_HOST='localhost')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(staff)}'}
+        timings = {'approve': [], 'login': []}
+        try:
+            for i, req in enumerate(pending):
+                started = time.perf_counter()
+                response = client.post(f'/api/requests/{req.pk}/approve/', **auth)
+                timings['approve'].append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.content
+
+                started = time.perf_counter()
+                response = client.post(
+                    '/api/auth/login/', {'email': staff.email, 'password': password},
+                    content_type='application/json', REMOTE_ADDR=f'10.254.{i // 250}.{i % 250 + 1}',
+                )
+                timings['login'].append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.content
+        finally:
+            audit.flush()
+            AuditLog.objects.filter(user__in=[staff, student]).delete()
+            item.delete()
+            User.objects.filter(pk__in=[staff.pk, student.pk]).delete()
+        return timings
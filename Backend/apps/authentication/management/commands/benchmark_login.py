@@ -0,0 +1,78 @@
+"""
+Management command: benchmark_login
+Times POST /api/auth/login/ end-to-end (through the full middleware stack) and
+counts the SQL statements each login runs. Everything happens inside a
+transaction that gets rolled back, so it's safe to run against a dev copy.
+
+    python manage.py benchmark_login --iterations 50
+    python manage.py benchmark_login --fast-hasher   # DB cost only, no PBKDF2
+
+Password hashing dominates real login latency; --fast-hasher swaps in MD5 for
+the run para makita yung DB part ng pipeline.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure login latency and queries per login (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Use the MD5 hasher so timings show database cost only',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options['iterations'], 1)
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            with transaction.atomic():
+                timings, query_counts = self._run(iterations)
+                transaction.set_rollback(True)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(self.style.SUCCESS(
+            f'{iterations} logins: '
+            f'median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, '
+            f'{statistics.mean(query_counts):.1f} queries/login'
+        ))
+
+    def _run(self, iterations):
+        password = 'Bench-login-123'
+        user = User.objects.create_user(
+            username='__benchmark_login__',
+            email='benchmark-login@example.invalid',
+            password=password,
+        )
+        # Django's test Client skips ALLOWED_HOSTS only under the test runner
+        client = Client(HTTP_HOST='localhost')
+
+        timings, query_counts = [], []
+        for i in range(iterations):
+            # iba-ibang IP per attempt para di tamaan ng 10/m login rate limit
+            remote_addr = f'10.255.{i // 250}.{i % 250 + 1}'
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.post(
+                    '/api/auth/login/',
+                    {'email': user.email, 'password': password},
+                    content_type='application/json',
+                    REMOTE_ADDR=remote_addr,
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'Login failed during benchmark: {response.status_code} {response.content!r}')
+            query_counts.append(len(queries))
+        return timings, query_counts
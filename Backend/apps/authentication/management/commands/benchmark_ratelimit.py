@@ -0,0 +1,83 @@
+"""
+Management command: benchmark_ratelimit
+Times one rate-limit check against the configured counter store (SQLite file
+or Redis, see apps/ratelimit.py), then checks that the limit holds when
+several processes hit the same key at once — the case the old per-process
+LocMemCache got wrong.
+
+    python manage.py benchmark_ratelimit --iterations 5000
+    python manage.py benchmark_ratelimit --processes 4 --limit 100
+"""
+import multiprocessing
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from apps import ratelimit
+
+KEY_PREFIX = '__benchmark_ratelimit__'
+
+
+def _hammer(key, rate, attempts, results):
+    # fresh process → fresh SQLite connection (apps/ratelimit.py checks the pid)
+    allowed = sum(not ratelimit.is_limited(key, rate) for _ in range(attempts))
+    results.put(allowed)
+
+
+class Command(BaseCommand):
+    help = 'Measure rate-limit check latency and verify the limit is shared across processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--limit', type=int, default=50, help='Per-hour limit for the cross-process check')
+
+    def handle(self, *args, **options):
+        backend = ratelimit.get_backend()
+        iterations = max(options['iterations'], 1)
+        try:
+            timings = self._latency(iterations)
+            allowed, expected, attempts = self._shared_limit(options['processes'], options['limit'])
+        finally:
+            backend.reset(KEY_PREFIX)
+
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{type(backend).__name__}: {iterations} checks, '
+            f'median {statistics.median(timings):.1f} µs, p99 {p99:.1f} µs'
+        )
+        style = self.style.SUCCESS if allowed == expected else self.style.ERROR
+        self.stdout.write(style(
+            f'{options["processes"]} processes × {attempts} attempts at {expected}/h: '
+            f'{allowed} allowed (expected {expected})'
+        ))
+
+    def _latency(self, iterations):
+        # iba-ibang key per check para walang ma-limit; first call opens the connection
+        run = uuid.uuid4().hex[:8]
+        ratelimit.is_limited(f'{KEY_PREFIX}:{run}:warmup', '1000/m')
+        timings = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            ratelimit.is_limited(f'{KEY_PREFIX}:{run}:{i % 500}', '1000000/m')
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        return timings
+
+    def _shared_limit(self, processes, limit):
+        processes, limit = max(processes, 1), max(limit, 1)
+        # hourly window, fresh key: previous window is empty, so exactly `limit` pass
+        key = f'{KEY_PREFIX}:shared:{uuid.uuid4().hex[:8]}'
+        rate = f'{limit}/h'
+        attempts = limit  # each process alone would use up the whole limit
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Queue()
+        workers = [ctx.Process(target=_hammer, args=(key, rate, attempts, results)) for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        allowed = sum(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        return allowed, limit, attempts
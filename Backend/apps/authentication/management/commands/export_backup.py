@@ -0,0 +1,52 @@
+"""
+Management command: export_backup
+Writes the same gzip JSON Lines backup as GET /api/auth/backup/ to a file.
+Full backup by default; --since <watermark> exports only the rows changed
+(and deleted) since a previous backup. The new watermark is printed at the
+end — save it for the next incremental run.
+
+    python manage.py export_backup --output backups/full.jsonl.gz
+    python manage.py export_backup --since 2026-10-19T02:00:00+08:00
+"""
+import gzip
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.authentication.backup import stream_backup
+
+
+class Command(BaseCommand):
+    help = 'Export a full or incremental (--since) backup to a .jsonl.gz file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Watermark (ISO datetime) of the previous backup')
+        parser.add_argument('--output', help='Target file (default: ./plmun_nexus_<kind>_<timestamp>.jsonl.gz)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_datetime(options['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                raise CommandError('--since must be an ISO datetime, e.g. the watermark of a previous backup.')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        kind = 'backup' if since is None else 'incremental'
+        path = options['output'] or f"plmun_nexus_{kind}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        with open(path, 'wb') as fh:
+            for chunk in stream_backup('manage.py', since=since):
+                fh.write(chunk)
+
+        with gzip.open(path, 'rt') as fh:
+            header = json.loads(fh.readline())
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {kind} to {path} ({os.path.getsize(path) / 1024:.1f} KB). '
+            f'Next --since: {header["watermark"]}'
+        ))
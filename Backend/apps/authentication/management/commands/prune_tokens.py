@@ -0,0 +1,35 @@
+"""
+Management command: prune_tokens
+Deletes expired JWT refresh tokens from the token_blacklist tables in small
+batches. Every rotation adds rows to both tables, kaya dapat regular 'to.
+
+Schedule hourly or daily (cron / Render cron job):
+    python manage.py prune_tokens
+"""
+from django.core.management.base import BaseCommand
+
+from apps.authentication.tokens import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding/blacklisted JWT tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Tokens deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Stop after this many batches (default: until done)',
+        )
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = prune_expired_tokens(
+            batch_size=max(options['batch_size'], 1),
+            max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Pruned {outstanding} expired outstanding token(s) '
+            f'and {blacklisted} blacklist entr{"y" if blacklisted == 1 else "ies"}.'
+        ))
@@ -0,0 +1,31 @@
+"""
+Management command: rollup_audit_logs
+Re-aggregates recent audit log days into AuditLogDailyRollup (per day,
+action and user). Idempotent — yesterday is included by default para
+ma-catch yung late/buffered entries.
+
+Schedule nightly (cron / Render cron job):
+    python manage.py rollup_audit_logs
+    python manage.py rollup_audit_logs --days 90   # backfill
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.authentication import audit
+from apps.authentication.audit_archive import rollup_days
+
+
+class Command(BaseCommand):
+    help = 'Refresh daily audit log rollups for the last N days (default: today and yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help='How many days back, including today')
+
+    def handle(self, *args, **options):
+        audit.flush()
+        today = timezone.localdate()
+        start = today - timedelta(days=max(options['days'], 1) - 1)
+        rows = rollup_days(start, today)
+        self.stdout.write(self.style.SUCCESS(f'Upserted {rows} rollup row(s) for {start} – {today}.'))
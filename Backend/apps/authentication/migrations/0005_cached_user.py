@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:25
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_auditlog_action_choices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('authentication.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
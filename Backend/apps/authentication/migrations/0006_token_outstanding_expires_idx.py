@@ -0,0 +1,20 @@
+# Index on simplejwt's outstanding-token table para sa prune_tokens.
+# Hand-written: the model belongs to a third-party app, so we can't add it via Meta.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_cached_user'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS token_outstanding_expires_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS token_outstanding_expires_idx',
+        ),
+    ]
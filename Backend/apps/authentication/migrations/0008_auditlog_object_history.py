@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:32
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='changes',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Changed fields as {"field": [old, new]} or event data', null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_type',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['object_type', 'object_id', 'timestamp'], name='audit_object_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+        ),
+    ]
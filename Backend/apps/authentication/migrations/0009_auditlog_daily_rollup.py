@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_auditlog_object_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action', models.CharField(choices=[('Login', 'Login'), ('Logout', 'Logout'), ('Login Failed', 'Login Failed'), ('Register', 'Register'), ('Profile Update', 'Profile Update'), ('Password Changed', 'Password Changed'), ('Item Created', 'Item Created'), ('Item Updated', 'Item Updated'), ('Item Deleted', 'Item Deleted'), ('Request Created', 'Request Created'), ('Request Approved', 'Request Approved'), ('Request Rejected', 'Request Rejected'), ('Item Returned', 'Item Returned'), ('User Created', 'User Created'), ('User Updated', 'User Updated'), ('User Deleted', 'User Deleted'), ('Backup Export', 'Backup Export'), ('Other', 'Other')], max_length=60)),
+                ('username', models.CharField(blank=True, max_length=150)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'audit_log_daily_rollups',
+                'ordering': ['-date', 'action'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'action', 'username'), name='unique_audit_rollup_per_day')],
+            },
+        ),
+    ]
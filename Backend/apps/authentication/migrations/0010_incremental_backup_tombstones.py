@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_auditlog_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=40)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('key', models.CharField(blank=True, max_length=150)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'deletion_tombstones',
+                'ordering': ['-deleted_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
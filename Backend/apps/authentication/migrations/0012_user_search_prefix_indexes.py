@@ -0,0 +1,53 @@
+# Case-insensitive prefix indexes para sa user typeahead (?q= → istartswith).
+# Hand-written kasi vendor-specific: the index has to match the SQL Django
+# generates for istartswith on each backend.
+#   PostgreSQL: UPPER(col::text) LIKE UPPER('abc%')  → expression index, text_pattern_ops
+#   SQLite:     col LIKE 'abc%' (case-insensitive)    → index with COLLATE NOCASE
+#   MySQL:      ci collations already; a plain index is enough
+
+from django.db import migrations
+
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'student_id', 'department')
+
+
+def _index_sql(vendor, column):
+    name = f'users_{column}_prefix_idx'
+    if vendor == 'postgresql':
+        return f'CREATE INDEX IF NOT EXISTS {name} ON users (UPPER({column}::text) text_pattern_ops)'
+    if vendor == 'sqlite':
+        return f'CREATE INDEX IF NOT EXISTS {name} ON users ({column} COLLATE NOCASE)'
+    if vendor == 'mysql':
+        return f'CREATE INDEX {name} ON users ({column})'
+    return None
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for column in SEARCH_COLUMNS:
+        if column in ('email', 'student_id') and vendor == 'mysql':
+            continue  # users_email_idx / users_student_id_idx already cover these
+        sql = _index_sql(vendor, column)
+        if sql:
+            schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for column in SEARCH_COLUMNS:
+        name = f'users_{column}_prefix_idx'
+        if vendor == 'mysql':
+            if column not in ('email', 'student_id'):
+                schema_editor.execute(f'DROP INDEX {name} ON users')
+        elif vendor in ('postgresql', 'sqlite'):
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0011_user_email_student_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:53
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_from_cache(apps, schema_editor):
+    """Carry over state that used to live in the Django cache (only survives
+    with a shared cache like Redis; LocMemCache starts empty anyway)."""
+    from django.core.cache import cache
+
+    SystemSetting = apps.get_model('authentication', 'SystemSetting')
+    carried = {
+        'maintenance': cache.get('plmun_maintenance'),
+        'history_clear_code': cache.get('history_clear_code'),
+    }
+    revision = 0
+    for key, value in carried.items():
+        if value is not None:
+            revision += 1
+            SystemSetting.objects.update_or_create(key=key, defaults={'value': value, 'revision': revision})
+    SystemSetting.objects.update_or_create(key='_revision', defaults={'revision': revision})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0012_user_search_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemSetting',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('revision', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'system_settings',
+                'ordering': ['key'],
+            },
+        ),
+        migrations.RunPython(copy_from_cache, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0013_system_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(db_index=True, max_length=40)),
+                ('statement', models.TextField()),
+                ('sql', models.TextField()),
+                ('params', models.JSONField(blank=True, default=list)),
+                ('duration_ms', models.FloatField()),
+                ('route', models.CharField(blank=True, max_length=150)),
+                ('path', models.CharField(blank=True, max_length=255)),
+                ('stack', models.JSONField(blank=True, default=list)),
+                ('plan', models.TextField(blank=True)),
+                ('captured_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'slow_queries',
+                'ordering': ['-captured_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0014_slow_queries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCacheVersion',
+            fields=[
+                ('user_id', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(db_index=True)),
+            ],
+            options={
+                'db_table': 'user_cache_versions',
+            },
+        ),
+    ]
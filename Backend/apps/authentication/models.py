@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 # TODO: mag-add ng student_year field para alam kung 1st yr, 2nd yr, etc.
@@ -24,6 +27,7 @@ class User(AbstractUser):
     phone = models.CharField(max_length=20, blank=True)
     is_flagged = models.BooleanField(default=False, help_text='Flagged for overdue returns')
     overdue_count = models.PositiveIntegerField(default=0, help_text='Lifetime overdue incidents (never reset)')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # incremental backup watermark
 
     # Numbering starts at 0 because we compare with >= in has_min_role().
     # Considered using Django's built-in groups/permissions but the role
@@ -55,11 +59,41 @@ class User(AbstractUser):
     class Meta:
         db_table = 'users'
         ordering = ['-date_joined']
+        indexes = [
+            # duplicate checks ng bulk provisioning (one lookup per batch,
+            # case-insensitive kaya sa LOWER(email))
+            models.Index(Lower('email'), name='users_email_lower_idx'),
+            models.Index(fields=['student_id'], name='users_student_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_full_name()} ({self.role})"
 
 
+class CachedUser(User):
+    """User na galing sa auth cache (see ``apps.authentication.backends``).
+
+    Only the snapshot fields are loaded; everything else is deferred. Unlike a
+    plain deferred instance, touching any deferred field loads *all* of them in
+    one query, so views that serialize the full profile still cost one SELECT."""
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields and deferred.issuperset(fields):
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def save(self, *args, **kwargs):
+        # Deferred instances only save loaded fields, so auto_now alone would
+        # leave updated_at stale — setting it here makes it a loaded field.
+        if 'updated_at' in self.get_deferred_fields():
+            self.updated_at = timezone.now()
+        super().save(*args, **kwargs)
+
+
 # --- Audit log ---
 # dati wala 'to, hiningi ng IT head para may paper trail
 
@@ -114,26 +148,198 @@ class AuditLog(models.Model):
     username   = models.CharField(max_length=150, blank=True)  # naka-snapshot kasi baka ma-delete yung user
     details    = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp  = models.DateTimeField(auto_now_add=True)
+    # Structured target + payload para ma-query yung history ng isang object
+    # (e.g. request #123) without scanning ``details``. object_type = model_name.
+    object_type = models.CharField(max_length=40, blank=True, default='')
+    object_id  = models.PositiveBigIntegerField(null=True, blank=True)
+    changes    = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder,
+                                  help_text='Changed fields as {"field": [old, new]} or event data')
+    # default instead of auto_now_add: buffered writes keep the time of the event, not of the flush
+    timestamp  = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'audit_logs'
         ordering = ['-timestamp']
+        indexes = [
+            # per-object history: WHERE object_type=.. AND object_id=.. ORDER BY timestamp
+            models.Index(fields=['object_type', 'object_id', 'timestamp'], name='audit_object_history_idx'),
+            # date-range filters and the default newest-first listing
+            models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.timestamp:%Y-%m-%d %H:%M}] {self.action} — {self.username}"
 
 
-def log_action(action, user=None, details='', request=None):
-    """Convenience helper to create an AuditLog entry from anywhere."""
+def _audit_value(value):
+    """Make a field value JSON-friendly (files → name, model → pk)."""
+    if isinstance(value, models.Model):
+        return value.pk
+    if hasattr(value, 'name') and hasattr(value, 'storage'):  # FieldFile
+        return value.name or None
+    return value
+
+
+def snapshot_fields(instance, fields):
+    """Current values of ``fields`` — take this before a save, then pass to field_changes()."""
+    return {f: _audit_value(getattr(instance, f)) for f in fields}
+
+
+def field_changes(before, instance):
+    """``{"field": [old, new]}`` for every field in ``before`` that changed on ``instance``."""
+    changes = {}
+    for field, old in before.items():
+        new = _audit_value(getattr(instance, field))
+        if new != old:
+            changes[field] = [old, new]
+    return changes
+
+
+def log_action(action, user=None, details='', request=None, obj=None, changes=None,
+               object_type=None, object_id=None):
+    """Convenience helper to create an AuditLog entry from anywhere.
+
+    ``obj`` fills object_type/object_id (pass them explicitly for objects that
+    are already deleted); ``changes`` is stored as JSON. Written right away
+    unless ``AUDIT_LOG_BUFFERED`` is on — see apps/authentication/audit.py."""
+    from .audit import write_entry
+
+    if obj is not None:
+        object_type = object_type or obj._meta.model_name
+        object_id = object_id if object_id is not None else obj.pk
+
     ip = None
     if request:
         x_forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
         ip = x_forwarded.split(',')[0].strip() if x_forwarded else request.META.get('REMOTE_ADDR')
-    AuditLog.objects.create(
+    write_entry(AuditLog(
         action=action,
         user=user if (user and user.is_authenticated) else None,
         username=user.username if (user and user.is_authenticated) else '',
         details=details,
         ip_address=ip,
+        object_type=object_type or '',
+        object_id=object_id,
+        changes=changes,
+    ))
+
+
+class AuditLogDailyRollup(models.Model):
+    """Bilang ng audit events per day, per action, per user.
+
+    Filled by ``rollup_audit_logs`` (and before archiving a month), para yung
+    security overview — failed logins per day, most active staff — reads a
+    few hundred rollup rows instead of scanning the raw log. Rollups are kept
+    even after the raw month is archived or dropped."""
+
+    date     = models.DateField()
+    action   = models.CharField(max_length=60, choices=AuditLog.Action.choices)
+    user     = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='audit_rollups',
     )
+    username = models.CharField(max_length=150, blank=True)  # '' = anonymous (e.g. failed logins)
+    count    = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'audit_log_daily_rollups'
+        ordering = ['-date', 'action']
+        constraints = [
+            # also the (date, action) index for per-day charts
+            models.UniqueConstraint(fields=['date', 'action', 'username'], name='unique_audit_rollup_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.action} — {self.username or 'anonymous'}: {self.count}"
+
+
+class DeletionTombstone(models.Model):
+    """Record ng hard delete, para ma-replay ng incremental backup.
+
+    ``updated_at`` watermarks only see rows that still exist, kaya every delete
+    of a backed-up model through the API or admin (``collect_tombstones()``)
+    leaves a tombstone here (see ``signals.py``). ``key``
+    is the natural key used by the backup (username for users) para portable
+    sa ibang database. Audit log deletes are not tracked."""
+
+    table      = models.CharField(max_length=40)  # backup table name, e.g. 'requests'
+    object_id  = models.PositiveBigIntegerField()
+    key        = models.CharField(max_length=150, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'deletion_tombstones'
+        ordering = ['-deleted_at']
+
+    def __str__(self):
+        return f"{self.table} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class SystemSetting(models.Model):
+    """Runtime system settings (maintenance window, history clear code, ...).
+
+    Dati nasa Django cache 'to — LocMemCache kapag walang REDIS_URL, so each
+    gunicorn worker had its own maintenance flag and clear code. Read through
+    ``apps.authentication.settings_store``, never directly: it keeps an
+    in-process copy and only re-reads when the ``_revision`` row moves."""
+
+    key        = models.CharField(max_length=100, primary_key=True)
+    value      = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    revision   = models.PositiveBigIntegerField(default=0)
+    updated_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+',
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'system_settings'
+        ordering = ['key']
+
+    def __str__(self):
+        return self.key
+
+
+class UserCacheVersion(models.Model):
+    """Per-user "snapshot changed" marker para sa auth user cache.
+
+    Without Redis each worker caches user snapshots in its own LocMemCache.
+    ``invalidate_user_cache()`` writes one row per user here with ``version``
+    set to the bumped settings_store revision; the other workers evict just
+    those users once they see the revision move (apps/authentication/backends.py).
+    No FK to users on purpose — a deleted user's marker must outlive the user."""
+
+    user_id = models.PositiveBigIntegerField(primary_key=True)
+    version = models.PositiveBigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'user_cache_versions'
+
+    def __str__(self):
+        return f"user #{self.user_id} v{self.version}"
+
+
+class SlowQuery(models.Model):
+    """Isang SQL statement na lumampas sa ``SLOW_QUERY_MS`` (see config/slow_queries.py).
+
+    ``fingerprint`` is a hash of ``statement`` — the SQL with placeholders and
+    IN-lists collapsed — so repeats of the same query group together no matter
+    the parameters. The table is trimmed to the newest ``SLOW_QUERY_KEEP`` rows."""
+
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    statement   = models.TextField()
+    sql         = models.TextField()
+    params      = models.JSONField(default=list, blank=True)
+    duration_ms = models.FloatField()
+    route       = models.CharField(max_length=150, blank=True)  # e.g. ItemViewSet.list
+    path        = models.CharField(max_length=255, blank=True)
+    stack       = models.JSONField(default=list, blank=True)
+    plan        = models.TextField(blank=True)
+    captured_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'slow_queries'
+        ordering = ['-captured_at']
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms {self.route or '-'}: {self.statement[:60]}"
@@ -0,0 +1,337 @@
+"""
+Restore from the JSON Lines backups written by ``backup.py``.
+
+Dati walang restore path — recovery meant hand-written scripts or clicking
+through the Django admin. ``restore_backups()`` streams one full backup and/or
+a chain of incrementals, in order, and loads them in batches:
+
+- Rows are upserted with ``bulk_create(update_conflicts=True)`` per batch of
+  ``batch_size`` — ids are kept for every table except users, which are
+  matched by username (the backup's natural key for user references).
+- ``*__username`` references are remapped to the target database's user ids;
+  FK targets that don't exist become NULL, or the row is skipped if the FK
+  is required.
+- ``bulk_create`` sends no per-row signals. It does stamp ``auto_now`` /
+  ``auto_now_add`` fields with the current time, kaya after each batch one
+  ``QuerySet.update()`` (which skips auto_now) writes the original
+  timestamps back. Field flags are never touched — the restore runs inside a
+  web worker that keeps serving other requests. Tombstones from incrementals
+  are applied with tombstone recording suspended.
+- Every table's row count and sha256 is checked against the manifest; any
+  mismatch rolls the whole restore back.
+- Afterwards, PK sequences are reset (Postgres) and cached auth snapshots of
+  the restored users are dropped.
+
+New users get an unusable password — passwords are never in a backup, kaya
+kailangan nila mag-reset. Rows that exist in the database but not in a full
+backup are left alone.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils.dateparse import parse_datetime
+
+from .backends import invalidate_user_cache
+from .signals import suspend_tombstones
+
+SUPPORTED_MAJOR = '2.'
+TIMESTAMP_CHUNK = 250  # rows per CASE update (4 params per row per field)
+
+
+class RestoreError(Exception):
+    """The backup file is unreadable, inconsistent, or out of order."""
+
+
+def _table_models():
+    from apps.inventory.models import Item
+    from apps.requests.models import (
+        Request, RequestBatch, Comment, Notification, Reservation, WaitlistEntry,
+    )
+    from .models import User, AuditLog
+
+    return {
+        'users': User,
+        'inventory': Item,
+        'request_batches': RequestBatch,
+        'requests': Request,
+        'reservations': Reservation,
+        'waitlist': WaitlistEntry,
+        'comments': Comment,
+        'notifications': Notification,
+        'audit_logs': AuditLog,
+    }
+
+
+def _iter_lines(fileobj):
+    """Raw lines (bytes) of a .jsonl.gz or plain .jsonl file."""
+    head = fileobj.read(2)
+    fileobj.seek(0)
+    if head == b'\x1f\x8b':
+        fileobj = gzip.GzipFile(fileobj=fileobj)
+    for line in fileobj:
+        if line.strip():
+            yield line
+
+
+def _restore_timestamps(model, key, rows):
+    """Write the backed-up auto_now/auto_now_add values of ``rows`` (matched on
+    ``key``) over the ones bulk_create just stamped. ``update()`` doesn't run
+    pre_save, kaya hindi na ito ma-o-overwrite."""
+    fields = [
+        f for f in model._meta.concrete_fields
+        if (getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)) and f.attname in rows[0]
+    ]
+    if not fields:
+        return
+    for start in range(0, len(rows), TIMESTAMP_CHUNK):
+        chunk = rows[start:start + TIMESTAMP_CHUNK]
+        model.objects.filter(**{f'{key}__in': [row[key] for row in chunk]}).update(**{
+            f.attname: Case(
+                *[When(**{key: row[key]}, then=Value(f.to_python(row[f.attname]), output_field=f))
+                  for row in chunk if row[f.attname] is not None],
+                default=F(f.attname),
+                output_field=f,
+            )
+            for f in fields
+        })
+
+
+class BackupLoader:
+    """Loads backup files into the default database. Use via ``restore_backups``."""
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = max(batch_size, 1)
+        self.models = _table_models()
+        self.user_model = self.models['users']
+        self.user_ids = {}  # username → id sa target database
+        self.touched_user_ids = set()
+        self.stats = {}
+        self.tombstones_applied = 0
+        self.watermark = None
+
+    # --- per file ---
+
+    def load(self, fileobj):
+        header = None
+        manifest = None
+        digests = {}
+        counts = {}
+        table, pending = None, []
+
+        for line in _iter_lines(fileobj):
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise RestoreError(f'Corrupt line in backup: {exc}') from exc
+
+            if header is None:
+                header = self._check_header(record)
+                continue
+            if record.get('type') == 'manifest':
+                manifest = record['tables']
+                break
+
+            name = record.get('table')
+            if name not in self.models and name != 'tombstones':
+                raise RestoreError(f'Unknown table in backup: {name!r}')
+            digests.setdefault(name, hashlib.sha256()).update(line)
+            counts[name] = counts.get(name, 0) + 1
+
+            if name != table or len(pending) >= self.batch_size:
+                self._flush(table, pending)
+                table, pending = name, []
+            pending.append(record['row'])
+        self._flush(table, pending)
+
+        if header is None:
+            raise RestoreError('Empty backup file.')
+        if manifest is None:
+            raise RestoreError('Backup has no manifest — the file is probably truncated.')
+        for name, expected in manifest.items():
+            got_rows = counts.get(name, 0)
+            got_sha = digests[name].hexdigest() if name in digests else hashlib.sha256().hexdigest()
+            if got_rows != expected['rows']:
+                raise RestoreError(f'Row count mismatch for {name}: expected {expected["rows"]}, got {got_rows}.')
+            if got_sha != expected['sha256']:
+                raise RestoreError(f'Checksum mismatch for {name} — the file was modified or corrupted.')
+        self.watermark = parse_datetime(header['watermark']) if header.get('watermark') else None
+        return header
+
+    def _check_header(self, record):
+        if record.get('type') != 'header':
+            raise RestoreError('Not a JSON Lines backup (missing header line).')
+        if not str(record.get('version', '')).startswith(SUPPORTED_MAJOR):
+            raise RestoreError(f'Unsupported backup version {record.get("version")}.')
+        if record.get('mode', 'full') == 'full' and self.watermark is not None:
+            raise RestoreError('A full backup must be the first file; incrementals go after it.')
+        if record.get('mode') == 'incremental' and self.watermark is not None:
+            since = parse_datetime(record['since'])
+            if since > self.watermark:
+                raise RestoreError(
+                    f'Gap in the backup chain: this incremental starts at {record["since"]} but '
+                    f'the previous file ends at {self.watermark.isoformat()}.'
+                )
+        return record
+
+    # --- batches ---
+
+    def _flush(self, table, rows):
+        if not rows:
+            return
+        started = time.perf_counter()
+        if table == 'tombstones':
+            self._apply_tombstones(rows)
+        elif table == 'users':
+            self._load_users(rows)
+        else:
+            self._load_rows(table, rows)
+        stats = self.stats.setdefault(table, {'rows': 0, 'skipped': 0, 'seconds': 0.0})
+        stats['rows'] += len(rows)
+        stats['seconds'] += time.perf_counter() - started
+
+    def _load_users(self, rows):
+        User = self.user_model
+        objs = []
+        for row in rows:
+            row = dict(row)
+            row.pop('id', None)
+            objs.append(User(password=make_password(None), **row))
+        update_fields = [f for f in rows[0] if f not in ('id', 'username')]
+        User.objects.bulk_create(
+            objs, update_conflicts=True, unique_fields=['username'], update_fields=update_fields,
+        )
+        _restore_timestamps(User, 'username', rows)
+        self._resolve_usernames({row['username'] for row in rows}, refresh=True)
+
+    def _load_rows(self, table, rows):
+        model = self.models[table]
+        fk_fields = {
+            f.attname: f for f in model._meta.concrete_fields if isinstance(f, models.ForeignKey)
+        }
+
+        # username refs → user ids
+        usernames = set()
+        for row in rows:
+            usernames.update(v for k, v in row.items() if k.endswith('__username') and v)
+        if table == 'audit_logs':
+            usernames.update(row['username'] for row in rows if row.get('username'))
+        self._resolve_usernames(usernames)
+
+        # existing FK targets, one query per FK column per batch
+        existing = {}
+        for attname, field in fk_fields.items():
+            if field.related_model is self.user_model or attname not in rows[0]:
+                continue
+            ids = {row[attname] for row in rows if row.get(attname) is not None}
+            existing[attname] = set(
+                field.related_model.objects.filter(pk__in=ids).values_list('pk', flat=True)
+            ) if ids else set()
+
+        objs = []
+        loaded = []
+        skipped = 0
+        for row in rows:
+            values = {}
+            for key, value in row.items():
+                if key.endswith('__username'):
+                    key, value = f'{key[:-len("__username")]}_id', self.user_ids.get(value)
+                elif key in existing and value is not None and value not in existing[key]:
+                    value = None
+                values[key] = value
+            if table == 'audit_logs':
+                values['user_id'] = self.user_ids.get(row.get('username'))
+            if any(values.get(a) is None and not f.null for a, f in fk_fields.items() if a in values):
+                skipped += 1  # required parent is missing
+                continue
+            objs.append(model(**values))
+            loaded.append(row)
+
+        if objs:
+            # get_field() accepts attnames too, kaya pwede yung row keys as-is
+            update_fields = [k for k in values if k != 'id']
+            model.objects.bulk_create(
+                objs, update_conflicts=True, unique_fields=['id'], update_fields=update_fields,
+            )
+            _restore_timestamps(model, 'id', loaded)
+        if skipped:
+            self.stats.setdefault(table, {'rows': 0, 'skipped': 0, 'seconds': 0.0})['skipped'] += skipped
+
+    def _resolve_usernames(self, usernames, refresh=False):
+        missing = usernames if refresh else {u for u in usernames if u not in self.user_ids}
+        if not missing:
+            return
+        found = dict(self.user_model.objects.filter(username__in=missing).values_list('username', 'id'))
+        self.user_ids.update(found)
+        self.touched_user_ids.update(found.values())
+
+    def _apply_tombstones(self, rows):
+        User = self.user_model
+        with suspend_tombstones():
+            by_table = {}
+            for row in rows:
+                by_table.setdefault(row['table'], []).append(row)
+            for table, group in by_table.items():
+                if table == 'users':
+                    # username lang yung portable; date_joined guard para hindi
+                    # madelete yung bagong account na may parehong username
+                    match = Q()
+                    for row in group:
+                        match |= Q(username=row['key'], date_joined__lt=parse_datetime(row['deleted_at']))
+                    doomed = list(User.objects.filter(match).values_list('pk', flat=True))
+                    User.objects.filter(pk__in=doomed).delete()
+                    self.touched_user_ids.update(doomed)
+                elif table in self.models:
+                    self.models[table].objects.filter(pk__in=[row['object_id'] for row in group]).delete()
+                self.tombstones_applied += len(group)
+
+    # --- after all files ---
+
+    def finish(self):
+        statements = connection.ops.sequence_reset_sql(no_style(), list(self.models.values()))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+def restore_backups(fileobjs, batch_size=1000, dry_run=False):
+    """Restore one or more backup files in order (full first, then incrementals).
+
+    Returns a summary dict; raises ``RestoreError`` (and rolls back) on any
+    inconsistency. ``dry_run`` does the whole load, then rolls back."""
+    loader = BackupLoader(batch_size=batch_size)
+    started = time.perf_counter()
+    headers = []
+    with transaction.atomic():
+        for fileobj in fileobjs:
+            headers.append(loader.load(fileobj))
+        loader.finish()
+        if dry_run:
+            transaction.set_rollback(True)
+    if not dry_run:
+        invalidate_user_cache(loader.touched_user_ids)
+
+    seconds = time.perf_counter() - started
+    total = sum(s['rows'] for name, s in loader.stats.items() if name != 'tombstones')
+    return {
+        'files': [
+            {'mode': h.get('mode', 'full'), 'exportedAt': h.get('exported_at'), 'watermark': h.get('watermark')}
+            for h in headers
+        ],
+        'tables': {
+            name: {'rows': s['rows'], 'skipped': s['skipped'], 'seconds': round(s['seconds'], 3)}
+            for name, s in loader.stats.items()
+        },
+        'tombstonesApplied': loader.tombstones_applied,
+        'totalRows': total,
+        'seconds': round(seconds, 3),
+        'rowsPerSecond': round(total / seconds) if seconds else total,
+        'dryRun': dry_run,
+    }
@@ -35,6 +35,21 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.avatar.url
 
 
+class LoginSerializer(serializers.Serializer):
+    """Login input — email (what the frontend sends) or username, plus password."""
+
+    email = serializers.CharField(required=False, allow_blank=True)
+    username = serializers.CharField(required=False, allow_blank=True)
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+
+    def validate(self, attrs):
+        attrs['email'] = attrs.get('email', '').strip().lower()
+        attrs['username'] = attrs.get('username', '').strip()
+        if not attrs['email'] and not attrs['username']:
+            raise serializers.ValidationError({'email': 'This field is required.'})
+        return attrs
+
+
 class RegisterSerializer(serializers.ModelSerializer):
 
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -126,12 +141,9 @@ class ChangePasswordSerializer(serializers.Serializer):
         # Invalidate all existing refresh tokens for this user (S9)
         # so stolen/leaked tokens can't be used after a password change.
         try:
-            from rest_framework_simplejwt.token_blacklist.models import (
-                OutstandingToken, BlacklistedToken,
-            )
-            tokens = OutstandingToken.objects.filter(user=user)
-            for token in tokens:
-                BlacklistedToken.objects.get_or_create(token=token)
+            # one INSERT ... SELECT instead of a get_or_create per token
+            from .tokens import blacklist_user_tokens
+            blacklist_user_tokens(user)
         except Exception:
             pass  # token_blacklist might not be fully configured — fail silently
 
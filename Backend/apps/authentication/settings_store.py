@@ -0,0 +1,110 @@
+"""
+DB-backed system settings with an in-process read cache.
+
+``get()`` is a dict lookup. At most once every ``SYSTEM_SETTINGS_POLL_MS``
+(default 1000) per process it also reads the ``_revision`` row — one
+primary-key SELECT — and reloads the whole (tiny) table only when another
+worker has written since. Writes bump ``_revision`` atomically with
+``F() + 1``, kaya consistent yung state across gunicorn workers and restarts
+nang hindi kailangan ng Redis.
+
+    from apps.authentication import settings_store
+    settings_store.get('history_clear_code', 'PLMun2025')
+    settings_store.set('history_clear_code', 'new-code', user=request.user)
+
+``revision()`` / ``bump()`` double as a cross-worker "something changed"
+signal for other in-process caches — the auth user cache
+(apps/authentication/backends.py) checks which users were invalidated only
+when the revision moves.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+REVISION_KEY = '_revision'
+
+_lock = threading.Lock()
+_values = {}
+_revision = None
+_next_check = 0.0  # monotonic deadline; checked on every read, kaya walang settings lookup sa fast path
+
+
+def _poll_interval():
+    return getattr(settings, 'SYSTEM_SETTINGS_POLL_MS', 1000) / 1000
+
+
+def _refresh(force=False):
+    global _revision, _next_check, _values
+    from .models import SystemSetting
+
+    with _lock:
+        if not force and _revision is not None and time.monotonic() < _next_check:
+            return
+        try:
+            current = SystemSetting.objects.filter(key=REVISION_KEY).values_list('revision', flat=True).first() or 0
+            if force or current != _revision:
+                rows = SystemSetting.objects.exclude(key=REVISION_KEY).values_list('key', 'value')
+                _values = dict(rows)
+                _revision = current
+        except DatabaseError:
+            # e.g. bago pa ma-migrate; keep whatever we had and retry next interval
+            logger.warning('System settings unavailable; using cached values', exc_info=True)
+        _next_check = time.monotonic() + _poll_interval()
+
+
+def get(key, default=None):
+    if _revision is None or time.monotonic() >= _next_check:
+        _refresh()
+    value = _values.get(key)
+    return default if value is None else value
+
+
+def revision():
+    """The shared revision as this process last saw it (same polling as ``get``)."""
+    if _revision is None or time.monotonic() >= _next_check:
+        _refresh()
+    return _revision
+
+
+def _bump():
+    from .models import SystemSetting
+
+    SystemSetting.objects.get_or_create(key=REVISION_KEY)
+    SystemSetting.objects.filter(key=REVISION_KEY).update(revision=F('revision') + 1)
+    return SystemSetting.objects.values_list('revision', flat=True).get(key=REVISION_KEY)
+
+
+def bump():
+    """Move the shared revision without writing a setting, para makita ng
+    lahat ng workers (within one poll interval) that something changed.
+    Returns the new revision; call inside the transaction that writes the change."""
+    with transaction.atomic():
+        revision = _bump()
+    transaction.on_commit(lambda: _refresh(force=True))
+    return revision
+
+
+def set(key, value, user=None):
+    """Write a setting and bump the shared revision (visible to every worker
+    within one poll interval, and immediately in this process)."""
+    from .models import SystemSetting
+
+    with transaction.atomic():
+        revision = _bump()
+        SystemSetting.objects.update_or_create(
+            key=key, defaults={'value': value, 'revision': revision, 'updated_by': user},
+        )
+    transaction.on_commit(lambda: _refresh(force=True))
+
+
+def invalidate():
+    """Force a reload on the next read (tests, shell)."""
+    global _revision
+    _revision = None
@@ -0,0 +1,114 @@
+"""
+Deletion tombstones para sa incremental backups.
+
+An incremental backup only exports rows whose ``updated_at`` moved past the
+previous watermark — a hard-deleted row just disappears, so the restore side
+would never learn about it. Deletes of backed-up models run inside
+``collect_tombstones()``, which writes a ``DeletionTombstone`` for every row
+removed (including the ones Django cascades) in the same transaction, with
+one ``bulk_create``. Every API and admin delete path goes through it.
+
+The ``post_delete`` receivers are only connected while a
+``collect_tombstones()`` block is running. A connected receiver turns off
+Django's fast delete (per-row DELETE + signal instead of one DELETE ...
+WHERE) for every cascade, kaya hindi sila naka-connect globally; deletes
+in other threads during that time just aren't recorded.
+
+``suspend_tombstones()`` turns recording off, e.g. while a restore applies
+deletes that already came from a backup.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+
+_suspended = ContextVar('tombstones_suspended', default=False)
+_batch = ContextVar('tombstone_batch', default=None)
+
+TRACKED = {}  # filled by connect()
+
+_listeners_lock = threading.Lock()
+_listeners = 0  # open collect_tombstones() blocks, all threads
+
+
+def _tracked_models():
+    """model → (backup table name, natural key attribute or None)."""
+    from apps.inventory.models import Item
+    from apps.requests.models import (
+        Request, RequestBatch, Comment, Notification, Reservation, WaitlistEntry,
+    )
+    from .models import User
+
+    return {
+        User: ('users', 'username'),
+        Item: ('inventory', None),
+        RequestBatch: ('request_batches', None),
+        Request: ('requests', None),
+        Reservation: ('reservations', None),
+        WaitlistEntry: ('waitlist', None),
+        Comment: ('comments', None),
+        Notification: ('notifications', None),
+    }
+
+
+def _record(sender, instance, **kwargs):
+    batch = _batch.get()
+    if batch is None or _suspended.get():
+        return  # a delete in another thread while some collect_tombstones() is open
+    from .models import DeletionTombstone
+
+    table, key_attr = TRACKED[sender]
+    batch.append(DeletionTombstone(
+        table=table,
+        object_id=instance.pk,
+        key=getattr(instance, key_attr) if key_attr else '',
+    ))
+
+
+def connect():
+    """Called from ``AuthenticationConfig.ready()``. Only registers the models;
+    the receivers are connected by ``collect_tombstones()``."""
+    TRACKED.update(_tracked_models())
+
+
+def _listen(on):
+    global _listeners
+    with _listeners_lock:
+        _listeners += 1 if on else -1
+        if _listeners != (1 if on else 0):
+            return
+        for model in TRACKED:
+            uid = f'tombstone_{model._meta.label_lower}'
+            if on:
+                post_delete.connect(_record, sender=model, dispatch_uid=uid)
+            else:
+                post_delete.disconnect(sender=model, dispatch_uid=uid)
+
+
+@contextmanager
+def collect_tombstones():
+    """Run deletes atomically and write their tombstones in one bulk insert."""
+    from .models import DeletionTombstone
+
+    batch = []
+    token = _batch.set(batch)
+    _listen(True)
+    try:
+        with transaction.atomic():
+            yield
+            DeletionTombstone.objects.bulk_create(batch, batch_size=500)
+    finally:
+        _listen(False)
+        _batch.reset(token)
+
+
+@contextmanager
+def suspend_tombstones():
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
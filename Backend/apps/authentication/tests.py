@@ -0,0 +1,403 @@
+from datetime import date, datetime, timedelta
+from io import BytesIO, StringIO
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps import ratelimit
+from apps.inventory.models import Item
+from apps.requests.models import Notification, Request, Reservation
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import backends, maintenance, settings_store
+from .audit_archive import archive_month, archive_tables
+from .backup import stream_backup
+from .restore import restore_backups
+from .models import AuditLog, DeletionTombstone, SystemSetting, User, UserCacheVersion
+from .signals import collect_tombstones
+from .tokens import blacklist_user_tokens, prune_expired_tokens
+
+
+def _local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ArchiveMonthBoundsTests(TestCase):
+    """Rows in the first hours of a local month are still UTC-previous-month."""
+
+    def _log(self, when):
+        return AuditLog.objects.create(action=AuditLog.OTHER, username='archiver', timestamp=when)
+
+    def _archived_ids(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {connection.ops.quote_name(table)}')
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_early_morning_row_goes_to_its_local_month(self):
+        early = self._log(_local(2026, 3, 1, 3, 0))
+        late_feb = self._log(_local(2026, 2, 28, 23, 0))
+        april = self._log(_local(2026, 4, 1, 0, 0))
+
+        self.assertEqual(archive_month(date(2026, 3, 1)), 1)
+        self.assertEqual(self._archived_ids('audit_logs_202603'), {early.id})
+        self.assertEqual(set(AuditLog.objects.values_list('id', flat=True)), {late_feb.id, april.id})
+
+    def test_command_archives_early_morning_row_and_stops(self):
+        row = self._log(_local(2025, 1, 1, 3, 0))
+
+        out = StringIO()
+        call_command('archive_audit_logs', keep_months=1, retain_months=0, stdout=out, stderr=StringIO())
+
+        self.assertIn('Archived 1 row(s) from 2025-01', out.getvalue())
+        self.assertFalse(AuditLog.objects.filter(id=row.id).exists())
+        self.assertIn(date(2025, 1, 1), archive_tables())
+
+
+class TombstoneTests(TestCase):
+    """Receivers only exist inside collect_tombstones(), kaya fast delete stays on elsewhere."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='borrower', email='borrower@example.com', password=None)
+        self.item = Item.objects.create(name='Tripod', quantity=2)
+        self.request = Request.objects.create(item=self.item, item_name='Tripod', requested_by=self.user,
+                                              quantity=1, purpose='Shoot')
+
+    def test_no_receivers_outside_collect(self):
+        self.assertFalse(post_delete.has_listeners(Request))
+        with collect_tombstones():
+            self.assertTrue(post_delete.has_listeners(Request))
+        self.assertFalse(post_delete.has_listeners(Request))
+
+        Request.objects.filter(pk=self.request.pk).delete()
+        self.assertFalse(DeletionTombstone.objects.exists())
+
+    def test_collect_records_cascades(self):
+        item_id = self.item.pk
+        with collect_tombstones():
+            self.item.delete()
+
+        self.assertEqual(
+            set(DeletionTombstone.objects.values_list('table', 'object_id')),
+            {('inventory', item_id), ('requests', self.request.pk)},
+        )
+
+
+class RestoreTimestampTests(TestCase):
+    """Restored rows keep their backed-up created_at/updated_at; auto_now is left alone."""
+
+    def test_restore_keeps_original_timestamps(self):
+        created, updated = _local(2025, 6, 1, 8, 0), _local(2025, 6, 2, 9, 30)
+        user = User.objects.create_user(username='restored', email='restored@example.com', password=None)
+        item = Item.objects.create(name='Camera', quantity=1)
+        User.objects.filter(pk=user.pk).update(updated_at=updated)
+        Item.objects.filter(pk=item.pk).update(created_at=created, updated_at=updated)
+        backup = b''.join(stream_backup('tester'))
+        Item.objects.filter(pk=item.pk).delete()
+        User.objects.filter(pk=user.pk).update(updated_at=timezone.now())
+
+        restore_backups([BytesIO(backup)])
+
+        item = Item.objects.get(pk=item.pk)
+        self.assertEqual((item.created_at, item.updated_at), (created, updated))
+        self.assertEqual(User.objects.get(username='restored').updated_at, updated)
+
+        # auto_now still works for everything else afterwards
+        item.save()
+        self.assertGreater(Item.objects.get(pk=item.pk).updated_at, updated)
+
+
+class RestoreReservationLinkTests(TestCase):
+
+    def test_fulfilled_reservation_keeps_its_request(self):
+        user = User.objects.create_user(username='prof', email='prof@example.com', password=None)
+        item = Item.objects.create(name='Projector', quantity=1)
+        req = Request.objects.create(item=item, item_name='Projector', requested_by=user, quantity=1, purpose='Class')
+        reservation = Reservation.objects.create(
+            item=item, reserved_by=user, quantity=1, status=Reservation.Status.FULFILLED, request=req,
+            start_time=_local(2026, 3, 2, 8, 0), end_time=_local(2026, 3, 2, 10, 0),
+        )
+        backup = b''.join(stream_backup('tester'))
+        Reservation.objects.filter(pk=reservation.pk).update(request=None)
+
+        restore_backups([BytesIO(backup)])
+
+        self.assertEqual(Reservation.objects.get(pk=reservation.pk).request_id, req.pk)
+
+
+class RateLimitTests(SimpleTestCase):
+    """Sliding window counter (apps/ratelimit.py), against the real counter store."""
+
+    WINDOW_START = 60 * 28_000_000  # start of a one-minute window
+
+    def setUp(self):
+        self.key = f'__test__:{uuid4().hex}'
+        self.addCleanup(ratelimit.get_backend().reset, self.key)
+
+    def _hits(self, count, at):
+        return [ratelimit.is_limited(self.key, '10/m', now=at) for _ in range(count)]
+
+    def test_limit_within_one_window(self):
+        self.assertEqual(self._hits(11, self.WINDOW_START + 5), [False] * 10 + [True])
+
+    def test_burst_across_window_edge_is_limited(self):
+        self.assertEqual(self._hits(10, self.WINDOW_START + 59.9), [False] * 10)
+        # new window, but nearly all of the previous one is still in range
+        self.assertTrue(ratelimit.is_limited(self.key, '10/m', now=self.WINDOW_START + 60.1))
+
+    def test_previous_window_weight_decays(self):
+        self._hits(10, self.WINDOW_START + 59.9)
+        # 90% into the next window: 1 + 10 * 0.1 counted
+        self.assertFalse(ratelimit.is_limited(self.key, '10/m', now=self.WINDOW_START + 114))
+
+
+class ClientIpTests(SimpleTestCase):
+
+    def _request(self, forwarded=None):
+        extra = {'HTTP_X_FORWARDED_FOR': forwarded} if forwarded is not None else {}
+        return RequestFactory().post('/api/auth/login/', REMOTE_ADDR='10.0.0.1', **extra)
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=0)
+    def test_header_ignored_without_trusted_proxies(self):
+        self.assertEqual(ratelimit._client_ip(self._request('203.0.113.7')), '10.0.0.1')
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=1)
+    def test_client_spoofed_entries_are_ignored(self):
+        self.assertEqual(ratelimit._client_ip(self._request('1.2.3.4, 203.0.113.7')), '203.0.113.7')
+        self.assertEqual(ratelimit._client_ip(self._request()), '10.0.0.1')
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=2)
+    def test_two_hops(self):
+        self.assertEqual(ratelimit._client_ip(self._request('1.2.3.4, 203.0.113.7, 198.51.100.2')), '203.0.113.7')
+
+
+class UserCacheInvalidationTests(TestCase):
+    """Invalidating one user leaves every other user's snapshot cached (LocMemCache, no Redis)."""
+
+    def setUp(self):
+        cache.clear()
+        settings_store.invalidate()
+        backends._seen_version = None
+        self.auth = backends.CachedJWTAuthentication()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password=None)
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password=None)
+
+    def _role(self, user):
+        return self.auth.get_user(AccessToken.for_user(user)).role
+
+    def _misses(self):
+        return backends.get_cache_stats()['misses']
+
+    def test_local_invalidation_keeps_other_snapshots(self):
+        self._role(self.alice), self._role(self.bob)
+        misses = self._misses()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            backends.invalidate_user_cache(self.alice.pk)
+        self._role(self.bob)
+        self.assertEqual(self._misses(), misses)
+        self._role(self.alice)
+        self.assertEqual(self._misses(), misses + 1)
+
+    def test_other_workers_invalidation_evicts_only_that_user(self):
+        self._role(self.alice), self._role(self.bob)
+        misses = self._misses()
+
+        # another worker promoted alice: its DB writes, none of its cache deletes
+        User.objects.filter(pk=self.alice.pk).update(role='ADMIN')
+        version = settings_store._bump()
+        UserCacheVersion.objects.create(user_id=self.alice.pk, version=version)
+        settings_store.invalidate()  # skip the poll wait
+
+        self.assertEqual(self._role(self.alice), 'ADMIN')
+        self.assertEqual(self._misses(), misses + 1)
+        self._role(self.bob)
+        self.assertEqual(self._misses(), misses + 1)
+
+
+class TokenBlacklistTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password=None)
+        self.other = User.objects.create_user(username='other', email='other@example.com', password=None)
+
+    def _outstanding(self, user, expires_in):
+        now = timezone.now()
+        return OutstandingToken.objects.create(user=user, jti=uuid4().hex, token='-', created_at=now,
+                                               expires_at=now + expires_in)
+
+    def test_blacklists_only_the_users_valid_tokens(self):
+        already = self._outstanding(self.user, timedelta(days=1))
+        BlacklistedToken.objects.create(token=already)
+        valid = self._outstanding(self.user, timedelta(days=1))
+        self._outstanding(self.user, timedelta(days=-1))
+        self._outstanding(self.other, timedelta(days=1))
+
+        self.assertEqual(blacklist_user_tokens(self.user), 1)
+        self.assertEqual(set(BlacklistedToken.objects.values_list('token_id', flat=True)), {already.pk, valid.pk})
+        self.assertEqual(blacklist_user_tokens(self.user), 0)
+
+    def test_issued_refresh_token_stops_working(self):
+        refresh = RefreshToken.for_user(self.user)
+
+        blacklist_user_tokens(self.user)
+
+        with self.assertRaises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_prune_deletes_expired_in_batches(self):
+        expired = [self._outstanding(self.user, timedelta(hours=-h)) for h in range(1, 6)]
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=t) for t in expired[:3]])
+        valid = self._outstanding(self.user, timedelta(days=1))
+        BlacklistedToken.objects.create(token=valid)
+
+        # oldest first, and max_batches stops early
+        self.assertEqual(prune_expired_tokens(batch_size=2, max_batches=1), (2, 0))
+        self.assertEqual(prune_expired_tokens(batch_size=2), (3, 3))
+        self.assertEqual(list(OutstandingToken.objects.values_list('pk', flat=True)), [valid.pk])
+        self.assertTrue(BlacklistedToken.objects.filter(token=valid).exists())
+
+
+class MaintenanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        settings_store.invalidate()
+        self.addCleanup(settings_store.invalidate)
+        self.student = User.objects.create_user(username='stud', email='stud@example.com', password=None)
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password=None, role='STAFF')
+
+    def _enable(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            maintenance.enable(30)
+
+    def _post(self, path, user=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+        return self.client.post(path, {}, content_type='application/json', **headers)
+
+    def test_status_etag_and_304(self):
+        first = self.client.get(maintenance.STATUS_PATH)
+        self.assertEqual(first.json(), {'enabled': False, 'endTime': 0})
+        self.assertEqual(first['Cache-Control'], f'private, max-age={maintenance.STATUS_MAX_AGE}')
+
+        again = self.client.get(maintenance.STATUS_PATH, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+        self._enable()
+        changed = self.client.get(maintenance.STATUS_PATH, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertTrue(changed.json()['enabled'])
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_writes_below_staff_get_503(self):
+        self._enable()
+
+        blocked = self._post('/api/requests/batches/', self.student)
+        self.assertEqual(blocked.status_code, 503)
+        self.assertEqual(blocked.json()['code'], 'MAINTENANCE')
+        self.assertGreater(int(blocked['Retry-After']), 0)
+        self.assertEqual(self._post('/api/requests/batches/').status_code, 503)
+
+        # staff writes, login and reads still go through
+        self.assertNotEqual(self._post('/api/requests/batches/', self.staff).status_code, 503)
+        self.assertNotEqual(self._post('/api/auth/login/').status_code, 503)
+        token = AccessToken.for_user(self.student)
+        self.assertEqual(self.client.get('/api/requests/batches/', HTTP_AUTHORIZATION=f'Bearer {token}').status_code, 200)
+
+    def test_expired_window_reads_as_off(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_store.set(maintenance.SETTING_KEY, {'enabled': True, 'endTime': 1, 'version': 1})
+
+        self.assertFalse(maintenance.get_state()['enabled'])
+        self.assertNotEqual(self._post('/api/requests/batches/', self.student).status_code, 503)
+
+
+class HeartbeatTests(TestCase):
+    """An idle tab's heartbeat is a 304 until something it shows changes."""
+
+    def setUp(self):
+        settings_store.invalidate()
+        self.addCleanup(settings_store.invalidate)
+        self.user = User.objects.create_user(username='stud', email='stud@example.com', password=None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _beat(self, etag=None):
+        return self.client.get('/api/session/heartbeat/', **({'HTTP_IF_NONE_MATCH': etag} if etag else {}))
+
+    def test_unchanged_state_is_304(self):
+        first = self._beat()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+        again = self._beat(first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_new_and_read_notifications_change_the_etag(self):
+        first = self._beat()
+        notification = Notification.objects.create(recipient=self.user, type='STATUS_CHANGE', message='Approved')
+
+        second = self._beat(first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['notifications']['unreadCount'], 1)
+        self.assertNotEqual(second.data['notifications']['version'], first.data['notifications']['version'])
+
+        Notification.objects.filter(pk=notification.pk).update(is_read=True, updated_at=timezone.now())
+        third = self._beat(second['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.data['notifications']['unreadCount'], 0)
+
+    def test_own_pending_request_changes_the_etag(self):
+        first = self._beat()
+        item = Item.objects.create(name='Tripod', quantity=1)
+        Request.objects.create(item=item, item_name='Tripod', requested_by=self.user, quantity=1, purpose='Shoot')
+
+        second = self._beat(first['ETag'])
+        self.assertEqual((second.status_code, second.data['pendingRequests']), (200, 1))
+
+
+@override_settings(SYSTEM_SETTINGS_POLL_MS=60_000)
+class SettingsStoreRevisionTests(TestCase):
+    """Another worker's write shows up here once the poll interval is up, via the _revision row."""
+
+    def setUp(self):
+        settings_store.invalidate()
+        self.addCleanup(settings_store.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_store.set('history_clear_code', 'first')
+
+    def _other_process_sets(self, value):
+        SystemSetting.objects.filter(key='history_clear_code').update(value=value)
+        SystemSetting.objects.filter(key=settings_store.REVISION_KEY).update(revision=F('revision') + 1)
+
+    def _poll_interval_passes(self):
+        settings_store._next_check = 0
+
+    def test_remote_write_seen_after_poll(self):
+        self._other_process_sets('second')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(settings_store.get('history_clear_code'), 'first')
+        self._poll_interval_passes()
+        self.assertEqual(settings_store.get('history_clear_code'), 'second')
+
+    def test_unchanged_revision_is_one_query(self):
+        self._poll_interval_passes()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(settings_store.get('history_clear_code'), 'first')
+
+    def test_local_write_visible_immediately(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_store.set('history_clear_code', 'mine')
+
+        self.assertEqual(settings_store.get('history_clear_code'), 'mine')
@@ -0,0 +1,64 @@
+"""
+Set-based helpers para sa simplejwt token blacklist tables.
+
+With ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION every /token/refresh/
+adds an OutstandingToken and a BlacklistedToken row, and nothing upstream
+prunes them except ``flushexpiredtokens`` (one giant DELETE). Dito:
+
+- ``blacklist_user_tokens`` — one ``INSERT ... SELECT ... ON CONFLICT DO
+  NOTHING`` instead of a get_or_create per token (works on PostgreSQL and
+  SQLite 3.24+).
+- ``prune_expired_tokens`` — deletes expired tokens in small batches so a
+  long backlog never holds a big lock; see the ``prune_tokens`` command.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+
+def blacklist_user_tokens(user):
+    """Blacklist every still-valid refresh token of ``user``. Returns rows inserted.
+    Expired tokens are skipped — invalid na sila anyway."""
+    qn = connection.ops.quote_name
+    blacklisted = BlacklistedToken._meta
+    outstanding = OutstandingToken._meta
+    sql = (
+        f'INSERT INTO {qn(blacklisted.db_table)} ({qn("token_id")}, {qn("blacklisted_at")}) '
+        f'SELECT {qn("id")}, %s FROM {qn(outstanding.db_table)} '
+        f'WHERE {qn("user_id")} = %s AND {qn("expires_at")} > %s '
+        f'ON CONFLICT ({qn("token_id")}) DO NOTHING'
+    )
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [now, user.pk, now])
+        return cursor.rowcount
+
+
+def prune_expired_tokens(batch_size=1000, max_batches=None):
+    """Delete expired outstanding tokens (and their blacklist rows) batch by batch.
+    Each batch is its own short transaction. Returns (outstanding, blacklisted) deleted."""
+    now = timezone.now()
+    deleted_outstanding = deleted_blacklisted = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        # expires_at range scan, see token_outstanding_expires_idx
+        ids = list(
+            OutstandingToken.objects
+            .filter(expires_at__lte=now)
+            .order_by('expires_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            # cascade → one DELETE ... IN on the blacklist, then the tokens
+            _, per_model = OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted_outstanding += per_model.get(OutstandingToken._meta.label, 0)
+        deleted_blacklisted += per_model.get(BlacklistedToken._meta.label, 0)
+        batches += 1
+        if len(ids) < batch_size:
+            break
+
+    return deleted_outstanding, deleted_blacklisted
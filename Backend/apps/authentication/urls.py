@@ -8,8 +8,12 @@ from .views import (
     ChangePasswordView,
     ProfilePictureView,
     BackupView,
+    RestoreView,
     AuditLogView,
     MaintenanceView,
+    UserCacheStatsView,
+    SecuritySummaryView,
+    SlowQueryView,
 )
 
 urlpatterns = [
@@ -27,9 +31,13 @@ urlpatterns = [
 
 
     path('backup/', BackupView.as_view(), name='backup'),
+    path('restore/', RestoreView.as_view(), name='restore'),
 
 
     path('audit-logs/', AuditLogView.as_view(), name='audit_logs'),
+    path('security-summary/', SecuritySummaryView.as_view(), name='security_summary'),
+    path('user-cache-stats/', UserCacheStatsView.as_view(), name='user_cache_stats'),
+    path('slow-queries/', SlowQueryView.as_view(), name='slow_queries'),
 
     # System maintenance
     path('maintenance/', MaintenanceView.as_view(), name='maintenance'),
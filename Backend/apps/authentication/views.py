@@ -5,61 +5,39 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 
 from .serializers import (
     UserSerializer,
+    LoginSerializer,
     RegisterSerializer,
     ProfileUpdateSerializer,
     ChangePasswordSerializer,
 )
-from .models import AuditLog, log_action
+from . import audit, maintenance
+from .backends import get_cache_stats, invalidate_user_cache
+from .models import AuditLog, log_action, snapshot_fields, field_changes
 from apps.permissions import IsAdmin
+from apps.ratelimit import ratelimit
 
 User = get_user_model()
 
 
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    """Adds user data to the JWT token response."""
-
-    def validate(self, attrs):
-        data = super().validate(attrs)
-        # Update last_login since JWT auth doesn't trigger Django's login signal
-        from django.contrib.auth.models import update_last_login
-        update_last_login(None, self.user)
-        user_serializer = UserSerializer(self.user, context={'request': self.context['request']})
-        data['user'] = user_serializer.data
-        return data
-
-
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Login endpoint — rate-limited to 10 attempts/min per IP.
-    Accepts email or username + password."""
-    serializer_class = CustomTokenObtainPairSerializer
-
-    def get_serializer(self, *args, **kwargs):
-        """If request data has 'email' but no 'username', look up user and inject username."""
-        data = kwargs.get('data')
-        if data and 'email' in data and 'username' not in data:
-            data = data.copy()
-            email = data.pop('email', [''])[0] if hasattr(data, 'getlist') else data.pop('email', '')
-            if isinstance(email, list):
-                email = email[0] if email else ''
-            email = email.strip().lower()
-            if email:
-                try:
-                    user = User.objects.get(email__iexact=email)
-                    data['username'] = user.username
-                except User.DoesNotExist:
-                    # Let it pass through — serializer will fail with invalid credentials
-                    data['username'] = email
-            kwargs['data'] = data
-        return super().get_serializer(*args, **kwargs)
-
-    @method_decorator(ratelimit(key='ip', rate='10/m', method='POST', block=False))
+    Accepts email or username + password.
+
+    Dati apat na beses hinahanap yung user per login (email→username mapping,
+    deactivated check, simplejwt authenticate, tapos ulit para sa audit log)
+    plus a full save() for last_login. Ngayon isang SELECT lang: resolve the
+    user once, check the password, then one UPDATE for last_login, the
+    outstanding-token INSERT and the audit INSERT. Same responses as before."""
+    serializer_class = LoginSerializer
+
+    @method_decorator(ratelimit(key='ip', rate='10/m', method='POST'))
     def post(self, request, *args, **kwargs):
         was_limited = getattr(request, 'limited', False)
         if was_limited:
@@ -71,46 +49,64 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                 status=status.HTTP_429_TOO_MANY_REQUESTS
             )
 
-        # Check for deactivated account BEFORE JWT auth
-        # JWT returns the same "No active account" error for both wrong passwords
-        # and deactivated accounts, so we check first and return a distinct code.
-        email = request.data.get('email', '').strip().lower()
-        username = request.data.get('username', '').strip()
+        serializer = LoginSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data['email']
+        username = serializer.validated_data['username']
+        password = serializer.validated_data['password']
         lookup = username or email
-        if lookup:
-            try:
-                user_check = User.objects.get(email__iexact=lookup) if '@' in lookup else User.objects.get(username=lookup)
-                if not user_check.is_active:
-                    log_action(AuditLog.LOGIN_FAILED,
-                               details=f'Login attempt on deactivated account: {lookup}',
-                               request=request)
-                    return Response(
-                        {'detail': 'ACCOUNT_DEACTIVATED'},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-            except User.DoesNotExist:
-                pass  # let JWT handle "invalid credentials"
-
-        response = super().post(request, *args, **kwargs)
-
-        if response.status_code == 200:
-            # Successful login — user is in the response data
-            user_data = response.data.get('user', {})
-            username = user_data.get('username', request.data.get('username', ''))
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                user = None
-            log_action(AuditLog.LOGIN, user=user,
-                       details=f'Successful login from {request.META.get("REMOTE_ADDR", "")}',
-                       request=request)
+
+        # The one user lookup. Username wins if both are sent (same as before).
+        if username:
+            user = User.objects.filter(username=username).first()
         else:
-            # Failed login
+            user = User.objects.filter(email__iexact=email).first()
+
+        # Deactivated accounts get a distinct code so the frontend can say so
+        # (JWT returns the same "No active account" error for both cases).
+        if user is not None and not user.is_active:
             log_action(AuditLog.LOGIN_FAILED,
-                       details=f'Failed login attempt for: {request.data.get("email", request.data.get("username", "?"))}',
-                       request=request)
+                       details=f'Login attempt on deactivated account: {lookup}',
+                       request=request, obj=user)
+            return Response(
+                {'detail': 'ACCOUNT_DEACTIVATED'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
 
-        return response
+        if user is None:
+            # Run the hasher anyway para hindi ma-distinguish sa timing kung
+            # existing yung account (same as Django's ModelBackend)
+            User().set_password(password)
+            authenticated = False
+        else:
+            authenticated = user.check_password(password)
+
+        if not authenticated:
+            # obj=user kapag existing yung account para lumabas sa history niya
+            log_action(AuditLog.LOGIN_FAILED,
+                       details=f'Failed login attempt for: {lookup}',
+                       request=request, obj=user)
+            return Response(
+                {'detail': 'No active account found with the given credentials'},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        refresh = RefreshToken.for_user(user)
+
+        # Update last_login since JWT auth doesn't trigger Django's login signal.
+        # Plain UPDATE instead of save() — isang column lang naman.
+        user.last_login = timezone.now()
+        User.objects.filter(pk=user.pk).update(last_login=user.last_login, updated_at=user.last_login)
+
+        log_action(AuditLog.LOGIN, user=user,
+                   details=f'Successful login from {request.META.get("REMOTE_ADDR", "")}',
+                   request=request, obj=user)
+
+        return Response({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': UserSerializer(user, context={'request': request}).data,
+        })
 
 
 class RegisterView(generics.CreateAPIView):
@@ -121,7 +117,7 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = RegisterSerializer
 
-    @method_decorator(ratelimit(key='ip', rate='5/h', method='POST', block=False))
+    @method_decorator(ratelimit(key='ip', rate='5/h', method='POST'))
     def create(self, request, *args, **kwargs):
         # Block if rate-limited — prevents bot sign-up floods
         if getattr(request, 'limited', False):
@@ -129,7 +125,6 @@ class RegisterView(generics.CreateAPIView):
                 {'detail': 'Too many registration attempts. Please try again later.'},
                 status=status.HTTP_429_TOO_MANY_REQUESTS,
             )
-        from rest_framework_simplejwt.tokens import RefreshToken
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -138,7 +133,8 @@ class RegisterView(generics.CreateAPIView):
         # Audit
         log_action(AuditLog.REGISTER, user=user,
                    details=f'New account: {user.username} ({user.role})',
-                   request=request)
+                   request=request, obj=user,
+                   changes=snapshot_fields(user, ['username', 'email', 'role', 'department']))
 
         refresh = RefreshToken.for_user(user)
         user_serializer = UserSerializer(user, context={'request': request})
@@ -165,9 +161,11 @@ class ProfileView(APIView):
             partial=True,
         )
         serializer.is_valid(raise_exception=True)
+        before = snapshot_fields(request.user, ['first_name', 'last_name', 'department', 'phone', 'avatar'])
         serializer.save()
         log_action(AuditLog.PROFILE_UPDATE, user=request.user,
-                   details='Profile information updated', request=request)
+                   details='Profile information updated', request=request,
+                   obj=request.user, changes=field_changes(before, request.user))
         return Response(UserSerializer(request.user, context={'request': request}).data)
 
 
@@ -180,8 +178,9 @@ class ChangePasswordView(APIView):
         serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_user_cache(request.user.pk)
         log_action(AuditLog.PASSWORD_CHANGE, user=request.user,
-                   details='Password changed successfully', request=request)
+                   details='Password changed successfully', request=request, obj=request.user)
         return Response({'message': 'Password changed successfully'})
 
 
@@ -233,12 +232,37 @@ class ProfilePictureView(APIView):
         })
 
 
+def _parse_audit_bound(value, end_of_day=False):
+    """'2026-03-01' or an ISO datetime → aware datetime. A plain date used as
+    ``until`` means the whole day is included (next midnight, exclusive)."""
+    from datetime import datetime, time, timedelta
+    from django.utils.dateparse import parse_date, parse_datetime
+
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            if end_of_day:
+                day += timedelta(days=1)
+            parsed = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
 class AuditLogView(APIView):
-    """Admin-only listing of audit events. Supports ?limit= and ?action= filters."""
+    """Admin-only listing of audit events. Supports ?limit= and ?action= filters,
+    plus ?since=/?until= (ISO date or datetime) and ?object_type=&object_id= for
+    the history of one object — both are index range scans."""
 
     permission_classes = [IsAdmin]  # admin lang pwede dito
 
     def get(self, request):
+        audit.flush()  # include entries still waiting in this worker's buffer
 
         qs = AuditLog.objects.select_related('user').all()
 
@@ -251,6 +275,32 @@ class AuditLogView(APIView):
         if username_filter:
             qs = qs.filter(username__icontains=username_filter)
 
+        # Date range — uses audit_timestamp_idx (or the object history index)
+        for param, lookup in (('since', 'timestamp__gte'), ('until', 'timestamp__lt')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            bound = _parse_audit_bound(value, end_of_day=(param == 'until'))
+            if bound is None:
+                return Response(
+                    {'error': f'Invalid {param}. Use YYYY-MM-DD or an ISO datetime.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(**{lookup: bound})
+
+        # Per-object history — uses audit_object_history_idx
+        object_type = request.query_params.get('object_type')
+        if object_type:
+            qs = qs.filter(object_type=object_type.lower())
+            object_id = request.query_params.get('object_id', '')
+            if object_id:
+                if not object_id.isdigit():
+                    return Response(
+                        {'error': 'object_id must be a number'},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                qs = qs.filter(object_id=int(object_id))
+
         try:
             limit = min(int(request.query_params.get('limit', 50)), 200)
         except (ValueError, TypeError):
@@ -265,6 +315,9 @@ class AuditLogView(APIView):
                 'details':    log.details,
                 'ip_address': log.ip_address,
                 'timestamp':  log.timestamp.isoformat(),
+                'object_type': log.object_type or None,
+                'object_id':  log.object_id,
+                'changes':    log.changes,
             }
             for log in qs
         ]
@@ -273,6 +326,7 @@ class AuditLogView(APIView):
     def delete(self, request):
         """Admin-only: clear all audit log entries."""
 
+        audit.flush()
         count = AuditLog.objects.count()
         AuditLog.objects.all().delete()
 
@@ -282,79 +336,210 @@ class AuditLogView(APIView):
             user=request.user,
             details=f'Cleared {count} audit log entries',
             request=request,
+            changes={'deleted': count},
         )
 
         return Response({'message': f'Cleared {count} audit log entries.'})
 
 
-class BackupView(APIView):
-    """Dumps users, inventory, and requests as a downloadable JSON file.
-    Admin only."""
+class UserCacheStatsView(APIView):
+    """Admin-only: hit rate ng auth user cache (per worker process)."""
 
-    permission_classes = [IsAdmin]  # admin lang din
+    permission_classes = [IsAdmin]
 
     def get(self, request):
+        return Response(get_cache_stats())
 
-        import json
-        from django.http import HttpResponse
-        from django.utils import timezone
-        from apps.inventory.models import Item
-        from apps.requests.models import Request
-
-        items = list(Item.objects.values(
-            'id', 'name', 'category', 'quantity', 'status',
-            'location', 'description', 'access_level', 'is_returnable',
-            'borrow_duration', 'borrow_duration_unit', 'created_at', 'updated_at',
-        ))
-
-        requests_qs = list(Request.objects.values(
-            'id', 'item_name', 'quantity', 'status', 'priority', 'purpose',
-            'requested_by__username', 'approved_by__username',
-            'created_at', 'updated_at', 'expected_return', 'returned_at',
-        ))
-
-        users = list(User.objects.values(
-            'id', 'username', 'email', 'first_name', 'last_name',
-            'role', 'department', 'is_active', 'date_joined',
-        ))
-
-        backup_data = {
-            'exported_at': timezone.now().isoformat(),
-            'exported_by': request.user.username,
-            'version': '1.0.0',
-            'data': {
-                'users': users,
-                'inventory': items,
-                'requests': requests_qs,
-            },
+
+class SecuritySummaryView(APIView):
+    """Admin security overview galing sa daily rollups, hindi sa raw audit log.
+    ?days= (default 30, max 366)."""
+
+    permission_classes = [IsAdmin]
+
+    LOGIN_ACTIONS = {AuditLog.LOGIN, AuditLog.LOGIN_FAILED, AuditLog.LOGOUT}
+
+    def get(self, request):
+        from collections import Counter, defaultdict
+        from datetime import timedelta
+        from .audit_archive import daily_counts
+
+        try:
+            days = min(max(int(request.query_params.get('days', 30)), 1), 366)
+        except (ValueError, TypeError):
+            days = 30
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+
+        failed_per_day = Counter()
+        logins_per_day = Counter()
+        totals = Counter()
+        per_user = defaultdict(int)
+        for row in daily_counts(start, end):
+            totals[row['action']] += row['count']
+            if row['action'] == AuditLog.LOGIN_FAILED:
+                failed_per_day[row['date']] += row['count']
+            elif row['action'] == AuditLog.LOGIN:
+                logins_per_day[row['date']] += row['count']
+            elif row['user_id']:
+                per_user[row['user_id']] += row['count']
+
+        # "most active staff" = non-login actions by staff/admin accounts
+        staff = {
+            u['id']: u for u in User.objects.filter(
+                pk__in=per_user.keys(), role__in=['STAFF', 'ADMIN'],
+            ).values('id', 'username', 'first_name', 'last_name', 'role')
         }
+        most_active = sorted(
+            (
+                {
+                    'userId': user_id,
+                    'username': staff[user_id]['username'],
+                    'fullName': f"{staff[user_id]['first_name']} {staff[user_id]['last_name']}".strip(),
+                    'role': staff[user_id]['role'],
+                    'actions': count,
+                }
+                for user_id, count in per_user.items() if user_id in staff
+            ),
+            key=lambda entry: -entry['actions'],
+        )[:10]
+
+        dates = [start + timedelta(days=i) for i in range(days)]
+        return Response({
+            'since': start.isoformat(),
+            'until': end.isoformat(),
+            'failedLoginsPerDay': [{'date': d.isoformat(), 'count': failed_per_day[d]} for d in dates],
+            'loginsPerDay': [{'date': d.isoformat(), 'count': logins_per_day[d]} for d in dates],
+            'mostActiveStaff': most_active,
+            'totalsByAction': dict(totals),
+        })
+
+
+class SlowQueryView(APIView):
+    """Admin-only: slow query log grouped by normalized statement, worst total
+    time first (see config/slow_queries.py). ?route= filters by view, ?limit=
+    (default 25, max 100). Each group carries its latest sample with call
+    stack, EXPLAIN plan and params (empty unless SLOW_QUERY_PARAMS)."""
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        from django.conf import settings
+        from django.db.models import Avg, Count, Max, Sum
+        from .models import SlowQuery
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 25)), 1), 100)
+        except (ValueError, TypeError):
+            limit = 25
+        queries = SlowQuery.objects.all()
+        if request.query_params.get('route'):
+            queries = queries.filter(route=request.query_params['route'])
+
+        groups = list(
+            queries.values('fingerprint')
+            .annotate(count=Count('id'), total_ms=Sum('duration_ms'), avg_ms=Avg('duration_ms'),
+                      max_ms=Max('duration_ms'), last_seen=Max('captured_at'), latest_id=Max('id'))
+            .order_by('-total_ms')[:limit]
+        )
+        samples = SlowQuery.objects.in_bulk([g['latest_id'] for g in groups])
+        routes = {}
+        for row in (queries.filter(fingerprint__in=[g['fingerprint'] for g in groups])
+                    .values('fingerprint', 'route').annotate(count=Count('id')).order_by('-count')):
+            routes.setdefault(row['fingerprint'], []).append({'route': row['route'], 'count': row['count']})
+
+        def sample(q):
+            return {
+                'sql': q.sql, 'params': q.params, 'durationMs': q.duration_ms, 'route': q.route,
+                'path': q.path, 'stack': q.stack, 'plan': q.plan, 'capturedAt': q.captured_at,
+            }
+
+        return Response({
+            'thresholdMs': getattr(settings, 'SLOW_QUERY_MS', 0),
+            'kept': SlowQuery.objects.count(),
+            'groups': [
+                {
+                    'fingerprint': g['fingerprint'],
+                    'statement': samples[g['latest_id']].statement,
+                    'count': g['count'],
+                    'totalMs': round(g['total_ms'], 2),
+                    'avgMs': round(g['avg_ms'], 2),
+                    'maxMs': round(g['max_ms'], 2),
+                    'lastSeen': g['last_seen'],
+                    'routes': routes.get(g['fingerprint'], []),
+                    'latest': sample(samples[g['latest_id']]),
+                }
+                for g in groups
+            ],
+        })
 
-        # Convert datetime objects to strings for JSON serialization
-        def default_serializer(obj):
-            if hasattr(obj, 'isoformat'):
-                return obj.isoformat()
-            raise TypeError(f'Object of type {type(obj)} is not JSON serializable')
 
-        log_action(AuditLog.BACKUP, user=request.user,
-                   details='System backup exported', request=request)
+class BackupView(APIView):
+    """Streams a gzip-compressed JSON Lines backup of every table
+    (see apps/authentication/backup.py). Admin only.
+    ``?since=<watermark>`` exports only what changed since a previous backup."""
 
-        json_str = json.dumps(backup_data, default=default_serializer, indent=2)
-        filename = f"plmun_nexus_backup_{timezone.now().strftime('%Y%m%d_%H%M%S')}.json"
+    permission_classes = [IsAdmin]  # admin lang din
 
-        response = HttpResponse(json_str, content_type='application/json')
+    def get(self, request):
+        from django.http import StreamingHttpResponse
+        from .backup import stream_backup
+
+        since = None
+        if request.query_params.get('since'):
+            since = _parse_audit_bound(request.query_params['since'])
+            if since is None:
+                return Response({'error': 'Invalid since. Use the watermark from a previous backup (ISO datetime).'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        log_action(AuditLog.BACKUP, user=request.user, request=request,
+                   details='System backup exported' if since is None else f'Incremental backup exported (since {since.isoformat()})',
+                   changes={'mode': 'full' if since is None else 'incremental', 'since': since})
+        audit.flush()  # para kasama na yung entry na 'to sa audit_logs ng backup
+
+        kind = 'backup' if since is None else 'incremental'
+        filename = f"plmun_nexus_{kind}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        response = StreamingHttpResponse(stream_backup(request.user.username, since=since),
+                                         content_type='application/gzip')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         response['Access-Control-Expose-Headers'] = 'Content-Disposition'
         return response
 
 
+class RestoreView(APIView):
+    """Restores an uploaded backup (multipart ``file``; ``dryRun=true`` to
+    validate only). Same loader as ``manage.py restore_backup`` — see
+    apps/authentication/restore.py. Admin only."""
+
+    permission_classes = [IsAdmin]
+
+    def post(self, request):
+        from .restore import RestoreError, restore_backups
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Attach the backup as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dryRun', '')).lower() in ('1', 'true', 'yes')
+
+        try:
+            summary = restore_backups([upload], dry_run=dry_run)
+        except RestoreError as exc:
+            return Response({'error': f'Restore failed, nothing was changed: {exc}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not dry_run:
+            log_action(AuditLog.OTHER, user=request.user, request=request,
+                       details=f'Backup restored from {upload.name} ({summary["totalRows"]} rows)',
+                       changes={'tables': {name: t['rows'] for name, t in summary['tables'].items()}})
+        return Response(summary)
+
+
 class MaintenanceView(APIView):
     """Server-managed maintenance mode.
-    GET  → anyone authenticated can check status
+    GET  → anyone can check status (normally answered earlier by
+           MaintenanceMiddleware — this is the fallback)
     POST → admin-only: enable/disable with duration
-    Uses Django cache so state auto-expires and survives server restarts if
-    a persistent cache backend (Redis/Memcached) is configured."""
-
-    CACHE_KEY = 'plmun_maintenance'
+    State and enforcement live in apps/authentication/maintenance.py."""
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -362,32 +547,88 @@ class MaintenanceView(APIView):
         return [permissions.AllowAny()]
 
     def get(self, request):
-        from django.core.cache import cache
-        import time as _time
-        data = cache.get(self.CACHE_KEY)
-        if data and data.get('endTime', 0) > int(_time.time() * 1000):
-            return Response({'enabled': True, 'endTime': data['endTime']})
-        return Response({'enabled': False, 'endTime': 0})
+        state = maintenance.get_state()
+        return Response({'enabled': state['enabled'], 'endTime': state['endTime']})
 
     def post(self, request):
-        from django.core.cache import cache
-        import time
-
         enabled = request.data.get('enabled', False)
         duration_mins = int(request.data.get('durationMins', 30))
 
         if enabled:
-            end_time = int(time.time() * 1000) + duration_mins * 60 * 1000
-            # Cache TTL = duration + 1 minute buffer (in seconds)
-            cache.set(self.CACHE_KEY, {'enabled': True, 'endTime': end_time}, timeout=duration_mins * 60 + 60)
+            state = maintenance.enable(duration_mins, user=request.user)
             log_action(AuditLog.Action.OTHER, user=request.user,
                        details=f'Maintenance mode enabled for {duration_mins} minutes',
-                       request=request)
-            return Response({'enabled': True, 'endTime': end_time, 'message': f'Maintenance mode enabled for {duration_mins} minutes.'})
+                       request=request, changes={'enabled': True, 'duration_mins': duration_mins})
+            return Response({'enabled': True, 'endTime': state['endTime'], 'message': f'Maintenance mode enabled for {duration_mins} minutes.'})
         else:
-            cache.delete(self.CACHE_KEY)
+            maintenance.disable(user=request.user)
             log_action(AuditLog.Action.OTHER, user=request.user,
                        details='Maintenance mode disabled',
-                       request=request)
+                       request=request, changes={'enabled': False})
             return Response({'enabled': False, 'endTime': 0, 'message': 'Maintenance mode disabled.'})
 
+
+
+class SessionHeartbeatView(APIView):
+    """One poll for everything a logged-in tab watches: own flag/active state,
+    maintenance, notification unread count + version, and the pending request
+    count (same scoping as ``/api/requests/queue/``).
+
+    Supports ``If-None-Match`` → 304, kaya an idle tab costs one small request
+    per interval. ``poll`` carries the server-suggested next intervals (ms):
+    ``nextMs`` for a visible tab, ``hiddenMs`` for a background one.
+    ``notifications.version`` changes on any new, read or deleted
+    notification — refetch the list only when it does."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    NEXT_MS = 10_000
+    MAINTENANCE_NEXT_MS = 5_000  # mabilis para makita agad pag tapos na
+    HIDDEN_MS = 60_000
+
+    def get(self, request):
+        import hashlib
+        import json
+        from django.db.models import Count, Max, Q
+        from apps.requests.models import Notification, Request
+
+        user = request.user  # cached snapshot — walang query
+        notif = Notification.objects.filter(recipient=user).aggregate(
+            total=Count('id'),
+            unread=Count('id', filter=Q(is_read=False)),
+            latest_id=Max('id'),
+            changed=Max('updated_at'),
+        )
+        pending = Request.objects.filter(status='PENDING')
+        if not user.has_min_role('STAFF'):
+            pending = pending.filter(requested_by=user)
+        state = maintenance.get_state()
+
+        version = f"{notif['total']}-{notif['latest_id'] or 0}-{notif['changed'].timestamp() if notif['changed'] else 0}"
+        data = {
+            'user': {
+                'id': user.id,
+                'role': user.role,
+                'isActive': user.is_active,
+                'isFlagged': user.is_flagged,
+            },
+            'maintenance': {'enabled': state['enabled'], 'endTime': state['endTime']},
+            'notifications': {
+                'unreadCount': notif['unread'],
+                'version': hashlib.sha1(version.encode()).hexdigest()[:12],
+            },
+            'pendingRequests': pending.count(),
+            'poll': {
+                'nextMs': self.MAINTENANCE_NEXT_MS if state['enabled'] else self.NEXT_MS,
+                'hiddenMs': self.HIDDEN_MS,
+            },
+        }
+
+        etag = '"hb-%s"' % hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
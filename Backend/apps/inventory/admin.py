@@ -1,9 +1,10 @@
 from django.contrib import admin
+from apps.authentication.admin import TombstoneModelAdmin
 from .models import Item
 
 
 @admin.register(Item)
-class ItemAdmin(admin.ModelAdmin):
+class ItemAdmin(TombstoneModelAdmin):
     list_display = ('name', 'category', 'quantity', 'status', 'access_level', 'is_returnable')
     list_filter = ('category', 'status', 'access_level', 'is_returnable')
     search_fields = ('name', 'description', 'location')
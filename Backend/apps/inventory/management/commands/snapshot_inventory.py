@@ -0,0 +1,74 @@
+"""
+Management command: snapshot_inventory
+Nightly job — records each item's quantity and status into ItemDailySnapshot.
+Run-length encoded: items whose state didn't change since their last snapshot
+are skipped, so the table only grows on days something actually moved.
+
+Schedule once a day (cron / Render cron job):
+    python manage.py snapshot_inventory
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from apps.inventory.models import Item, ItemDailySnapshot
+
+
+class Command(BaseCommand):
+    help = 'Write one ItemDailySnapshot row per changed item for today (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per bulk_create statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        today = timezone.localdate()
+
+        # Latest snapshot per item in one query — uses the (item, date) unique index
+        latest = (
+            ItemDailySnapshot.objects
+            .filter(item=OuterRef('pk'), date__lte=today)
+            .order_by('-date')
+        )
+        items = (
+            Item.objects
+            .annotate(
+                last_quantity=Subquery(latest.values('quantity')[:1]),
+                last_status=Subquery(latest.values('status')[:1]),
+            )
+            .values_list('id', 'quantity', 'status', 'last_quantity', 'last_status')
+        )
+
+        scanned = 0
+        written = 0
+        batch = []
+        for item_id, quantity, item_status, last_quantity, last_status in items.iterator(chunk_size=batch_size):
+            scanned += 1
+            if quantity == last_quantity and item_status == last_status:
+                continue  # same as the previous run — nothing to encode
+            batch.append(ItemDailySnapshot(
+                item_id=item_id, date=today, quantity=quantity, status=item_status,
+            ))
+            if len(batch) >= batch_size:
+                written += self._flush(batch)
+                batch = []
+        if batch:
+            written += self._flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot for {today}: {written} changed item(s) written, '
+            f'{scanned - written} unchanged skipped.'
+        ))
+
+    def _flush(self, batch):
+        # update_conflicts para safe i-rerun sa parehong araw (overwrites today's row)
+        ItemDailySnapshot.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['item', 'date'],
+            update_fields=['quantity', 'status'],
+        )
+        return len(batch)
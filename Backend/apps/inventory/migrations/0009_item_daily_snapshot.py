@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_item_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemDailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('AVAILABLE', 'Available'), ('IN_USE', 'In Use'), ('MAINTENANCE', 'Maintenance'), ('RETIRED', 'Retired')], max_length=50)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_snapshots', to='inventory.item')),
+            ],
+            options={
+                'db_table': 'inventory_item_snapshots',
+                'ordering': ['item', 'date'],
+                'indexes': [models.Index(fields=['date'], name='inv_snapshot_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'date'), name='unique_item_snapshot_per_day')],
+            },
+        ),
+    ]
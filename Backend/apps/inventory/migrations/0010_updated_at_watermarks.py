@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_item_daily_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='item',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -100,7 +100,7 @@ class Item(models.Model):
         return unit_map.get(self.borrow_duration_unit)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # incremental backup watermark
 
     # Default is 5 — configurable via settings.LOW_STOCK_THRESHOLD
     @classmethod
@@ -125,3 +125,35 @@ class Item(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.category})"
+
+
+class ItemDailySnapshot(models.Model):
+    """Daily stock snapshot per item, para sa trend charts ng Dashboard/Reports.
+
+    Run-length encoded: the nightly ``snapshot_inventory`` job only writes a
+    row on days where an item's quantity or status actually changed, so a row
+    means "this was the state starting on ``date``" until the item's next row.
+    """
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name='daily_snapshots',
+    )
+    date = models.DateField()
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=50, choices=Item.Status.choices)
+
+    class Meta:
+        db_table = 'inventory_item_snapshots'
+        ordering = ['item', 'date']
+        constraints = [
+            # also serves as the (item, date) index for "latest row per item" lookups
+            models.UniqueConstraint(fields=['item', 'date'], name='unique_item_snapshot_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='inv_snapshot_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.date}: {self.quantity} ({self.status})"
@@ -1,3 +1,24 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.authentication.models import User
+
+
+class TrendsDateParamTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='staff', email='staff@example.com', password=None, role='STAFF')
+        )
+
+    def test_unparseable_dates_are_rejected(self):
+        for query in ('start=yesterday', 'end=2026-13-01', 'start=2026-02-30', 'end=06/01/2026'):
+            response = self.client.get(f'/api/inventory/trends/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('YYYY-MM-DD', response.data['detail'])
+
+    def test_missing_dates_use_the_default_range(self):
+        response = self.client.get('/api/inventory/trends/?start=')
+
+        self.assertEqual(response.status_code, 200, response.data)
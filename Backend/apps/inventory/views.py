@@ -6,7 +6,8 @@ from django.utils import timezone
 
 from .models import Item
 from .serializers import ItemSerializer, ItemCreateUpdateSerializer
-from apps.authentication.models import User, AuditLog, log_action
+from apps.authentication.models import User, AuditLog, log_action, snapshot_fields, field_changes
+from apps.authentication.signals import collect_tombstones
 from apps.permissions import IsStaffOrAbove, IsAdmin
 
 
@@ -35,7 +36,8 @@ class ItemViewSet(viewsets.ModelViewSet):
 
         log_action(AuditLog.ITEM_CREATED, user=request.user,
                    details=f'Created item "{item.name}" (category: {item.category}, qty: {item.quantity})',
-                   request=request)
+                   request=request, obj=item,
+                   changes=snapshot_fields(item, ['name', 'category', 'quantity', 'status', 'access_level']))
 
         return Response(
             ItemSerializer(item).data,
@@ -47,11 +49,12 @@ class ItemViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
+        before = snapshot_fields(instance, serializer.validated_data.keys())  # keys are model field names
         item = serializer.save()
 
         log_action(AuditLog.ITEM_UPDATED, user=request.user,
                    details=f'Updated item "{item.name}" (id: {item.id})',
-                   request=request)
+                   request=request, obj=item, changes=field_changes(before, item))
 
         return Response(ItemSerializer(item).data)
 
@@ -63,10 +66,15 @@ class ItemViewSet(viewsets.ModelViewSet):
 
         log_action(AuditLog.ITEM_DELETED, user=request.user,
                    details=f'Deleted item "{item_name}" (id: {item_id})',
-                   request=request)
+                   request=request, object_type='item', object_id=item_id,
+                   changes={'name': item_name})
 
         return response
 
+    def perform_destroy(self, instance):
+        with collect_tombstones():  # cascades to requests, reservations, waitlist
+            instance.delete()
+
     def get_queryset(self):
         """I-filter yung items base sa role ng user at query params."""
         queryset = Item.objects.select_related('status_changed_by').all()
@@ -122,6 +130,7 @@ class ItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        before = snapshot_fields(item, ['status', 'status_note', 'maintenance_eta'])
         old_status = item.status
         item.status = new_status
         item.status_note = note
@@ -141,10 +150,46 @@ class ItemViewSet(viewsets.ModelViewSet):
         log_action(AuditLog.ITEM_UPDATED, user=request.user,
                    details=f'Changed status of "{item.name}" from {old_status} to {new_status}'
                            f'{" — " + note if note else ""}',
-                   request=request)
+                   request=request, obj=item, changes=field_changes(before, item))
 
         return Response(ItemSerializer(item).data)
 
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """Ilang units ang free sa isang time window?
+        ?start=<ISO datetime>&end=<ISO datetime> — accounts for active
+        reservations and outstanding loans (see apps/requests/availability.py)."""
+        from django.utils.dateparse import parse_datetime
+        from apps.requests.availability import get_availability
+
+        item = self.get_object()
+        try:
+            start = parse_datetime(request.query_params.get('start', ''))
+            end = parse_datetime(request.query_params.get('end', ''))
+        except ValueError:
+            start = end = None
+        if not start or not end:
+            return Response(
+                {'detail': '"start" and "end" are required ISO datetimes.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        if end <= start:
+            return Response(
+                {'detail': '"end" must be after "start".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({
+            'item': item.id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            **get_availability(item, start, end),
+        })
+
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Kunin yung mga items na mababa na yung stock."""
@@ -183,6 +228,136 @@ class ItemViewSet(viewsets.ModelViewSet):
 
         return Response(stats)
 
+    # Max na range ng trends para di ma-abuse (isang taon + buffer)
+    TRENDS_MAX_DAYS = 400
+
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        """Daily stock trend from ItemDailySnapshot rows.
+        ?start=YYYY-MM-DD&end=YYYY-MM-DD (default: last 90 days), optional ?item=<id>.
+
+        Snapshots are run-length encoded, so we take each item's last row
+        before ``start`` as its opening state, then sweep the in-range rows
+        in date order carrying state forward — O(days + changed rows),
+        independent of how many items never moved."""
+        from datetime import timedelta
+        from django.db.models import OuterRef, Subquery
+        from django.utils.dateparse import parse_date
+        from .models import ItemDailySnapshot
+
+        def date_param(name):
+            # parse_date() returns None for a wrong format, kaya 'yesterday' would
+            # silently fall back to the default range
+            raw = request.query_params.get(name)
+            if not raw:
+                return None
+            value = parse_date(raw)
+            if value is None:
+                raise ValueError(raw)
+            return value
+
+        today = timezone.localdate()
+        try:
+            end = date_param('end') or today
+            start = date_param('start') or end - timedelta(days=89)
+        except ValueError:
+            return Response(
+                {'detail': 'Invalid date. Use YYYY-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start > end:
+            return Response(
+                {'detail': '"start" must be on or before "end".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if (end - start).days >= self.TRENDS_MAX_DAYS:
+            return Response(
+                {'detail': f'Date range cannot exceed {self.TRENDS_MAX_DAYS} days.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # role-scoped items (same rules as the list endpoint)
+        item_ids = self.get_queryset().values('id')
+        item_filter = request.query_params.get('item')
+        if item_filter:
+            if not item_filter.isdigit():
+                return Response(
+                    {'detail': '"item" must be an item id.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            item_ids = item_ids.filter(pk=item_filter)
+
+        # Opening state: latest snapshot strictly before the window
+        opening = (
+            ItemDailySnapshot.objects
+            .filter(item=OuterRef('pk'), date__lt=start)
+            .order_by('-date')
+        )
+        state = {
+            item_id: (qty, item_status)
+            for item_id, qty, item_status in (
+                Item.objects.filter(pk__in=item_ids)
+                .annotate(
+                    open_qty=Subquery(opening.values('quantity')[:1]),
+                    open_status=Subquery(opening.values('status')[:1]),
+                )
+                .filter(open_qty__isnull=False)
+                .values_list('id', 'open_qty', 'open_status')
+            )
+        }
+        changes = (
+            ItemDailySnapshot.objects
+            .filter(item_id__in=item_ids, date__gte=start, date__lte=end)
+            .order_by('date')
+            .values_list('date', 'item_id', 'quantity', 'status')
+            .iterator(chunk_size=2000)
+        )
+
+        # Running aggregates, updated incrementally per change
+        total_qty = 0
+        out_of_stock = 0
+        by_status = {s: 0 for s in Item.Status.values}
+
+        def apply(item_state, sign):
+            nonlocal total_qty, out_of_stock
+            qty, item_status = item_state
+            total_qty += sign * qty
+            by_status[item_status] = by_status.get(item_status, 0) + sign
+            if qty == 0:
+                out_of_stock += sign
+
+        for item_state in state.values():
+            apply(item_state, 1)
+
+        series = []
+        pending = next(changes, None)
+        day = start
+        while day <= end:
+            while pending is not None and pending[0] == day:
+                _, item_id, qty, item_status = pending
+                if item_id in state:
+                    apply(state[item_id], -1)
+                state[item_id] = (qty, item_status)
+                apply(state[item_id], 1)
+                pending = next(changes, None)
+            series.append({
+                'date': day.isoformat(),
+                'items': len(state),
+                'totalQuantity': total_qty,
+                'available': by_status['AVAILABLE'],
+                'inUse': by_status['IN_USE'],
+                'maintenance': by_status['MAINTENANCE'],
+                'retired': by_status['RETIRED'],
+                'outOfStock': out_of_stock,
+            })
+            day += timedelta(days=1)
+
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': series,
+        })
+
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
         """Combined dashboard endpoint — returns inventory stats, request stats,
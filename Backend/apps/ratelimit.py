@@ -0,0 +1,182 @@
+"""
+Rate limiting na shared ng lahat ng workers, kahit walang Redis.
+
+Dati ``django_ratelimit`` + the default cache. Without REDIS_URL that cache is
+a per-process LocMemCache, kaya yung "10/min" login limit was really 10/min
+per gunicorn worker (and the system check that warns about it was silenced).
+
+Dito, counters live in one place per machine:
+
+- no REDIS_URL → a small SQLite file in WAL mode (``RATELIMIT_DB_PATH``).
+  Each check is one atomic ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``
+  plus one primary-key read, on a connection kept open per worker thread —
+  tens of microseconds (``manage.py benchmark_ratelimit``).
+- REDIS_URL set → the shared cache (``cache.incr`` is atomic in Redis), so
+  limits also hold across machines.
+
+Algorithm: sliding window counter. Hits are counted per fixed window; the
+estimate is ``current + previous * (fraction of previous window still in
+range)``, so a burst at the edge of two windows can't get 2× the limit.
+If the counter store fails we log it and let the request through.
+
+``key='ip'`` uses REMOTE_ADDR, or X-Forwarded-For when the app runs behind
+``RATELIMIT_TRUSTED_PROXIES`` proxies (see ``_client_ip``).
+
+Usage (same shape as the django_ratelimit decorator it replaces):
+
+    @method_decorator(ratelimit(key='ip', rate='10/m', method='POST'))
+    def post(self, request, *args, **kwargs):
+        if getattr(request, 'limited', False):
+            ...
+"""
+
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+PURGE_EVERY = 1000  # hits per worker between deletes of old windows
+
+
+@functools.lru_cache(maxsize=None)
+def parse_rate(rate):
+    """``'10/m'`` → ``(10, 60)``; ``'100/5m'`` → ``(100, 300)``."""
+    count, _, period = rate.partition('/')
+    multiplier = int(period[:-1] or 1)
+    return int(count), multiplier * PERIODS[period[-1]]
+
+
+class SQLiteBackend:
+    """Counters in a WAL-mode SQLite file, shared by every process on the machine."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+
+    def _connection(self):
+        # keyed by pid too: a connection inherited across fork() must not be reused
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # counters lang ito; losing the last few on power loss is fine
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS hits ('
+                ' key TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL,'
+                ' expires REAL NOT NULL, PRIMARY KEY (key, window)) WITHOUT ROWID'
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, window, period):
+        """Count one hit; returns ``(current window count, previous window count)``."""
+        conn = self._connection()
+        current = conn.execute(
+            'INSERT INTO hits (key, window, count, expires) VALUES (?, ?, 1, ?) '
+            'ON CONFLICT (key, window) DO UPDATE SET count = count + 1 RETURNING count',
+            (key, window, (window + 2) * period),
+        ).fetchone()[0]
+        row = conn.execute('SELECT count FROM hits WHERE key = ? AND window = ?', (key, window - 1)).fetchone()
+
+        self._hits += 1
+        if self._hits % PURGE_EVERY == 0:
+            conn.execute('DELETE FROM hits WHERE expires < ?', (time.time(),))
+        return current, row[0] if row else 0
+
+    def reset(self, prefix):
+        self._connection().execute('DELETE FROM hits WHERE key LIKE ?', (f'{prefix}%',))
+
+
+class CacheBackend:
+    """Counters in the default cache — only shared when that cache is Redis."""
+
+    def hit(self, key, window, period):
+        from django.core.cache import cache
+
+        cache_key = f'rl:{key}:{window}'
+        cache.add(cache_key, 0, timeout=period * 2)
+        try:
+            current = cache.incr(cache_key)
+        except ValueError:  # expired between add() and incr()
+            cache.set(cache_key, 1, timeout=period * 2)
+            current = 1
+        return current, cache.get(f'rl:{key}:{window - 1}', 0)
+
+    def reset(self, prefix):
+        pass  # keys expire on their own
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if os.environ.get('REDIS_URL'):
+                    _backend = CacheBackend()
+                else:
+                    _backend = SQLiteBackend(settings.RATELIMIT_DB_PATH)
+    return _backend
+
+
+def is_limited(key, rate, now=None):
+    """Record one hit for ``key`` and say whether it is over ``rate``."""
+    limit, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window = int(now // period)
+    try:
+        current, previous = get_backend().hit(key, window, period)
+    except Exception:
+        logger.exception('Rate limit check failed for %s; allowing the request', key)
+        return False
+    elapsed = (now % period) / period
+    return current + previous * (1 - elapsed) > limit
+
+
+def _client_ip(request):
+    """Client address as seen by the outermost trusted proxy.
+
+    Behind Render's proxy REMOTE_ADDR is the proxy itself, kaya lahat ng
+    clients would share one bucket. Each proxy appends the address it saw to
+    X-Forwarded-For, so with ``RATELIMIT_TRUSTED_PROXIES`` hops the client is
+    that many entries from the right; anything further left is client-controlled.
+    """
+    hops = getattr(settings, 'RATELIMIT_TRUSTED_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '') if hops else ''
+    addresses = [a.strip() for a in forwarded.split(',') if a.strip()]
+    if not addresses:
+        return request.META.get('REMOTE_ADDR', '')
+    return addresses[-min(hops, len(addresses))]
+
+
+def ratelimit(key='ip', rate='10/m', method='POST'):
+    """Sets ``request.limited`` instead of blocking, so the view decides the response.
+
+    ``key`` is ``'ip'`` or a callable ``(request) -> str``; ``method`` is one
+    method or a tuple of them."""
+    methods = (method,) if isinstance(method, str) else tuple(method)
+
+    def decorator(view_func):
+        group = f'{view_func.__module__}.{view_func.__qualname__}'
+
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if getattr(settings, 'RATELIMIT_ENABLE', True) and request.method in methods:
+                ident = _client_ip(request) if key == 'ip' else key(request)
+                limited = is_limited(f'{group}:{ident}', rate)
+                request.limited = getattr(request, 'limited', False) or limited
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
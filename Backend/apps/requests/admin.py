@@ -1,23 +1,45 @@
 from django.contrib import admin
-from .models import Request, Comment, Notification
+from apps.authentication.admin import TombstoneModelAdmin
+from .models import Request, RequestBatch, Comment, Notification, Reservation, WaitlistEntry
 
 
 @admin.register(Request)
-class RequestAdmin(admin.ModelAdmin):
+class RequestAdmin(TombstoneModelAdmin):
     list_display = ('item_name', 'requested_by', 'status', 'priority', 'request_date')
     list_filter = ('status', 'priority')
     search_fields = ('item_name', 'purpose')
     ordering = ('-created_at',)
 
 
+@admin.register(RequestBatch)
+class RequestBatchAdmin(TombstoneModelAdmin):
+    list_display = ('id', 'requested_by', 'status', 'created_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+
+
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(TombstoneModelAdmin):
     list_display = ('request', 'author', 'created_at')
     ordering = ('-created_at',)
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(TombstoneModelAdmin):
     list_display = ('recipient', 'type', 'is_read', 'created_at')
     list_filter = ('type', 'is_read')
     ordering = ('-created_at',)
+
+
+@admin.register(Reservation)
+class ReservationAdmin(TombstoneModelAdmin):
+    list_display = ('item', 'reserved_by', 'quantity', 'start_time', 'end_time', 'status')
+    list_filter = ('status',)
+    ordering = ('-start_time',)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(TombstoneModelAdmin):
+    list_display = ('item', 'user', 'quantity', 'priority', 'status', 'created_at')
+    list_filter = ('status', 'priority')
+    ordering = ('created_at',)
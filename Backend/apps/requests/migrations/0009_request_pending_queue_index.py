@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_item_daily_snapshot'),
+        ('requests', '0008_reservation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['priority', 'created_at', 'id'], name='requests_pending_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_item_daily_snapshot'),
+        ('requests', '0010_request_batch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('purpose', models.TextField()),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High')], default='MEDIUM', max_length=20)),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('ALLOCATED', 'Allocated'), ('CANCELLED', 'Cancelled')], default='WAITING', max_length=20)),
+                ('allocated_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='inventory.item')),
+                ('request', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='requests.request')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'waitlist',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'WAITING')), fields=['item', 'created_at'], name='waitlist_waiting_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'WAITING')), fields=('item', 'user'), name='unique_waiting_entry_per_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0012_updated_at_watermarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='requests.request'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Active'), ('FULFILLED', 'Fulfilled'), ('CANCELLED', 'Cancelled')], default='ACTIVE', max_length=20),
+        ),
+    ]
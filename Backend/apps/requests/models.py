@@ -2,6 +2,50 @@ from django.db import models
 from django.conf import settings
 
 
+class RequestBatch(models.Model):
+    """Cart — isang borrow request na may maraming items (lines).
+    Each line is a normal Request row linked via ``batch``, pero yung
+    approve/reject ay all-or-nothing sa buong cart.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        APPROVED = 'APPROVED', 'Approved'
+        REJECTED = 'REJECTED', 'Rejected'
+        CANCELLED = 'CANCELLED', 'Cancelled'
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='request_batches',
+    )
+    purpose = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    approved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='approved_batches',
+    )
+    approved_at = models.DateTimeField(null=True, blank=True)
+    rejection_reason = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # incremental backup watermark
+
+    class Meta:
+        db_table = 'request_batches'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Cart #{self.pk} - {self.requested_by.get_full_name()} ({self.status})"
+
+
 class Request(models.Model):
     """Borrow request model.
     Medyo maraming fields 'to pero kailangan yung bawat isa para
@@ -69,17 +113,35 @@ class Request(models.Model):
     rejection_reason = models.TextField(blank=True)
     returned_at = models.DateTimeField(null=True, blank=True)
 
+    # Set when the request is a line of a multi-item cart
+    batch = models.ForeignKey(
+        RequestBatch,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='lines',
+    )
+
     # Soft-delete: cleared requests stay in DB for reports/charts
     # but are hidden from the active requests list.
     is_cleared = models.BooleanField(default=False)
 
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'requests'
         ordering = ['-created_at']
+        indexes = [
+            # Staff approval queue (/api/requests/queue/): only PENDING rows,
+            # walked per priority bucket in (created_at, id) order
+            models.Index(
+                fields=['priority', 'created_at', 'id'],
+                condition=models.Q(status='PENDING'),
+                name='requests_pending_queue_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.item_name} - {self.requested_by.get_full_name()} ({self.status})"
@@ -100,7 +162,7 @@ class Comment(models.Model):
         related_name='comments',
     )
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # comments are never edited; backup watermark
 
     class Meta:
         db_table = 'request_comments'
@@ -149,6 +211,7 @@ class Notification(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'notifications'
@@ -157,3 +220,139 @@ class Notification(models.Model):
     def __str__(self):
         return f"Notification for {self.recipient.get_full_name()}: {self.message[:50]}"
 
+
+
+class Reservation(models.Model):
+    """Advance booking ng item para sa future time window
+    (e.g. projector para sa klase next week).
+    Hindi nito binabawasan yung Item.quantity — availability for a window is
+    computed from overlapping reservations + outstanding loans, see
+    apps/requests/availability.py. When the same user's borrow request is
+    approved inside the window, the booking becomes FULFILLED and the loan
+    takes its place.
+    """
+
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', 'Active'
+        FULFILLED = 'FULFILLED', 'Fulfilled'
+        CANCELLED = 'CANCELLED', 'Cancelled'
+
+    item = models.ForeignKey(
+        'inventory.Item',
+        on_delete=models.CASCADE,
+        related_name='reservations',
+    )
+    reserved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    purpose = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+    )
+    # the borrow request that used this booking (approved inside its window)
+    request = models.ForeignKey(
+        Request,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reservations',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = 'reservations'
+        ordering = ['start_time']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F('start_time')),
+                name='reservation_end_after_start',
+            ),
+        ]
+        indexes = [
+            # Overlap lookups are "item = X AND end_time > t1 AND start_time < t2"
+            # on active rows only — range scan on end_time, start_time checked in-index
+            models.Index(
+                fields=['item', 'end_time', 'start_time'],
+                condition=models.Q(status='ACTIVE'),
+                name='reservations_active_window_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} x{self.quantity} {self.start_time:%Y-%m-%d %H:%M}–{self.end_time:%H:%M} ({self.status})"
+
+
+class WaitlistEntry(models.Model):
+    """Pila para sa out-of-stock items.
+    Pag may nag-return, yung freed units ay ina-allocate agad sa susunod
+    na nasa pila (HIGH priority muna, tapos first-come first-served) in the
+    same transaction, so waiters get notified instead of polling.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = 'WAITING', 'Waiting'
+        ALLOCATED = 'ALLOCATED', 'Allocated'
+        CANCELLED = 'CANCELLED', 'Cancelled'
+
+    item = models.ForeignKey(
+        'inventory.Item',
+        on_delete=models.CASCADE,
+        related_name='waitlist',
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    purpose = models.TextField()
+    priority = models.CharField(
+        max_length=20,
+        choices=Request.Priority.choices,
+        default=Request.Priority.MEDIUM,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.WAITING,
+    )
+    # the borrow request created when units were allocated
+    request = models.OneToOneField(
+        Request,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='waitlist_entry',
+    )
+    allocated_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = 'waitlist'
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['item', 'user'],
+                condition=models.Q(status='WAITING'),
+                name='unique_waiting_entry_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['item', 'created_at'],
+                condition=models.Q(status='WAITING'),
+                name='waitlist_waiting_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} waiting for {self.item_id} x{self.quantity} ({self.status})"
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.utils import timezone
 from django.utils.html import strip_tags
 from typing import Optional
-from .models import Request, Comment, Notification
+from .models import Request, RequestBatch, Comment, Notification, Reservation, WaitlistEntry
 from apps.authentication.serializers import UserSerializer
 
 
@@ -142,6 +142,101 @@ class RequestCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class BatchLineSerializer(serializers.ModelSerializer):
+    """Compact line view para sa cart — walang nested comments."""
+
+    itemName = serializers.CharField(source='item_name', read_only=True)
+    expectedReturn = serializers.DateTimeField(source='expected_return', read_only=True)
+    returnedAt = serializers.DateTimeField(source='returned_at', read_only=True)
+
+    class Meta:
+        model = Request
+        fields = ['id', 'item', 'itemName', 'quantity', 'status', 'priority', 'expectedReturn', 'returnedAt']
+        read_only_fields = fields
+
+
+class RequestBatchSerializer(serializers.ModelSerializer):
+
+    requestedBy = serializers.SerializerMethodField()
+    requestedById = serializers.IntegerField(source='requested_by_id', read_only=True)
+    approvedBy = serializers.SerializerMethodField()
+    approvedAt = serializers.DateTimeField(source='approved_at', read_only=True)
+    rejectionReason = serializers.CharField(source='rejection_reason', read_only=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    lines = BatchLineSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = RequestBatch
+        fields = [
+            'id', 'requestedBy', 'requestedById', 'purpose', 'status',
+            'approvedBy', 'approvedAt', 'rejectionReason', 'createdAt', 'lines',
+        ]
+        read_only_fields = fields
+
+    def get_requestedBy(self, obj) -> str:
+        return obj.requested_by.get_full_name() or obj.requested_by.username
+
+    def get_approvedBy(self, obj) -> Optional[str]:
+        if obj.approved_by:
+            return obj.approved_by.get_full_name() or obj.approved_by.username
+        return None
+
+
+class BatchLineCreateSerializer(serializers.Serializer):
+
+    # plain id (not PrimaryKeyRelatedField) para isang in_bulk lang for all lines
+    item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class RequestBatchCreateSerializer(serializers.Serializer):
+
+    MAX_LINES = 50
+
+    purpose = serializers.CharField()
+    expectedReturn = serializers.DateTimeField(source='expected_return', required=False, allow_null=True)
+    items = BatchLineCreateSerializer(many=True)
+
+    def validate_purpose(self, value):
+        """Strip HTML tags to prevent stored XSS."""
+        return strip_tags(value).strip()
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError('Cart must have at least one item.')
+        if len(value) > self.MAX_LINES:
+            raise serializers.ValidationError(f'Cart cannot have more than {self.MAX_LINES} lines.')
+        return value
+
+    def validate(self, attrs):
+        """Resolve all items in one query and check stock per item (summed across lines)."""
+        from collections import Counter
+        from apps.inventory.models import Item
+
+        lines = attrs['items']
+        items = Item.objects.in_bulk({line['item'] for line in lines})
+        missing = sorted({line['item'] for line in lines} - items.keys())
+        if missing:
+            raise serializers.ValidationError({'items': f'Unknown item id(s): {missing}'})
+
+        user = self.context['request'].user
+        wanted = Counter()
+        for line in lines:
+            item = items[line['item']]
+            if not user.has_min_role(item.access_level):
+                raise serializers.ValidationError({'items': f'You do not have access to "{item.name}".'})
+            wanted[item.pk] += line['quantity']
+        for item_id, quantity in wanted.items():
+            item = items[item_id]
+            if quantity > item.quantity:
+                raise serializers.ValidationError({
+                    'items': f'Only {item.quantity} "{item.name}" available in stock. You requested {quantity}.'
+                })
+
+        attrs['resolved_items'] = items
+        return attrs
+
+
 class RequestActionSerializer(serializers.Serializer):
     """Approve/reject payload — just an optional reason."""
 
@@ -170,3 +265,109 @@ class NotificationSerializer(serializers.ModelSerializer):
             return obj.request.item_name
         return None
 
+
+class ReservationSerializer(serializers.ModelSerializer):
+
+    itemName = serializers.CharField(source='item.name', read_only=True)
+    reservedBy = serializers.SerializerMethodField()
+    reservedById = serializers.IntegerField(source='reserved_by_id', read_only=True)
+    startTime = serializers.DateTimeField(source='start_time', read_only=True)
+    endTime = serializers.DateTimeField(source='end_time', read_only=True)
+    requestId = serializers.IntegerField(source='request_id', read_only=True, allow_null=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = [
+            'id', 'item', 'itemName', 'reservedBy', 'reservedById', 'quantity',
+            'startTime', 'endTime', 'purpose', 'status', 'requestId', 'createdAt',
+        ]
+        read_only_fields = fields
+
+    def get_reservedBy(self, obj) -> str:
+        return obj.reserved_by.get_full_name() or obj.reserved_by.username
+
+
+class ReservationCreateSerializer(serializers.ModelSerializer):
+
+    startTime = serializers.DateTimeField(source='start_time')
+    endTime = serializers.DateTimeField(source='end_time')
+
+    class Meta:
+        model = Reservation
+        fields = ['item', 'quantity', 'startTime', 'endTime', 'purpose']
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Quantity must be at least 1.')
+        return value
+
+    def validate_purpose(self, value):
+        """Strip HTML tags to prevent stored XSS."""
+        if value:
+            return strip_tags(value).strip()
+        return value
+
+    def validate(self, attrs):
+        if attrs['end_time'] <= attrs['start_time']:
+            raise serializers.ValidationError({'endTime': 'End time must be after start time.'})
+        if attrs['end_time'] <= timezone.now():
+            raise serializers.ValidationError({'endTime': 'Reservation window is already over.'})
+        user = self.context['request'].user
+        if not user.has_min_role(attrs['item'].access_level):
+            raise serializers.ValidationError({'item': 'You do not have access to this item.'})
+        return attrs
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+
+    itemName = serializers.CharField(source='item.name', read_only=True)
+    userName = serializers.SerializerMethodField()
+    userId = serializers.IntegerField(source='user_id', read_only=True)
+    requestId = serializers.IntegerField(source='request_id', read_only=True)
+    allocatedAt = serializers.DateTimeField(source='allocated_at', read_only=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'item', 'itemName', 'userName', 'userId', 'quantity', 'purpose',
+            'priority', 'status', 'requestId', 'allocatedAt', 'createdAt',
+        ]
+        read_only_fields = fields
+
+    def get_userName(self, obj) -> str:
+        return obj.user.get_full_name() or obj.user.username
+
+
+class WaitlistJoinSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['item', 'quantity', 'purpose']
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Quantity must be at least 1.')
+        return value
+
+    def validate_purpose(self, value):
+        """Strip HTML tags to prevent stored XSS."""
+        if value:
+            return strip_tags(value).strip()
+        return value
+
+    def validate(self, attrs):
+        item = attrs['item']
+        user = self.context['request'].user
+        if not user.has_min_role(item.access_level):
+            raise serializers.ValidationError({'item': 'You do not have access to this item.'})
+        if item.status == 'RETIRED':
+            raise serializers.ValidationError({'item': 'This item has been retired.'})
+        if attrs.get('quantity', 1) <= item.quantity:
+            raise serializers.ValidationError({
+                'item': f'{item.quantity} in stock right now — submit a request instead.'
+            })
+        if WaitlistEntry.objects.filter(item=item, user=user, status='WAITING').exists():
+            raise serializers.ValidationError({'item': 'You are already on the waitlist for this item.'})
+        return attrs
@@ -1,3 +1,251 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.inventory.models import Item
+from .models import Request, Reservation, WaitlistEntry
+from .views import _allocate_waitlist
+
+
+class ApproveWithReservationTests(TestCase):
+    """A borrower's own booking covering now is used by their loan, not held against it."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='STAFF')
+        self.faculty = User.objects.create_user(username='prof', email='prof@example.com', password='x', role='FACULTY')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='x', role='FACULTY')
+        self.item = Item.objects.create(name='Projector', quantity=1)
+        now = timezone.now()
+        self.reservation = Reservation.objects.create(
+            item=self.item, reserved_by=self.faculty, quantity=1,
+            start_time=now - timedelta(minutes=10), end_time=now + timedelta(hours=2),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def _approve(self, borrower):
+        req = Request.objects.create(item=self.item, item_name=self.item.name, requested_by=borrower,
+                                     quantity=1, purpose='Class')
+        return req, self.client.post(f'/api/requests/{req.pk}/approve/')
+
+    def test_owner_can_borrow_inside_their_window(self):
+        req, response = self._approve(self.faculty)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, Reservation.Status.FULFILLED)
+        self.assertEqual(self.reservation.request_id, req.pk)
+
+    def test_someone_else_is_still_refused(self):
+        req, response = self._approve(self.other)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reservations', response.data['error'])
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, Reservation.Status.ACTIVE)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 1)
+
+
+class PartialReservationUseTests(TestCase):
+    """A loan smaller than the booking uses only its own units; the rest stays held."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='STAFF')
+        self.faculty = User.objects.create_user(username='prof', email='prof@example.com', password='x', role='FACULTY')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='x', role='FACULTY')
+        self.item = Item.objects.create(name='Laptop', quantity=3)
+        now = timezone.now()
+        self.reservation = Reservation.objects.create(
+            item=self.item, reserved_by=self.faculty, quantity=3,
+            start_time=now - timedelta(minutes=10), end_time=now + timedelta(hours=2),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def _approve(self, borrower):
+        req = Request.objects.create(item=self.item, item_name=self.item.name, requested_by=borrower,
+                                     quantity=1, purpose='Class')
+        return req, self.client.post(f'/api/requests/{req.pk}/approve/')
+
+    def test_booking_is_split(self):
+        req, response = self._approve(self.faculty)
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.quantity), (Reservation.Status.ACTIVE, 2))
+        self.assertIsNone(self.reservation.request_id)
+        used = Reservation.objects.get(request=req)
+        self.assertEqual((used.status, used.quantity), (Reservation.Status.FULFILLED, 1))
+
+        # the two units still booked are held against everyone else
+        _, response = self._approve(self.other)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reservations', response.data['error'])
+
+    def test_remaining_units_fulfilled_by_later_loans(self):
+        for _ in range(3):
+            _, response = self._approve(self.faculty)
+            self.assertEqual(response.status_code, 200, response.data)
+
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.quantity), (Reservation.Status.FULFILLED, 1))
+        self.assertEqual(Reservation.objects.filter(status=Reservation.Status.FULFILLED).count(), 3)
+        self.assertFalse(Reservation.objects.filter(status=Reservation.Status.ACTIVE).exists())
+
+
+class CartApproveTests(TestCase):
+    """RequestBatchViewSet.approve: every line or none, one conditional stock UPDATE."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='STAFF')
+        self.student = User.objects.create_user(username='stud', email='stud@example.com', password='x')
+        self.camera = Item.objects.create(name='Camera', quantity=2)
+        self.tripod = Item.objects.create(name='Tripod', quantity=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        response = self.client.post('/api/requests/batches/', {
+            'purpose': 'Thesis shoot',
+            'items': [{'item': self.camera.pk, 'quantity': 2}, {'item': self.tripod.pk, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.batch_id = response.data['id']
+        self.client.force_authenticate(self.staff)
+
+    def _approve(self):
+        return self.client.post(f'/api/requests/batches/{self.batch_id}/approve/')
+
+    def test_all_lines_approved_with_one_stock_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._approve()
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(set(Request.objects.filter(batch_id=self.batch_id).values_list('status', flat=True)), {'APPROVED'})
+        self.camera.refresh_from_db(), self.tripod.refresh_from_db()
+        self.assertEqual((self.camera.quantity, self.camera.status), (0, 'IN_USE'))
+        self.assertEqual(self.tripod.quantity, 2)
+        stock_updates = [q['sql'] for q in queries.captured_queries
+                         if q['sql'].startswith('UPDATE "inventory_items" SET "quantity"')]
+        self.assertEqual(len(stock_updates), 1)
+        self.assertIn('"quantity" >=', stock_updates[0])
+
+    def test_short_item_rolls_back_every_line(self):
+        Item.objects.filter(pk=self.camera.pk).update(quantity=1)  # someone else borrowed one meanwhile
+
+        response = self._approve()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('"Camera" (1 available, 2 requested)', response.data['error'])
+        self.assertEqual(set(Request.objects.filter(batch_id=self.batch_id).values_list('status', flat=True)), {'PENDING'})
+        self.assertEqual(self.client.get(f'/api/requests/batches/{self.batch_id}/').data['status'], 'PENDING')
+        self.tripod.refresh_from_db()
+        self.assertEqual(self.tripod.quantity, 3)
+
+    def test_second_approve_is_refused(self):
+        self.assertEqual(self._approve().status_code, 200)
+
+        response = self._approve()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Item.objects.get(pk=self.tripod.pk).quantity, 2)
+
+
+class QueuePagingTests(TestCase):
+    """/queue/ walks HIGH → MEDIUM → LOW, oldest first (id breaks ties), with keyset cursors."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', email='staff@example.com', password='x', role='STAFF')
+        self.student = User.objects.create_user(username='stud', email='stud@example.com', password='x')
+        item = Item.objects.create(name='Cable', quantity=10)
+        now = timezone.now()
+        self.expected = []
+        # (priority, minutes ago); the two MEDIUM rows at the same instant tie on created_at
+        for priority, ago in (('LOW', 50), ('MEDIUM', 30), ('HIGH', 5), ('MEDIUM', 30), ('HIGH', 40), ('LOW', 1)):
+            req = Request.objects.create(item=item, item_name='Cable', requested_by=self.student,
+                                         quantity=1, purpose='Lab', priority=priority)
+            Request.objects.filter(pk=req.pk).update(created_at=now - timedelta(minutes=ago))
+            self.expected.append((['HIGH', 'MEDIUM', 'LOW'].index(priority), -ago, req.pk))
+        self.expected = [pk for *_, pk in sorted(self.expected)]
+        Request.objects.create(item=item, item_name='Cable', requested_by=self.student,
+                               quantity=1, purpose='Done', status='APPROVED')
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_pages_cover_the_queue_in_order(self):
+        seen, cursor = [], None
+        while True:
+            url = '/api/requests/queue/?limit=4' + (f'&cursor={cursor}' if cursor else '')
+            data = self.client.get(url).data
+            self.assertLessEqual(len(data['results']), 4)
+            seen.extend(r['id'] for r in data['results'])
+            cursor = data['next']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(data['byPriority'], {'HIGH': 2, 'MEDIUM': 2, 'LOW': 2})
+
+    def test_page_boundary_inside_a_tie(self):
+        first = self.client.get('/api/requests/queue/?limit=3').data
+        second = self.client.get(f'/api/requests/queue/?limit=3&cursor={first["next"]}').data
+
+        self.assertEqual([r['id'] for r in first['results'] + second['results']], self.expected)
+        self.assertIsNone(second['next'])
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get('/api/requests/queue/?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_counts_only(self):
+        data = self.client.get('/api/requests/queue/?limit=0').data
+
+        self.assertEqual((data['count'], data['results'], data['next']), (6, [], None))
+
+
+class WaitlistAllocationTests(TestCase):
+    """Freed stock goes HIGH → MEDIUM → LOW, oldest first, and stops at the first waiter that doesn't fit."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'u{i}', email=f'u{i}@example.com', password=None)
+            for i in range(4)
+        ]
+        self.item = Item.objects.create(name='Microphone', quantity=0)
+        self.now = timezone.now()
+
+    def _wait(self, user, priority, quantity, minutes_ago):
+        entry = WaitlistEntry.objects.create(item=self.item, user=user, quantity=quantity,
+                                             purpose='Event', priority=priority)
+        WaitlistEntry.objects.filter(pk=entry.pk).update(created_at=self.now - timedelta(minutes=minutes_ago))
+        return entry
+
+    def _free(self, quantity):
+        Item.objects.filter(pk=self.item.pk).update(quantity=quantity)
+        return [entry.pk for entry in _allocate_waitlist(self.item.pk, self.now)]
+
+    def test_priority_then_age(self):
+        low = self._wait(self.users[0], 'LOW', 1, 60)
+        high_new = self._wait(self.users[1], 'HIGH', 1, 5)
+        medium = self._wait(self.users[2], 'MEDIUM', 1, 30)
+        high_old = self._wait(self.users[3], 'HIGH', 1, 20)
+
+        self.assertEqual(self._free(3), [high_old.pk, high_new.pk, medium.pk])
+        self.assertEqual(WaitlistEntry.objects.get(pk=low.pk).status, 'WAITING')
+        allocated = WaitlistEntry.objects.get(pk=high_old.pk)
+        self.assertEqual((allocated.status, allocated.request.status), ('ALLOCATED', 'APPROVED'))
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.quantity, self.item.status), (0, 'IN_USE'))
+
+    def test_head_of_queue_is_not_skipped(self):
+        head = self._wait(self.users[0], 'HIGH', 3, 30)
+        self._wait(self.users[1], 'HIGH', 1, 10)
 
-# Create your tests here.
+        self.assertEqual(self._free(2), [])
+        self.assertEqual(self._free(3), [head.pk])
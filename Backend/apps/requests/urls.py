@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import RequestViewSet, NotificationViewSet
+from .views import RequestViewSet, NotificationViewSet, ReservationViewSet, RequestBatchViewSet, WaitlistViewSet
 
 router = DefaultRouter()
 router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'reservations', ReservationViewSet, basename='reservation')
+router.register(r'batches', RequestBatchViewSet, basename='request-batch')
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 router.register(r'', RequestViewSet, basename='request')
 
 urlpatterns = [
@@ -1,10 +1,15 @@
+import base64
+import binascii
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, F
+from django.db import transaction
+from django.db.models import Q, F, Prefetch
 from django.utils import timezone
 
-from .models import Request, Comment, Notification
+from .availability import get_availability, held_reservations
+from .models import Request, RequestBatch, Comment, Notification, Reservation, WaitlistEntry
 from .serializers import (
     RequestSerializer,
     RequestCreateSerializer,
@@ -12,9 +17,19 @@ from .serializers import (
     CommentSerializer,
     CommentCreateSerializer,
     NotificationSerializer,
+    ReservationSerializer,
+    ReservationCreateSerializer,
+    RequestBatchSerializer,
+    RequestBatchCreateSerializer,
+    WaitlistEntrySerializer,
+    WaitlistJoinSerializer,
 )
+from apps.authentication.backends import invalidate_user_cache
 from apps.authentication.models import User, AuditLog, log_action
-from apps.permissions import IsStaffOrAbove
+from apps.authentication import settings_store
+from apps.authentication.signals import collect_tombstones
+from apps.permissions import IsStaffOrAbove, IsFacultyOrAbove
+from config import metrics
 
 
 # helper para di mag-spam ng duplicate notifications
@@ -30,6 +45,186 @@ def _format_overdue_duration(overdue_delta):
         return f'{total_minutes // 60} hour(s)'
     return f'{overdue_delta.days} day(s)'
 
+# Approval queue order: HIGH first, then MEDIUM, then LOW; oldest first within each
+QUEUE_PRIORITY_ORDER = ['HIGH', 'MEDIUM', 'LOW']
+
+
+def _encode_queue_cursor(req):
+    raw = f'{req.priority}|{req.created_at.isoformat()}|{req.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_queue_cursor(cursor):
+    """Returns (priority, created_at, id) or None if the cursor is malformed."""
+    from django.utils.dateparse import parse_datetime
+    try:
+        priority, created_at, req_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created_at = parse_datetime(created_at)
+        if priority not in QUEUE_PRIORITY_ORDER or created_at is None:
+            return None
+        return priority, created_at, int(req_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def _apply_approval(req, item, approver, now):
+    """Set the approved state on ``req`` (doesn't save or touch stock).
+    Shared by single approve, cart approve and waitlist allocation."""
+    req.approved_by = approver
+    req.approved_at = now
+    req.updated_at = now  # explicit kasi bulk_update doesn't run auto_now
+
+    # pag consumable (di returnable), auto-complete na agad
+    # kasi wala namang ibabalik eh
+    if not item.is_returnable:
+        req.status = 'COMPLETED'
+    else:
+        req.status = 'APPROVED'
+        # Auto-calculate expected return from item's borrow duration
+        if item.borrow_duration:
+            delta = item.get_return_timedelta()
+            if delta:
+                req.expected_return = now + delta
+
+
+def _cart_line_error(req, verb):
+    """Cart lines are approved/rejected/cancelled together via /batches/."""
+    if req.batch_id:
+        return Response(
+            {'error': f'This request is part of cart #{req.batch_id} — {verb} the whole cart instead.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return None
+
+
+def _reservation_check(item, borrower_id, quantity, now):
+    """Huwag hayaang makain ng walk-in borrow yung units na naka-reserve na.
+    Call with ``item`` locked (select_for_update). Up to ``quantity`` units of
+    the borrower's own bookings covering ``now`` don't count against them —
+    the loan uses them up; whatever is left of those bookings stays reserved.
+    Returns ``(plan, available)``: ``plan`` is ``[(reservation, units used)]``
+    for ``_fulfill_reservations``; ``available`` is None when ``quantity`` fits."""
+    plan, remaining = [], quantity
+    for reservation in held_reservations(item, borrower_id, now):
+        if not remaining:
+            break
+        used = min(reservation.quantity, remaining)
+        plan.append((reservation, used))
+        remaining -= used
+    used_up = [r.pk for r, used in plan if used == r.quantity]
+    # Only pays for the availability sweep when the item has other upcoming bookings
+    others = Reservation.objects.filter(item=item, status='ACTIVE', end_time__gt=now).exclude(pk__in=used_up)
+    if not others.exists():
+        return plan, None
+    delta = item.get_return_timedelta() if item.is_returnable else None
+    window = get_availability(item, now, now + delta if delta else None,
+                              exclude={r.pk: used for r, used in plan})
+    return plan, (window['available'] if quantity > window['available'] else None)
+
+
+def _fulfill_reservations(plan, req, now):
+    """Mark the booked units used by the approved ``req``. A booking used only
+    in part is split: its quantity goes down and a FULFILLED copy holds the
+    used units, linked to ``req``."""
+    for reservation, used in plan:
+        if used == reservation.quantity:
+            Reservation.objects.filter(pk=reservation.pk).update(
+                status='FULFILLED', request=req, updated_at=now,
+            )
+            continue
+        Reservation.objects.filter(pk=reservation.pk).update(quantity=F('quantity') - used, updated_at=now)
+        Reservation.objects.create(
+            item_id=reservation.item_id, reserved_by_id=reservation.reserved_by_id, quantity=used,
+            start_time=reservation.start_time, end_time=reservation.end_time,
+            purpose=reservation.purpose, status='FULFILLED', request=req,
+        )
+
+
+def _allocate_waitlist(item_id, now):
+    """Give freed stock of ``item_id`` to the next waiters, in the caller's transaction.
+
+    Strict FIFO within priority (HIGH → MEDIUM → LOW, then oldest first): kapag
+    hindi kasya yung nasa unahan, hihinto na — para di ma-starve yung malalaking
+    requests ng mga sumisingit na maliliit. Each allocation becomes an
+    approved Request (approved_by=None = system) and the waiter is notified.
+    Returns the allocated entries."""
+    from django.db.models import Case, When, Value, IntegerField
+    from apps.inventory.models import Item
+
+    # lock the item row para walang ibang sabay na mag-allocate/approve
+    item = Item.objects.select_for_update().get(pk=item_id)
+    if item.quantity == 0 or item.status in ('MAINTENANCE', 'RETIRED'):
+        return []
+
+    free = item.quantity
+    # Don't hand out units that are already promised to upcoming reservations
+    if Reservation.objects.filter(item=item, status='ACTIVE', end_time__gt=now).exists():
+        delta = item.get_return_timedelta() if item.is_returnable else None
+        free = min(free, get_availability(item, now, now + delta if delta else None)['available'])
+
+    rank = Case(
+        *[When(priority=p, then=Value(i)) for i, p in enumerate(QUEUE_PRIORITY_ORDER)],
+        default=Value(len(QUEUE_PRIORITY_ORDER)),
+        output_field=IntegerField(),
+    )
+    waiting = (
+        WaitlistEntry.objects
+        .filter(item=item, status='WAITING')
+        .select_related('user')
+        .order_by(rank, 'created_at', 'id')
+    )
+
+    allocated = []
+    for entry in waiting.iterator(chunk_size=50):
+        if entry.quantity > free:
+            break
+        free -= entry.quantity
+        allocated.append(entry)
+        if free == 0:
+            break
+    if not allocated:
+        return []
+
+    lines = []
+    for entry in allocated:
+        line = Request(
+            item=item,
+            item_name=item.name,
+            requested_by=entry.user,
+            quantity=entry.quantity,
+            purpose=entry.purpose,
+            priority=entry.priority,
+        )
+        _apply_approval(line, item, None, now)
+        lines.append(line)
+    Request.objects.bulk_create(lines)
+
+    total = sum(entry.quantity for entry in allocated)
+    Item.objects.filter(pk=item.pk).update(quantity=F('quantity') - total, updated_at=now)
+    if item.quantity == total:
+        Item.objects.filter(pk=item.pk).update(status='IN_USE', updated_at=now)
+
+    for entry, line in zip(allocated, lines):
+        entry.status = 'ALLOCATED'
+        entry.request = line
+        entry.allocated_at = now
+        entry.updated_at = now  # bulk_update doesn't run auto_now
+    WaitlistEntry.objects.bulk_update(allocated, ['status', 'request', 'allocated_at', 'updated_at'])
+
+    Notification.objects.bulk_create([
+        Notification(
+            recipient=entry.user,
+            request=line,
+            type='STATUS_CHANGE',
+            message=f'Good news! {entry.quantity} "{item.name}" became available and has been '
+                    f'reserved for you from the waitlist.',
+        )
+        for entry, line in zip(allocated, lines)
+    ])
+    metrics.inc('plmun_notifications_created_total', len(allocated), type='STATUS_CHANGE')
+    return allocated
+
+
 def _create_notif_if_new(recipient, request_obj, notif_type, message, sender=None):
     """Smart notification dedup:
     1. If there's an UNREAD notification of the same type+request → skip entirely
@@ -67,6 +262,7 @@ def _create_notif_if_new(recipient, request_obj, notif_type, message, sender=Non
         type=notif_type,
         message=message,
     )
+    metrics.inc('plmun_notifications_created_total', type=notif_type)
 
 
 # TODO(erick): the approve/reject actions share similar validation logic
@@ -111,7 +307,10 @@ class RequestViewSet(viewsets.ModelViewSet):
                 Q(purpose__icontains=search)
             )
 
-        return queryset.select_related('requested_by', 'approved_by', 'item')
+        # comments + their authors in 2 queries total, hindi 1 + N per page
+        return queryset.select_related('requested_by', 'approved_by', 'item').prefetch_related(
+            Prefetch('comments', queryset=Comment.objects.select_related('author'))
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -123,7 +322,8 @@ class RequestViewSet(viewsets.ModelViewSet):
         # Audit log
         log_action(AuditLog.REQUEST_CREATED, user=request.user,
                    details=f'Created request for "{req.item_name}" (qty: {req.quantity})',
-                   request=request)
+                   request=request, obj=req,
+                   changes={'item': req.item_id, 'quantity': req.quantity, 'priority': req.priority})
 
         # Notify all staff/admin about the new request
         # uses dedup helper so re-submitting the same request doesn't spam
@@ -156,6 +356,10 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        cart_error = _cart_line_error(req, 'approve')
+        if cart_error:
+            return cart_error
+
         # Prevent self-approval (requester cannot approve their own request)
         if req.requested_by == request.user:
             return Response(
@@ -163,49 +367,50 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # atomically check at bawasan yung stock para walang race condition
-        item = req.item
         from apps.inventory.models import Item
-        updated = Item.objects.filter(
-            pk=item.pk,
-            quantity__gte=req.quantity,
-        ).update(quantity=F('quantity') - req.quantity)
 
-        if not updated:
-            # Re-read to give an accurate error message
-            item.refresh_from_db()
-            return Response(
-                {'error': f'Insufficient stock. Only {item.quantity} available, but {req.quantity} requested.'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # If quantity hit zero, mark item as IN_USE
-        item.refresh_from_db()
-        if item.quantity == 0:
-            item.status = 'IN_USE'
-            item.save(update_fields=['status'])
+        now = timezone.now()
+        with transaction.atomic():
+            # i-lock yung item row: the reservation check and the stock deduction
+            # must see the same bookings, kahit sabay mag-approve yung dalawang staff
+            item = Item.objects.select_for_update().get(pk=req.item_id)
+            plan, available = _reservation_check(item, req.requested_by_id, req.quantity, now)
+            if available is not None:
+                return Response(
+                    {'error': f'Only {available} unit(s) can be lent out without '
+                              f'conflicting with existing reservations.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        req.approved_by = request.user
-        req.approved_at = timezone.now()
+            # atomically check at bawasan yung stock para walang race condition
+            updated = Item.objects.filter(
+                pk=item.pk,
+                quantity__gte=req.quantity,
+            ).update(quantity=F('quantity') - req.quantity, updated_at=now)
+
+            if not updated:
+                # Re-read to give an accurate error message
+                item.refresh_from_db()
+                return Response(
+                    {'error': f'Insufficient stock. Only {item.quantity} available, but {req.quantity} requested.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        # pag consumable (di returnable), auto-complete na agad
-        # kasi wala namang ibabalik eh
-        if not item.is_returnable:
-            req.status = 'COMPLETED'
-        else:
-            req.status = 'APPROVED'
-            # Auto-calculate expected return from item's borrow duration
-            if item.borrow_duration:
-                delta = item.get_return_timedelta()
-                if delta:
-                    req.expected_return = timezone.now() + delta
+            # If quantity hit zero, mark item as IN_USE
+            item.refresh_from_db()
+            if item.quantity == 0:
+                item.status = 'IN_USE'
+                item.save(update_fields=['status', 'updated_at'])
 
-        req.save()
+            _apply_approval(req, item, request.user, now)
+            req.save()
+            _fulfill_reservations(plan, req, now)
 
         # Audit log
         log_action(AuditLog.REQUEST_APPROVED, user=request.user,
                    details=f'Approved request #{req.id} for "{req.item_name}" (qty: {req.quantity})',
-                   request=request)
+                   request=request, obj=req,
+                   changes={'status': ['PENDING', req.status], 'expected_return': [None, req.expected_return]})
 
         # Notify the requester about approval (deduped)
         approver_name = request.user.get_full_name() or request.user.username
@@ -229,6 +434,10 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        cart_error = _cart_line_error(req, 'reject')
+        if cart_error:
+            return cart_error
+
         serializer = RequestActionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -241,7 +450,8 @@ class RequestViewSet(viewsets.ModelViewSet):
         # Audit log
         log_action(AuditLog.REQUEST_REJECTED, user=request.user,
                    details=f'Rejected request #{req.id} for "{req.item_name}". Reason: {req.rejection_reason or "(none)"}',
-                   request=request)
+                   request=request, obj=req,
+                   changes={'status': ['PENDING', 'REJECTED'], 'rejection_reason': ['', req.rejection_reason]})
 
         # Notify the requester about rejection (deduped)
         rejector_name = request.user.get_full_name() or request.user.username
@@ -304,13 +514,17 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        cart_error = _cart_line_error(req, 'cancel')
+        if cart_error:
+            return cart_error
+
         req.status = 'CANCELLED'
         req.save()
 
         # Audit log
         log_action(AuditLog.OTHER, user=request.user,
                    details=f'Cancelled request #{req.id} for "{req.item_name}"',
-                   request=request)
+                   request=request, obj=req, changes={'status': ['PENDING', 'CANCELLED']})
 
         return Response(RequestSerializer(req).data)
 
@@ -340,17 +554,23 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # i-restore yung stock, atomic para safe
+        old_status = req.status
+
+        # i-restore yung stock, atomic para safe. Yung freed units ay
+        # ina-allocate agad sa waitlist in the same transaction.
         from apps.inventory.models import Item
-        Item.objects.filter(pk=item.pk).update(quantity=F('quantity') + req.quantity)
-        item.refresh_from_db()
-        if item.status == 'IN_USE':
-            item.status = 'AVAILABLE'
-            item.save(update_fields=['status'])
-
-        req.status = 'RETURNED'
-        req.returned_at = timezone.now()
-        req.save()
+        with transaction.atomic():
+            Item.objects.filter(pk=item.pk).update(quantity=F('quantity') + req.quantity, updated_at=timezone.now())
+            item.refresh_from_db()
+            if item.status == 'IN_USE':
+                item.status = 'AVAILABLE'
+                item.save(update_fields=['status', 'updated_at'])
+
+            req.status = 'RETURNED'
+            req.returned_at = timezone.now()
+            req.save()
+
+            _allocate_waitlist(item.pk, timezone.now())
 
         # Auto-unflag user if they have no remaining overdue items
         borrower = req.requested_by
@@ -362,12 +582,14 @@ class RequestViewSet(viewsets.ModelViewSet):
 
         if remaining_overdue == 0 and borrower.is_flagged:
             borrower.is_flagged = False
-            borrower.save(update_fields=['is_flagged'])
+            borrower.save(update_fields=['is_flagged', 'updated_at'])
+            invalidate_user_cache(borrower.pk)
 
         # Audit log
         log_action(AuditLog.REQUEST_RETURNED, user=request.user,
                    details=f'Returned item for request #{req.id} "{req.item_name}" (qty: {req.quantity})',
-                   request=request)
+                   request=request, obj=req,
+                   changes={'status': [old_status, 'RETURNED'], 'returned_at': [None, req.returned_at]})
 
         # Notify the requester about the return (deduped, only if someone else returned it)
         returner_name = request.user.get_full_name() or request.user.username
@@ -393,12 +615,12 @@ class RequestViewSet(viewsets.ModelViewSet):
 
         clearable_statuses = ['COMPLETED', 'RETURNED', 'REJECTED', 'CANCELLED']
         qs = self.get_queryset().filter(status__in=clearable_statuses)
-        count = qs.update(is_cleared=True)  # soft-delete: keep for reports/charts
+        count = qs.update(is_cleared=True, updated_at=timezone.now())  # soft-delete: keep for reports/charts
 
         # Audit log
         log_action(AuditLog.OTHER, user=request.user,
                    details=f'Cleared {count} completed/returned/rejected/cancelled requests',
-                   request=request)
+                   request=request, changes={'cleared': count, 'statuses': clearable_statuses})
 
         return Response({'status': f'{count} requests cleared'})
 
@@ -482,8 +704,7 @@ class RequestViewSet(viewsets.ModelViewSet):
         """
         admin_code = request.data.get('code', '')
         from django.conf import settings as django_settings
-        from django.core.cache import cache
-        expected_code = cache.get('history_clear_code') or getattr(django_settings, 'HISTORY_CLEAR_CODE', 'PLMun2025')
+        expected_code = settings_store.get('history_clear_code') or getattr(django_settings, 'HISTORY_CLEAR_CODE', 'PLMun2025')
 
         if admin_code != expected_code:
             return Response(
@@ -494,13 +715,15 @@ class RequestViewSet(viewsets.ModelViewSet):
         clearable = Request.objects.filter(
             status__in=['COMPLETED', 'RETURNED', 'REJECTED', 'CANCELLED'],
         )
-        count, _ = clearable.delete()
+        with collect_tombstones():
+            count, _ = clearable.delete()
 
         log_action(
             AuditLog.OTHER,
             user=request.user,
             details=f'Cleared {count} request history records',
             request=request,
+            changes={'deleted': count},
         )
 
         return Response({'status': f'{count} history records cleared'})
@@ -508,8 +731,8 @@ class RequestViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], permission_classes=[IsStaffOrAbove])
     def set_clear_code(self, request):
         """Admin sets or updates the clear code.
-        Stored in a simple system preferences key in localStorage on frontend,
-        but validated here against the Django settings.
+        Stored as the ``history_clear_code`` SystemSetting; falls back to
+        settings.HISTORY_CLEAR_CODE until an admin sets one.
         """
         if not request.user.has_min_role('ADMIN'):
             return Response(
@@ -524,11 +747,8 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Store in Django settings file is not practical at runtime,
-        # so we store it in a lightweight cache/DB approach using a simple model
-        # For now, use a simple key-value in the system — stored via environment or cache
-        from django.core.cache import cache
-        cache.set('history_clear_code', new_code, timeout=None)
+        # DB-backed para pareho across gunicorn workers (dati LocMemCache per worker)
+        settings_store.set('history_clear_code', new_code, user=request.user)
 
         log_action(
             AuditLog.OTHER,
@@ -539,6 +759,76 @@ class RequestViewSet(viewsets.ModelViewSet):
 
         return Response({'status': 'Clear code updated successfully'})
 
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """Pending approval queue — HIGH priority first, then oldest first.
+        ?limit= (default 20, max 100, 0 = counts only) and ?cursor= for keyset paging.
+
+        Each priority bucket is a range scan on the partial
+        ``requests_pending_queue_idx`` (status='PENDING'), and the counts come
+        from one aggregate, so polling this stays cheap no matter how big the
+        request history gets. Staff see everyone's pending requests; others
+        only their own."""
+        from django.db.models import Count
+
+        pending = Request.objects.filter(status='PENDING')
+        if not request.user.has_min_role('STAFF'):
+            pending = pending.filter(requested_by=request.user)
+
+        counts = pending.aggregate(
+            total=Count('id'),
+            **{p: Count('id', filter=Q(priority=p)) for p in QUEUE_PRIORITY_ORDER},
+        )
+
+        try:
+            limit = max(0, min(int(request.query_params.get('limit', 20)), 100))
+        except (ValueError, TypeError):
+            limit = 20
+
+        cursor = None
+        raw_cursor = request.query_params.get('cursor')
+        if raw_cursor:
+            cursor = _decode_queue_cursor(raw_cursor)
+            if cursor is None:
+                return Response(
+                    {'detail': 'Invalid cursor.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        page = []
+        if limit:
+            rows = (
+                pending
+                .select_related('requested_by', 'approved_by', 'item')
+                .prefetch_related(Prefetch('comments', queryset=Comment.objects.select_related('author')))
+                .order_by('created_at', 'id')
+            )
+            start_bucket = QUEUE_PRIORITY_ORDER.index(cursor[0]) if cursor else 0
+            # fetch one extra row to know if there's a next page
+            for priority in QUEUE_PRIORITY_ORDER[start_bucket:]:
+                bucket = rows.filter(priority=priority)
+                if cursor and priority == cursor[0]:
+                    _, after_created, after_id = cursor
+                    bucket = bucket.filter(
+                        Q(created_at__gt=after_created) |
+                        Q(created_at=after_created, id__gt=after_id)
+                    )
+                page.extend(bucket[:limit + 1 - len(page)])
+                if len(page) > limit:
+                    break
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = _encode_queue_cursor(page[-1])
+
+        return Response({
+            'count': counts['total'],
+            'byPriority': {p: counts[p] for p in QUEUE_PRIORITY_ORDER},
+            'next': next_cursor,
+            'results': RequestSerializer(page, many=True).data,
+        })
+
     @action(detail=False, methods=['get'])
     def overdue_requests(self, request):
         overdue = self.get_queryset().filter(
@@ -605,6 +895,9 @@ class RequestViewSet(viewsets.ModelViewSet):
 
         # Batch create borrower notifications
         Notification.objects.bulk_create(borrower_notifications)
+        metrics.inc('plmun_overdue_scans_total')
+        metrics.inc('plmun_overdue_notifications_total', len(borrower_notifications))
+        metrics.inc('plmun_notifications_created_total', len(borrower_notifications), type='OVERDUE')
 
         # Staff gets ONE summary notification instead of N individual ones
         # e.g. "3 items overdue: "Laptop" by John (2 days), "Projector" by Jane (1 hour)"
@@ -649,14 +942,477 @@ class RequestViewSet(viewsets.ModelViewSet):
                     User.objects.filter(pk=user_id).update(
                         overdue_count=F('overdue_count') + new_count,
                         is_flagged=True,
+                        updated_at=now,
                     )
                 else:
-                    # Already flagged from previous scan, just ensure flag stays
-                    User.objects.filter(pk=user_id).update(is_flagged=True)
+                    # Already flagged from previous scan, just ensure flag stays.
+                    # is_flagged=False filter para di ma-bump yung updated_at every scan
+                    User.objects.filter(pk=user_id, is_flagged=False).update(is_flagged=True, updated_at=now)
+
+            # .update() bypasses save(), kaya manual invalidate ng auth snapshots
+            invalidate_user_cache(flagged_user_ids)
 
         return Response({'status': f'{len(borrower_notifications)} overdue notifications created'})
 
 
+class RequestBatchViewSet(viewsets.ModelViewSet):
+    """Multi-item cart requests.
+    Lahat ng lines ay ginagawa sa isang transaction, at yung approve/reject
+    ay all-or-nothing with one set-based stock UPDATE. One notification
+    fan-out and one audit entry per cart, hindi per line."""
+
+    http_method_names = ['get', 'post']
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return RequestBatchCreateSerializer
+        return RequestBatchSerializer
+
+    def get_permissions(self):
+        if self.action in ['approve', 'reject']:
+            return [IsStaffOrAbove()]
+        return [permissions.IsAuthenticated()]
+
+    def get_queryset(self):
+        queryset = RequestBatch.objects.select_related('requested_by', 'approved_by').prefetch_related('lines')
+        user = self.request.user
+
+        if not user.has_min_role('STAFF'):
+            queryset = queryset.filter(requested_by=user)
+
+        status_filter = self.request.query_params.get('status', '')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        items = data['resolved_items']
+
+        with transaction.atomic():
+            batch = RequestBatch.objects.create(requested_by=request.user, purpose=data['purpose'])
+            lines = Request.objects.bulk_create([
+                Request(
+                    batch=batch,
+                    item=items[line['item']],
+                    item_name=items[line['item']].name,
+                    requested_by=request.user,
+                    quantity=line['quantity'],
+                    purpose=data['purpose'],
+                    # Auto-inherit priority from the item, same as single requests
+                    priority=items[line['item']].priority,
+                    expected_return=data.get('expected_return'),
+                )
+                for line in data['items']
+            ])
+
+        summary = ', '.join(f'{line.quantity}x {line.item_name}' for line in lines)
+        log_action(AuditLog.REQUEST_CREATED, user=request.user,
+                   details=f'Created cart #{batch.id} with {len(lines)} item(s): {summary}',
+                   request=request, obj=batch,
+                   changes={'lines': [{'request': line.id, 'item': line.item_id, 'quantity': line.quantity}
+                                      for line in lines]})
+
+        # Isang notification per staff for the whole cart. Bagong cart 'to kaya
+        # walang existing notif na pwedeng ma-duplicate — straight bulk_create.
+        author_name = request.user.get_full_name() or request.user.username
+        staff_ids = User.objects.filter(
+            role__in=['STAFF', 'ADMIN']
+        ).exclude(id=request.user.id).values_list('id', flat=True)
+        created = Notification.objects.bulk_create([
+            Notification(
+                recipient_id=staff_id,
+                sender=request.user,
+                request=lines[0],
+                type='STATUS_CHANGE',
+                message=f'{author_name} submitted a cart of {len(lines)} item(s): {summary[:150]}',
+            )
+            for staff_id in staff_ids
+        ])
+        metrics.inc('plmun_notifications_created_total', len(created), type='STATUS_CHANGE')
+
+        batch = self.get_queryset().get(pk=batch.pk)
+        return Response(
+            RequestBatchSerializer(batch).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=['post'])
+    def approve(self, request, pk=None):
+        """Approve every line or none: one conditional UPDATE deducts stock
+        for all items, and if any item is short the whole thing rolls back."""
+        from collections import Counter
+        from django.db.models import Case, When, Value, IntegerField
+        from apps.inventory.models import Item
+
+        batch = self.get_object()
+
+        if batch.status != 'PENDING':
+            return Response(
+                {'error': 'Only pending carts can be approved'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if batch.requested_by_id == request.user.id:
+            return Response(
+                {'error': 'You cannot approve your own request'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        lines = list(batch.lines.select_related('item'))
+        needed = Counter()
+        for line in lines:
+            needed[line.item_id] += line.quantity
+
+        now = timezone.now()
+        amount = Case(
+            *[When(pk=item_id, then=Value(qty)) for item_id, qty in needed.items()],
+            output_field=IntegerField(),
+        )
+        with transaction.atomic():
+            # compare-and-set para di ma-double approve ng dalawang staff nang sabay
+            claimed = RequestBatch.objects.filter(pk=batch.pk, status='PENDING').update(
+                status='APPROVED', approved_by=request.user, approved_at=now, updated_at=now,
+            )
+            if not claimed:
+                return Response(
+                    {'error': 'Only pending carts can be approved'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Same reservation guard as single approve, with the items locked
+            # (pk order para walang deadlock sa ibang cart na pareho ng items)
+            items = Item.objects.select_for_update().filter(pk__in=needed).order_by('pk')
+            plan_by_item = {}
+            for item in items:
+                plan_by_item[item.pk], available = _reservation_check(
+                    item, batch.requested_by_id, needed[item.pk], now,
+                )
+                if available is not None:
+                    transaction.set_rollback(True)  # undo the claim
+                    return Response(
+                        {'error': f'Only {available} "{item.name}" can be lent out without '
+                                  f'conflicting with existing reservations.'},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+            updated = Item.objects.filter(
+                pk__in=needed, quantity__gte=amount,
+            ).update(quantity=F('quantity') - amount, updated_at=now)
+
+            stock_ok = updated == len(needed)
+            if not stock_ok:
+                # may kulang na item — undo the claim and any partial deduction
+                transaction.set_rollback(True)
+            else:
+                # If quantity hit zero, mark item as IN_USE
+                Item.objects.filter(pk__in=needed, quantity=0).update(status='IN_USE', updated_at=now)
+
+                for line in lines:
+                    _apply_approval(line, line.item, request.user, now)
+                Request.objects.bulk_update(
+                    lines, ['status', 'approved_by', 'approved_at', 'expected_return', 'updated_at'],
+                )
+                first_line = {}
+                for line in lines:
+                    first_line.setdefault(line.item_id, line)
+                for item_id, plan in plan_by_item.items():
+                    _fulfill_reservations(plan, first_line[item_id], now)
+
+        if not stock_ok:
+            # Re-read to give an accurate error message
+            short = [
+                f'"{item.name}" ({item.quantity} available, {needed[item.pk]} requested)'
+                for item in Item.objects.filter(pk__in=needed)
+                if item.quantity < needed[item.pk]
+            ]
+            return Response(
+                {'error': f'Insufficient stock: {", ".join(short)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        log_action(AuditLog.REQUEST_APPROVED, user=request.user,
+                   details=f'Approved cart #{batch.id} ({len(lines)} item(s))',
+                   request=request, obj=batch, changes={'status': ['PENDING', 'APPROVED']})
+
+        approver_name = request.user.get_full_name() or request.user.username
+        _create_notif_if_new(
+            recipient=batch.requested_by,
+            request_obj=lines[0],
+            notif_type='STATUS_CHANGE',
+            message=f'{approver_name} approved your cart of {len(lines)} item(s)',
+            sender=request.user,
+        )
+
+        return Response(RequestBatchSerializer(self.get_queryset().get(pk=batch.pk)).data)
+
+    @action(detail=True, methods=['post'])
+    def reject(self, request, pk=None):
+        batch = self.get_object()
+
+        if batch.status != 'PENDING':
+            return Response(
+                {'error': 'Only pending carts can be rejected'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = RequestActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reason = serializer.validated_data.get('reason', '')
+        now = timezone.now()
+
+        with transaction.atomic():
+            claimed = RequestBatch.objects.filter(pk=batch.pk, status='PENDING').update(
+                status='REJECTED', approved_by=request.user, approved_at=now,
+                rejection_reason=reason, updated_at=now,
+            )
+            if not claimed:
+                return Response(
+                    {'error': 'Only pending carts can be rejected'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            count = batch.lines.update(
+                status='REJECTED', approved_by=request.user, approved_at=now,
+                rejection_reason=reason, updated_at=now,
+            )
+
+        log_action(AuditLog.REQUEST_REJECTED, user=request.user,
+                   details=f'Rejected cart #{batch.id} ({count} item(s)). Reason: {reason or "(none)"}',
+                   request=request, obj=batch,
+                   changes={'status': ['PENDING', 'REJECTED'], 'rejection_reason': ['', reason]})
+
+        rejector_name = request.user.get_full_name() or request.user.username
+        reason_text = f' Reason: "{reason}"' if reason else ''
+        _create_notif_if_new(
+            recipient=batch.requested_by,
+            request_obj=batch.lines.first(),
+            notif_type='STATUS_CHANGE',
+            message=f'{rejector_name} rejected your cart of {count} item(s).{reason_text}',
+            sender=request.user,
+        )
+
+        return Response(RequestBatchSerializer(self.get_queryset().get(pk=batch.pk)).data)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        batch = self.get_object()
+
+        if batch.requested_by_id != request.user.id and not request.user.has_min_role('STAFF'):
+            return Response(
+                {'error': 'You can only cancel your own requests'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if batch.status != 'PENDING':
+            return Response(
+                {'error': 'Only pending carts can be cancelled'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        now = timezone.now()
+        with transaction.atomic():
+            claimed = RequestBatch.objects.filter(pk=batch.pk, status='PENDING').update(
+                status='CANCELLED', updated_at=now,
+            )
+            if not claimed:
+                return Response(
+                    {'error': 'Only pending carts can be cancelled'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            count = batch.lines.update(status='CANCELLED', updated_at=now)
+
+        log_action(AuditLog.OTHER, user=request.user,
+                   details=f'Cancelled cart #{batch.id} ({count} item(s))',
+                   request=request, obj=batch, changes={'status': ['PENDING', 'CANCELLED']})
+
+        return Response(RequestBatchSerializer(self.get_queryset().get(pk=batch.pk)).data)
+
+
+class WaitlistViewSet(viewsets.ModelViewSet):
+    """Waitlist para sa out-of-stock items.
+    Students/faculty join and leave; staff can see everything and bump priority.
+    Allocation itself happens in RequestViewSet.return_item."""
+
+    http_method_names = ['get', 'post']
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return WaitlistJoinSerializer
+        return WaitlistEntrySerializer
+
+    def get_permissions(self):
+        if self.action == 'set_priority':
+            return [IsStaffOrAbove()]
+        return [permissions.IsAuthenticated()]
+
+    def get_queryset(self):
+        queryset = WaitlistEntry.objects.select_related('item', 'user')
+        user = self.request.user
+
+        if not user.has_min_role('STAFF'):
+            queryset = queryset.filter(user=user)
+
+        item_filter = self.request.query_params.get('item', '')
+        if item_filter.isdigit():
+            queryset = queryset.filter(item_id=item_filter)
+
+        status_filter = self.request.query_params.get('status', '')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        item = serializer.validated_data['item']
+        entry = serializer.save(user=request.user, priority=item.priority)
+
+        log_action(AuditLog.OTHER, user=request.user,
+                   details=f'Joined waitlist for "{item.name}" (qty: {entry.quantity})',
+                   request=request, obj=entry,
+                   changes={'item': item.id, 'quantity': entry.quantity, 'priority': entry.priority})
+
+        return Response(
+            WaitlistEntrySerializer(entry).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=['post'])
+    def leave(self, request, pk=None):
+        entry = self.get_object()
+
+        if entry.user_id != request.user.id and not request.user.has_min_role('STAFF'):
+            return Response(
+                {'error': 'You can only leave your own waitlist entries'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if entry.status != 'WAITING':
+            return Response(
+                {'error': 'Only waiting entries can be cancelled'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        entry.status = 'CANCELLED'
+        entry.save(update_fields=['status', 'updated_at'])
+        return Response(WaitlistEntrySerializer(entry).data)
+
+    @action(detail=True, methods=['post'])
+    def set_priority(self, request, pk=None):
+        """Staff can bump a waiter ahead (e.g. thesis defense, class use)."""
+        entry = self.get_object()
+        new_priority = request.data.get('priority')
+
+        if new_priority not in Request.Priority.values:
+            return Response(
+                {'error': f'Invalid priority. Must be one of: {list(Request.Priority.values)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        old_priority = entry.priority
+        entry.priority = new_priority
+        entry.save(update_fields=['priority', 'updated_at'])
+
+        log_action(AuditLog.OTHER, user=request.user,
+                   details=f'Set waitlist entry #{entry.id} ("{entry.item.name}") priority to {new_priority}',
+                   request=request, obj=entry, changes={'priority': [old_priority, new_priority]})
+
+        return Response(WaitlistEntrySerializer(entry).data)
+
+
+class ReservationViewSet(viewsets.ModelViewSet):
+    """Advance bookings ng items for a future time window.
+    Faculty pataas lang pwede mag-reserve; students see only their own."""
+
+    http_method_names = ['get', 'post']
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return ReservationCreateSerializer
+        return ReservationSerializer
+
+    def get_permissions(self):
+        if self.action == 'create':
+            return [IsFacultyOrAbove()]
+        return [permissions.IsAuthenticated()]
+
+    def get_queryset(self):
+        queryset = Reservation.objects.select_related('item', 'reserved_by')
+        user = self.request.user
+
+        if not user.has_min_role('STAFF'):
+            queryset = queryset.filter(reserved_by=user)
+
+        item_filter = self.request.query_params.get('item', '')
+        if item_filter.isdigit():
+            queryset = queryset.filter(item_id=item_filter)
+
+        # ?upcoming=true → active bookings that haven't ended yet
+        if self.request.query_params.get('upcoming', '').lower() == 'true':
+            queryset = queryset.filter(status='ACTIVE', end_time__gt=timezone.now())
+
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        from apps.inventory.models import Item
+        with transaction.atomic():
+            # i-lock yung item row para ma-serialize yung sabay na bookings
+            item = Item.objects.select_for_update().get(pk=data['item'].pk)
+            window = get_availability(item, data['start_time'], data['end_time'])
+            if data['quantity'] > window['available']:
+                return Response(
+                    {'quantity': f'Only {window["available"]} unit(s) of "{item.name}" are free '
+                                 f'in that window. You requested {data["quantity"]}.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            reservation = serializer.save(reserved_by=request.user)
+
+        log_action(AuditLog.OTHER, user=request.user,
+                   details=f'Reserved {reservation.quantity}x "{item.name}" '
+                           f'for {reservation.start_time:%Y-%m-%d %H:%M} – {reservation.end_time:%Y-%m-%d %H:%M}',
+                   request=request, obj=reservation,
+                   changes={'item': item.id, 'quantity': reservation.quantity,
+                            'start_time': reservation.start_time, 'end_time': reservation.end_time})
+
+        return Response(
+            ReservationSerializer(reservation).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        reservation = self.get_object()
+
+        if reservation.reserved_by_id != request.user.id and not request.user.has_min_role('STAFF'):
+            return Response(
+                {'error': 'You can only cancel your own reservations'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if reservation.status != 'ACTIVE':
+            return Response(
+                {'error': 'Only active reservations can be cancelled'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        reservation.status = 'CANCELLED'
+        reservation.save(update_fields=['status', 'updated_at'])
+
+        log_action(AuditLog.OTHER, user=request.user,
+                   details=f'Cancelled reservation #{reservation.id} for "{reservation.item.name}"',
+                   request=request, obj=reservation, changes={'status': ['ACTIVE', 'CANCELLED']})
+
+        return Response(ReservationSerializer(reservation).data)
+
+
 class NotificationViewSet(viewsets.ModelViewSet):
     """Notifications ng user - scoped sa authenticated user lang."""
     serializer_class = NotificationSerializer
@@ -680,6 +1436,10 @@ class NotificationViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    def perform_destroy(self, instance):
+        with collect_tombstones():
+            instance.delete()
+
     @action(detail=True, methods=['patch'])
     def read(self, request, pk=None):
         notification = self.get_object()
@@ -689,7 +1449,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def read_all(self, request):
-        updated = self.get_queryset().filter(is_read=False).update(is_read=True)
+        updated = self.get_queryset().filter(is_read=False).update(is_read=True, updated_at=timezone.now())
         return Response({'status': f'{updated} marked as read'})
 
     @action(detail=False, methods=['get'])
@@ -699,6 +1459,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
-        count, _ = self.get_queryset().delete()
+        with collect_tombstones():
+            count, _ = self.get_queryset().delete()
         return Response({'status': f'{count} notifications cleared'})
 
@@ -0,0 +1,255 @@
+"""
+Bulk user provisioning from registrar CSVs.
+
+Tuwing enrollment libo-libong students ang kailangang i-onboard, and going
+through ``create_user`` one at a time is slow mainly because of password
+hashing (PBKDF2 is CPU-bound and serial). Dito:
+
+- the CSV is read as a stream, in batches of ``batch_size`` rows;
+- each batch does ONE lookup (email, case-insensitive / student_id /
+  username) to skip accounts that already exist, plus duplicates inside the
+  file;
+- initial passwords are hashed in a ``ProcessPoolExecutor`` across all cores;
+- new users are inserted with ``bulk_create``; if that hits a unique
+  constraint anyway (e.g. someone registered meanwhile), the batch is retried
+  row by row and only the conflicting rows are skipped.
+
+Generating passwords (``generate_passwords``) is for the management command
+only, which writes them to a file. The admin endpoint never returns
+credentials, kaya rows without a password are skipped there, and it only
+takes small files (``PROVISION_API_MAX_ROWS``) since it hashes inside the
+request.
+
+CSV columns (header row required, case-insensitive):
+    email (required), student_id, first_name, last_name or full_name,
+    department, role (default STUDENT), username (default: email local part),
+    password (default: a random initial password, returned in ``credentials``
+    when ``generate_passwords`` is on)
+"""
+
+import csv
+import io
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+User = get_user_model()
+
+# Below this, pool startup costs more than it saves
+POOL_THRESHOLD = 32
+HASH_CHUNK = 64
+
+
+def _init_worker():
+    # spawn/forkserver workers start without Django configured
+    import django
+    django.setup()
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _initial_password():
+    return secrets.token_urlsafe(9)  # 12 chars
+
+
+class Provisioner:
+    """Reads one CSV and creates the missing accounts. Use via ``provision_users``."""
+
+    def __init__(self, batch_size=500, workers=None, default_role=User.Role.STUDENT, dry_run=False,
+                 generate_passwords=True):
+        self.batch_size = max(batch_size, 1)
+        self.workers = workers or os.cpu_count() or 1
+        self.default_role = default_role
+        self.dry_run = dry_run
+        self.generate_passwords = generate_passwords
+        self.allowed_domains = getattr(settings, 'ALLOWED_EMAIL_DOMAINS', ['plmun.edu.ph'])
+        self.created = 0
+        self.skipped = []
+        self.credentials = []
+        self.seen = {'email': set(), 'student_id': set(), 'username': set()}
+        self._pool = None
+
+    def run(self, text_stream):
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames or 'email' not in [f.strip().lower() for f in reader.fieldnames]:
+            raise ValueError('CSV must have a header row with at least an "email" column.')
+
+        batch = []
+        try:
+            for line_no, raw in enumerate(reader, start=2):  # line 1 = header
+                row = {(k or '').strip().lower(): (v or '').strip() for k, v in raw.items()}
+                parsed = self._parse(line_no, row)
+                if parsed:
+                    batch.append(parsed)
+                if len(batch) >= self.batch_size:
+                    self._process(batch)
+                    batch = []
+            self._process(batch)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+    def _skip(self, line_no, email, reason):
+        self.skipped.append({'line': line_no, 'email': email, 'reason': reason})
+
+    def _parse(self, line_no, row):
+        email = row.get('email', '').lower()
+        if not email or '@' not in email:
+            self._skip(line_no, email, 'Missing or invalid email')
+            return None
+        if email.split('@')[-1] not in self.allowed_domains:
+            self._skip(line_no, email, 'Email domain not allowed')
+            return None
+        role = (row.get('role') or self.default_role).upper()
+        if role not in User.Role.values:
+            self._skip(line_no, email, f'Unknown role {role}')
+            return None
+
+        if not row.get('password') and not self.generate_passwords:
+            self._skip(line_no, email, 'No password (use manage.py provision_users to generate initial passwords)')
+            return None
+
+        first_name, last_name = row.get('first_name', ''), row.get('last_name', '')
+        if not (first_name or last_name) and row.get('full_name'):
+            parts = row['full_name'].split(' ', 1)
+            first_name, last_name = parts[0], parts[1] if len(parts) > 1 else ''
+
+        return {
+            'line': line_no,
+            'email': email,
+            'username': row.get('username') or email.split('@')[0],
+            'student_id': row.get('student_id', ''),
+            'first_name': first_name[:150],
+            'last_name': last_name[:150],
+            'department': row.get('department', '')[:100],
+            'role': role,
+            'password': row.get('password', ''),
+        }
+
+    def _process(self, batch):
+        if not batch:
+            return
+        # One indexed lookup for the whole batch
+        emails = {r['email'] for r in batch}
+        student_ids = {r['student_id'] for r in batch if r['student_id']}
+        usernames = {r['username'] for r in batch}
+        existing = {'email': set(), 'student_id': set(), 'username': set()}
+        # emails in the file are lowercased; existing ones may not be (email__in is
+        # case-sensitive on Postgres) — LOWER(email) is indexed (users_email_lower_idx)
+        for email, student_id, username in User.objects.annotate(email_lower=Lower('email')).filter(
+            Q(email_lower__in=emails) | Q(student_id__in=student_ids) | Q(username__in=usernames)
+        ).order_by().values_list('email', 'student_id', 'username'):
+            existing['email'].add(email.lower())
+            existing['student_id'].add(student_id)
+            existing['username'].add(username)
+
+        fresh = []
+        for r in batch:
+            for field, label in (('email', 'Email'), ('student_id', 'Student ID'), ('username', 'Username')):
+                value = r[field]
+                if value and value in existing[field]:
+                    self._skip(r['line'], r['email'], f'{label} already exists')
+                    break
+                if value and value in self.seen[field]:
+                    self._skip(r['line'], r['email'], f'Duplicate {label.lower()} in file')
+                    break
+            else:
+                for field in self.seen:
+                    if r[field]:
+                        self.seen[field].add(r[field])
+                fresh.append(r)
+        if not fresh:
+            return
+
+        generated = set()
+        for r in fresh:
+            if not r['password']:
+                r['password'] = _initial_password()
+                generated.add(r['line'])
+        hashes = self._hash([r['password'] for r in fresh])
+
+        users = [
+            User(
+                username=r['username'], email=r['email'], student_id=r['student_id'],
+                first_name=r['first_name'], last_name=r['last_name'],
+                department=r['department'], role=r['role'], password=hashed,
+            )
+            for r, hashed in zip(fresh, hashes)
+        ]
+        if not self.dry_run:
+            fresh = self._insert(fresh, users)
+        self.created += len(fresh)
+        self.credentials.extend(
+            {'username': r['username'], 'email': r['email'], 'password': r['password']}
+            for r in fresh if r['line'] in generated
+        )
+
+    def _insert(self, rows, users):
+        """bulk_create; on a unique conflict, row by row. Returns the rows inserted."""
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+            return rows
+        except IntegrityError:
+            pass
+        inserted = []
+        for r, user in zip(rows, users):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+            except IntegrityError:
+                self._skip(r['line'], r['email'], 'Already exists (email, student ID or username)')
+            else:
+                inserted.append(r)
+        return inserted
+
+    def _hash(self, passwords):
+        if len(passwords) < POOL_THRESHOLD or self.workers == 1:
+            return _hash_chunk(passwords)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        chunks = [passwords[i:i + HASH_CHUNK] for i in range(0, len(passwords), HASH_CHUNK)]
+        return [hashed for chunk in self._pool.map(_hash_chunk, chunks) for hashed in chunk]
+
+
+def count_rows(fileobj):
+    """Data rows in a binary CSV upload; rewinds the file afterwards."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        rows = sum(1 for _ in csv.reader(text)) - 1  # minus the header
+    finally:
+        text.detach()  # huwag isara yung upload
+        fileobj.seek(0)
+    return max(rows, 0)
+
+
+def provision_users(fileobj, batch_size=500, workers=None, default_role='STUDENT', dry_run=False,
+                    generate_passwords=True):
+    """Provision users from a CSV (binary or text file object). Returns a summary dict.
+
+    Raises ``ValueError`` when the file has no usable header."""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    provisioner = Provisioner(batch_size=batch_size, workers=workers, default_role=default_role,
+                              dry_run=dry_run, generate_passwords=generate_passwords)
+    started = time.perf_counter()
+    provisioner.run(fileobj)
+    seconds = time.perf_counter() - started
+    return {
+        'created': provisioner.created,
+        'skipped': provisioner.skipped,
+        'credentials': provisioner.credentials,
+        'seconds': round(seconds, 2),
+        'usersPerSecond': round(provisioner.created / seconds) if seconds else provisioner.created,
+        'dryRun': dry_run,
+    }
@@ -1,3 +1,111 @@
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.authentication.models import AuditLog, User
+from .provisioning import Provisioner
+
+
+def _csv(*lines):
+    return SimpleUploadedFile('enrollees.csv', ('\n'.join(lines) + '\n').encode(), content_type='text/csv')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionEndpointTests(TestCase):
+
+    def setUp(self):
+        admin = User.objects.create_user(username='registrar', email='registrar@plmun.edu.ph',
+                                         password=None, role='ADMIN')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def _post(self, upload):
+        return self.client.post('/api/users/provision/', {'file': upload}, format='multipart')
+
+    def test_mixed_case_existing_email_is_a_duplicate(self):
+        User.objects.create_user(username='jdc', email='Juan.DelaCruz@plmun.edu.ph', password=None)
+
+        response = self._post(_csv('email,password', 'juan.delacruz@plmun.edu.ph,Secret-123', 'ana@plmun.edu.ph,Secret-456'))
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([s['reason'] for s in response.data['skipped']], ['Email already exists'])
+
+    def test_no_generated_credentials_in_response(self):
+        response = self._post(_csv('email,password', 'ana@plmun.edu.ph,', 'ben@plmun.edu.ph,Secret-456'))
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertNotIn('credentials', response.data)
+        self.assertIn('provision_users', response.data['skipped'][0]['reason'])
+        self.assertFalse(User.objects.filter(email='ana@plmun.edu.ph').exists())
+
+    @override_settings(PROVISION_API_MAX_ROWS=2)
+    def test_large_files_go_to_the_command(self):
+        response = self._post(_csv('email,password', *(f'u{i}@plmun.edu.ph,Secret-{i}' for i in range(3))))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('manage.py provision_users', response.data['error'])
+        self.assertEqual(User.objects.count(), 1)
+
+
+class ProvisionInsertConflictTests(TestCase):
+
+    def test_conflicting_row_is_skipped_not_the_batch(self):
+        User.objects.create_user(username='taken', email='taken@plmun.edu.ph', password=None)
+        rows = [{'line': 2, 'email': 'new@plmun.edu.ph'}, {'line': 3, 'email': 'other@plmun.edu.ph'}]
+        users = [User(username='new', email='new@plmun.edu.ph'), User(username='taken', email='other@plmun.edu.ph')]
+
+        provisioner = Provisioner()
+        inserted = provisioner._insert(rows, users)
+
+        self.assertEqual([r['line'] for r in inserted], [2])
+        self.assertEqual([s['line'] for s in provisioner.skipped], [3])
+        self.assertTrue(User.objects.filter(username='new').exists())
+
+
+class BulkOperationTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password=None, role='ADMIN')
+        self.other_admin = User.objects.create_user(username='admin2', email='admin2@example.com', password=None, role='ADMIN')
+        self.students = [
+            User.objects.create_user(username=f's{i}', email=f's{i}@example.com', password=None, department='CCS')
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _bulk(self, **body):
+        return self.client.post('/api/users/bulk/', body, format='json')
+
+    def test_acting_admin_is_never_included(self):
+        response = self._bulk(operation='deactivate', filter={'role': 'ADMIN'})
+
+        self.assertEqual(response.data['ids'], [self.other_admin.pk])
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertFalse(User.objects.get(pk=self.other_admin.pk).is_active)
+
+        response = self._bulk(operation='set_role', role='STUDENT', ids=[self.admin.pk])
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(User.objects.get(pk=self.admin.pk).role, 'ADMIN')
+
+    def test_one_update_for_rows_that_change(self):
+        User.objects.filter(pk=self.students[0].pk).update(is_flagged=True)
+        User.objects.filter(pk=self.students[1].pk).update(is_flagged=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._bulk(operation='unflag', filter={'department': 'CCS'})
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(sorted(response.data['ids']), [self.students[0].pk, self.students[1].pk])
+        user_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "users"')]
+        self.assertEqual(len(user_updates), 1)
+        self.assertFalse(User.objects.filter(is_flagged=True).exists())
+        self.assertEqual(AuditLog.objects.filter(action=AuditLog.USER_UPDATED).count(), 1)
+
+    def test_ids_and_filter_are_exclusive(self):
+        response = self._bulk(operation='activate', ids=[self.students[0].pk], filter={'role': 'STUDENT'})
+
+        self.assertEqual(response.status_code, 400)
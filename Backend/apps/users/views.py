@@ -1,18 +1,55 @@
+import csv
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from django.utils import timezone
 
+from apps.authentication.backends import invalidate_user_cache
+from apps.authentication.models import AuditLog, log_action
 from apps.authentication.serializers import UserSerializer
-from apps.permissions import IsAdmin
+from apps.authentication.signals import collect_tombstones
+from apps.permissions import IsAdmin, IsStaffOrAbove
+
+from .provisioning import count_rows, provision_users
 
 User = get_user_model()
 
+# operation → fields set by the bulk UPDATE (set_role adds ``role``)
+BULK_OPERATIONS = {
+    'set_role': {},
+    'activate': {'is_active': True},
+    'deactivate': {'is_active': False},
+    'unflag': {'is_flagged': False},
+}
+BULK_FILTERS = {'role': 'role', 'department': 'department', 'isFlagged': 'is_flagged'}
+
+
+def _bulk_target(data):
+    """(queryset, error) from either ``ids`` or a non-empty ``filter``."""
+    ids, filters = data.get('ids'), data.get('filter')
+    if bool(ids) == bool(filters):
+        return None, 'Provide either "ids" or a non-empty "filter", not both.'
+    if ids:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return None, '"ids" must be a list of user ids.'
+        return User.objects.filter(pk__in=ids), None
+    if not isinstance(filters, dict) or set(filters) - set(BULK_FILTERS):
+        return None, f'"filter" accepts only: {list(BULK_FILTERS)}'
+    lookups = {BULK_FILTERS[key]: value for key, value in filters.items()}
+    if 'role' in lookups and lookups['role'] not in User.Role.values:
+        return None, f'Invalid role. Must be one of: {list(User.Role.values)}'
+    if 'is_flagged' in lookups and not isinstance(lookups['is_flagged'], bool):
+        return None, '"isFlagged" must be true or false.'
+    return User.objects.filter(**lookups), None
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """Admin lang pwede dito — user management."""
-    # TODO: dagdagan ng bulk delete o bulk role change kapag maraming users na
+    # TODO: bulk delete (bulk role/status/unflag nasa ``bulk`` na)
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -41,6 +78,16 @@ class UserViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_update(self, serializer):
+        user = serializer.save()
+        invalidate_user_cache(user.pk)
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        with collect_tombstones():  # cascades to their requests, comments, etc.
+            instance.delete()
+        invalidate_user_cache(user_id)
+
     @action(detail=True, methods=['put', 'patch'])
     def role(self, request, pk=None):
         """Palitan yung role ng user."""
@@ -55,6 +102,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         user.role = new_role
         user.save()
+        invalidate_user_cache(user.pk)
 
         return Response(UserSerializer(user, context={'request': request}).data)
 
@@ -64,6 +112,7 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.get_object()
         user.is_active = not user.is_active
         user.save()
+        invalidate_user_cache(user.pk)
 
         return Response({
             'message': f'User {"activated" if user.is_active else "deactivated"}',
@@ -82,13 +131,94 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
         user.is_flagged = False
-        user.save(update_fields=['is_flagged'])
+        user.save(update_fields=['is_flagged', 'updated_at'])
+        invalidate_user_cache(user.pk)
 
         return Response({
             'message': f'{user.get_full_name() or user.username} has been unflagged',
             'user': UserSerializer(user, context={'request': request}).data,
         })
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Set-based role change / activate / deactivate / unflag.
+
+        Body: ``operation`` (set_role, activate, deactivate, unflag), ``role``
+        for set_role, and either ``ids`` or ``filter`` ({role, department,
+        isFlagged}). One UPDATE, one audit entry, one cache invalidation.
+        Yung admin na gumagawa ay hindi kasama, para di ma-lock out sarili."""
+        operation = request.data.get('operation')
+        if operation not in BULK_OPERATIONS:
+            return Response(
+                {'error': f'Invalid operation. Must be one of: {list(BULK_OPERATIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        changes = dict(BULK_OPERATIONS[operation])
+        if operation == 'set_role':
+            role = request.data.get('role')
+            if role not in User.Role.values:
+                return Response(
+                    {'error': f'Invalid role. Must be one of: {list(User.Role.values)}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            changes['role'] = role
+
+        queryset, error = _bulk_target(request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # only rows that would actually change, para tama yung count at updated_at
+        queryset = queryset.exclude(pk=request.user.pk).exclude(**changes)
+        user_ids = list(queryset.values_list('pk', flat=True))
+        updated = 0
+        if user_ids:
+            updated = User.objects.filter(pk__in=user_ids).update(**changes, updated_at=timezone.now())
+            invalidate_user_cache(user_ids)
+            log_action(
+                AuditLog.USER_UPDATED, user=request.user, request=request, object_type='user',
+                details=f'Bulk {operation.replace("_", " ")}: {updated} users',
+                changes={'operation': operation, **changes, 'ids': user_ids},
+            )
+
+        return Response({'operation': operation, 'updated': updated, 'ids': user_ids})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaffOrAbove])
+    def typeahead(self, request):
+        """Mabilis na user lookup: ``?q=`` (min 2 chars), ``?limit=`` (max 25).
+
+        Every word must be a prefix of the name, email, student ID or
+        department — prefix lang para magamit yung indexes (migration 0012).
+        Returns a compact ``{id, name, studentId, role}`` list, no serializer."""
+        terms = request.query_params.get('q', '').split()
+        if not terms or len(''.join(terms)) < 2:
+            return Response([])
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 25)
+        except ValueError:
+            limit = 10
+
+        queryset = User.objects.filter(is_active=True)
+        for term in terms[:4]:
+            queryset = queryset.filter(
+                Q(first_name__istartswith=term) |
+                Q(last_name__istartswith=term) |
+                Q(email__istartswith=term) |
+                Q(student_id__istartswith=term) |
+                Q(department__istartswith=term)
+            )
+        rows = queryset.order_by('last_name', 'first_name').values(
+            'id', 'first_name', 'last_name', 'username', 'student_id', 'role',
+        )[:limit]
+        return Response([
+            {
+                'id': row['id'],
+                'name': f"{row['first_name']} {row['last_name']}".strip() or row['username'],
+                'studentId': row['student_id'],
+                'role': row['role'],
+            }
+            for row in rows
+        ])
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get user statistics."""
@@ -107,3 +237,46 @@ class UserViewSet(viewsets.ModelViewSet):
         }
 
         return Response(stats)
+
+    @action(detail=False, methods=['post'])
+    def provision(self, request):
+        """Bulk-create accounts from a small registrar CSV (multipart ``file``).
+        See apps/users/provisioning.py para sa columns. ``dryRun=true`` validates only.
+
+        Hashing runs inside the request, kaya max ``PROVISION_API_MAX_ROWS`` rows
+        and every row needs its own ``password`` — credentials are never sent
+        back. Enrollment-sized files and generated passwords: ``manage.py
+        provision_users --credentials-out``."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Attach the registrar CSV as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        role = str(request.data.get('defaultRole', 'STUDENT')).upper()
+        if role not in User.Role.values:
+            return Response({'error': f'Invalid role. Choose from: {", ".join(User.Role.values)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dryRun', '')).lower() in ('1', 'true', 'yes')
+
+        max_rows = getattr(settings, 'PROVISION_API_MAX_ROWS', 25)
+        try:
+            rows = count_rows(upload.file)
+        except (csv.Error, UnicodeDecodeError) as exc:
+            return Response({'error': f'Could not read CSV: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        if rows > max_rows:
+            return Response(
+                {'error': f'{rows} rows is more than this endpoint takes ({max_rows}). '
+                          f'Run "python manage.py provision_users <file> --credentials-out <file>" on the server instead.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        try:
+            summary = provision_users(upload.file, workers=1, default_role=role, dry_run=dry_run,
+                                      generate_passwords=False)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'error': f'Could not read CSV: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        summary.pop('credentials')  # always empty here; never echo passwords
+
+        if not dry_run and summary['created']:
+            log_action(AuditLog.USER_CREATED, user=request.user, request=request,
+                       details=f"Provisioned {summary['created']} users from {upload.name}",
+                       changes={'created': summary['created'], 'skipped': len(summary['skipped'])})
+        return Response(summary, status=status.HTTP_201_CREATED if summary['created'] and not dry_run else status.HTTP_200_OK)
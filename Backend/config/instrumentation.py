@@ -0,0 +1,172 @@
+"""
+Per-request timing: saan napupunta yung oras ng bawat request.
+
+``InstrumentationMiddleware`` (first in MIDDLEWARE) measures, for every
+request:
+
+- total time through the middleware stack;
+- DB query count and time, via an execute wrapper added once to every
+  database connection (``connection_created``) — it only counts while a
+  request is being timed;
+- auth snapshot cache hits/misses (the only cache we read per request —
+  ``apps/authentication/backends.py`` reports them through ``count_cache``);
+- render time, i.e. DRF turning ``response.data`` into JSON bytes.
+
+With ``SERVER_TIMING`` on it reports that twice: a ``Server-Timing`` header
+(shows up in the browser's DevTools Network → Timing tab) and one logfmt
+line on the ``config.instrumentation`` logger. With ``METRICS_ENABLED`` on
+the same numbers feed the Prometheus registry (config/metrics.py), and with
+``SLOW_QUERY_MS`` > 0 statements over that threshold go to the slow query
+log (config/slow_queries.py). With ``NPLUSONE_THRESHOLD`` > 0 repeated
+statement shapes are reported by the N+1 detector (config/nplusone.py).
+
+When all of these are off the middleware removes itself at startup
+(``MiddlewareNotUsed``), so there is no per-request cost at all.
+``manage.py benchmark_server_timing`` measures the overhead when it's on.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import nplusone, slow_queries
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timing', default=None)
+_slow_query_ms = float('inf')  # set from SLOW_QUERY_MS when the middleware loads
+_nplusone_threshold = 0  # NPLUSONE_THRESHOLD; 0 = detector off
+
+
+class RequestTiming:
+    __slots__ = ('request', 'started', 'db_queries', 'db_ms', 'cache_hits', 'cache_misses',
+                 'render_ms', 'slow_queries', 'query_shapes', 'nplusone')
+
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_ms = 0.0
+        self.slow_queries = []
+        self.query_shapes = {}  # SQL text → times run (N+1 detector only)
+        self.nplusone = {}
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def current():
+    """The ``RequestTiming`` of the request being handled, or None."""
+    return _current.get()
+
+
+def count_cache(hit):
+    timing = _current.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timing.db_queries += 1
+        timing.db_ms += elapsed_ms
+        if elapsed_ms >= _slow_query_ms:
+            slow_queries.capture(timing, sql, params, many, elapsed_ms, context['connection'].alias)
+    if _nplusone_threshold:
+        nplusone.count(timing, sql, _nplusone_threshold)  # may raise NPlusOneError
+    return result
+
+
+def _install_db_wrapper(sender=None, connection=None, **kwargs):
+    # execute_wrappers lives on the per-thread DatabaseWrapper, which survives
+    # reconnects — kaya check muna para hindi madoble
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+class InstrumentationMiddleware:
+    """Place FIRST in MIDDLEWARE para kasama lahat ng ibang middleware sa total."""
+
+    def __init__(self, get_response):
+        from django.conf import settings
+        global _slow_query_ms, _nplusone_threshold
+
+        self.server_timing = getattr(settings, 'SERVER_TIMING', False)
+        self.metrics = getattr(settings, 'METRICS_ENABLED', False)
+        slow_ms = getattr(settings, 'SLOW_QUERY_MS', 0)
+        _nplusone_threshold = max(getattr(settings, 'NPLUSONE_THRESHOLD', 0), 0)
+        if not (self.server_timing or self.metrics or slow_ms > 0 or _nplusone_threshold):
+            raise MiddlewareNotUsed
+        _slow_query_ms = slow_ms if slow_ms > 0 else float('inf')
+        self.get_response = get_response
+        connection_created.connect(_install_db_wrapper, dispatch_uid='server_timing_db_wrapper')
+        for conn in connections.all(initialized_only=True):
+            _install_db_wrapper(connection=conn)
+
+    def __call__(self, request):
+        timing = RequestTiming(request)
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        if timing.slow_queries:
+            # after the request, para hindi na kasama sa timing (and outside its transaction)
+            slow_queries.save(timing.slow_queries)
+        if timing.nplusone:
+            nplusone.report(timing)
+
+        if self.metrics:
+            from . import metrics
+            metrics.observe_request(request, response, timing)
+        if self.server_timing:
+            self._report(request, response, timing)
+        return response
+
+    @staticmethod
+    def _report(request, response, timing):
+        total_ms = timing.total_ms
+        response['Server-Timing'] = (
+            f'total;dur={total_ms:.1f}, '
+            f'db;dur={timing.db_ms:.1f};desc="{timing.db_queries} queries", '
+            f'cache;desc="{timing.cache_hits} hit {timing.cache_misses} miss", '
+            f'render;dur={timing.render_ms:.1f}'
+        )
+        logger.info(
+            'request method=%s path=%s status=%s total_ms=%.1f db_queries=%d db_ms=%.1f '
+            'cache_hits=%d cache_misses=%d render_ms=%.1f',
+            request.method, request.path, response.status_code, total_ms, timing.db_queries,
+            timing.db_ms, timing.cache_hits, timing.cache_misses, timing.render_ms,
+        )
+
+    def process_template_response(self, request, response):
+        # Runs last among template-response hooks, right before Django calls
+        # response.render() — DRF's JSON encoding happens in that render
+        timing = _current.get()
+        if timing is not None:
+            started = time.perf_counter()
+
+            def _rendered(rendered):
+                timing.render_ms += (time.perf_counter() - started) * 1000
+
+            response.add_post_render_callback(_rendered)
+        return response
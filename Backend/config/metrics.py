@@ -0,0 +1,288 @@
+"""
+Prometheus metrics na pinagsasama-sama across gunicorn workers.
+
+Each worker keeps its numbers in memory (a dict update per event, no I/O)
+and every ``METRICS_FLUSH_INTERVAL`` seconds writes a snapshot to its own
+JSON file in ``METRICS_DIR`` (write-then-rename, kaya walang half-written
+file). ``GET /metrics`` flushes the serving worker, reads every file and
+sums them into the Prometheus text format — walang Redis, walang
+prometheus_client, and it works whichever worker the scrape lands on.
+
+What gets recorded:
+
+- ``plmun_http_request_duration_seconds`` — histogram per route, named after
+  the DRF view and action (``ItemViewSet.list``, ``RequestViewSet.approve``);
+  fed by the instrumentation middleware (config/instrumentation.py)
+- ``plmun_db_queries_total`` per route, ``plmun_auth_cache_lookups_total``
+- ``plmun_notifications_created_total``, ``plmun_overdue_scans_total``,
+  ``plmun_audit_writes_total`` — incremented where those things happen
+- gauges: audit writer queue depth (live workers only), plus pending
+  requests and waiting waitlist entries, counted at scrape time
+
+Counters from workers that have exited stay in the sum (they're counters);
+their files are removed once they're a day old. Access: admins, or requests
+from localhost (for a Prometheus agent on the same box).
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STALE_AFTER = 24 * 3600  # seconds; dead workers' files older than this are removed
+
+# name → (type, help)
+METRICS = {
+    'plmun_http_request_duration_seconds': ('histogram', 'Request latency by route.'),
+    'plmun_db_queries_total': ('counter', 'SQL statements run while handling requests, by route.'),
+    'plmun_auth_cache_lookups_total': ('counter', 'Auth user snapshot cache lookups, by result.'),
+    'plmun_notifications_created_total': ('counter', 'Notifications created, by type.'),
+    'plmun_overdue_scans_total': ('counter', 'Overdue scans run.'),
+    'plmun_overdue_notifications_total': ('counter', 'Borrower overdue notifications sent by scans.'),
+    'plmun_audit_writes_total': ('counter', 'Audit log rows written to the database.'),
+    'plmun_audit_queue_depth': ('gauge', 'Audit log entries waiting for the writer thread.'),
+    'plmun_pending_requests': ('gauge', 'Borrow requests waiting for staff approval.'),
+    'plmun_waitlist_depth': ('gauge', 'Waitlist entries still waiting for stock.'),
+}
+
+
+class Registry:
+    """This worker's numbers. Keys are ``(name, labels)`` with labels as a sorted tuple."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # key → [bucket counts..., +Inf count, sum]
+        self.next_flush = 0.0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            hist[bisect.bisect_left(BUCKETS, value)] += 1
+            hist[-1] += value
+
+    def snapshot(self):
+        from apps.authentication import audit
+
+        with self.lock:
+            return {
+                'pid': self.pid,
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, hist] for (name, labels), hist in self.histograms.items()],
+                'gauges': [['plmun_audit_queue_depth', [], audit.queue_depth()]],
+            }
+
+    def flush(self):
+        directory = _metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'worker-{self.pid}-{int(self.started)}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp, path)
+        self.next_flush = time.monotonic() + getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+
+_registry = Registry()
+_registry_lock = threading.Lock()
+
+
+def registry():
+    """This process's registry — a fresh one after fork (gunicorn forks workers)."""
+    global _registry
+    if _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry.pid != os.getpid():
+                _registry = Registry()
+    return _registry
+
+
+def _metrics_dir():
+    return settings.METRICS_DIR
+
+
+def enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+def inc(name, value=1, **labels):
+    if value:
+        registry().inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    registry().observe(name, value, **labels)
+
+
+def route_name(request):
+    """``ItemViewSet.list`` / ``ProfileView.get`` style label for a handled request."""
+    explicit = getattr(request, 'metrics_route', None)
+    if explicit:
+        return explicit
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    cls = getattr(match.func, 'cls', None)  # set by DRF's as_view()
+    if cls is None:
+        return match.view_name or getattr(match.func, '__name__', 'view')
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None)  # ViewSets: {'get': 'list', ...}
+    action = actions.get(method, method) if actions else method
+    return f'{cls.__name__}.{action}'
+
+
+def observe_request(request, response, timing):
+    """Called by the instrumentation middleware at the end of each request."""
+    reg = registry()
+    route = route_name(request)
+    reg.observe('plmun_http_request_duration_seconds', timing.total_ms / 1000,
+                route=route, method=request.method, status=f'{response.status_code // 100}xx')
+    reg.inc('plmun_db_queries_total', timing.db_queries, route=route)
+    if timing.cache_hits:
+        reg.inc('plmun_auth_cache_lookups_total', timing.cache_hits, result='hit')
+    if timing.cache_misses:
+        reg.inc('plmun_auth_cache_lookups_total', timing.cache_misses, result='miss')
+    if time.monotonic() >= reg.next_flush:
+        reg.flush()
+
+
+# --- collection (scrape side) ---
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots():
+    directory = _metrics_dir()
+    snapshots = []
+    now = time.time()
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        data['alive'] = _pid_alive(data['pid'])
+        if not data['alive']:
+            # another scrape may be removing the same file, or a worker replacing it
+            try:
+                if now - os.path.getmtime(path) > STALE_AFTER:
+                    os.remove(path)
+                    continue
+            except OSError:
+                pass
+        snapshots.append(data)
+    return snapshots
+
+
+def _db_gauges():
+    from apps.requests.models import Request, WaitlistEntry
+
+    return {
+        'plmun_pending_requests': Request.objects.filter(status='PENDING').count(),
+        'plmun_waitlist_depth': WaitlistEntry.objects.filter(status='WAITING').count(),
+    }
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def render():
+    """Every worker's numbers, summed, in Prometheus text format 0.0.4."""
+    registry().flush()
+    counters, histograms, gauges = {}, {}, {}
+    for snap in _read_snapshots():
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, hist in snap['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(hist))
+            for i, value in enumerate(hist):
+                total[i] += value
+        if snap['alive']:
+            for name, labels, value in snap['gauges']:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+    for name, value in _db_gauges().items():
+        gauges[(name, ())] = value
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for (metric, labels), hist in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), hist[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {hist[-1]:.6f}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        else:
+            source = counters if kind == 'counter' else gauges
+            for (metric, labels), value in sorted(source.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """``GET /metrics`` — admins (JWT) or localhost only."""
+    if request.META.get('REMOTE_ADDR') not in ('127.0.0.1', '::1') and not _is_admin(request):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _is_admin(request):
+    from rest_framework.exceptions import APIException
+    from apps.authentication.backends import CachedJWTAuthentication
+
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return bool(result) and result[0].has_min_role('ADMIN')
+
+
+@atexit.register
+def _flush_on_exit():
+    # only workers that actually served requests have anything to keep
+    reg = _registry
+    if reg.pid == os.getpid() and reg.next_flush and enabled():
+        try:
+            reg.flush()
+        except OSError:
+            pass
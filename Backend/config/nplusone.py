@@ -0,0 +1,106 @@
+"""
+N+1 query detector para sa dev at staging.
+
+Lahat ng N+1 fixes natin so far (``in_bulk`` sa comments, ``select_related``
+sa check_overdue, the ``Prefetch`` in ``RequestViewSet.get_queryset``) were
+found by hand. Dito, the instrumentation middleware's DB wrapper
+(config/instrumentation.py) counts every SELECT per request by its SQL text.
+Django already writes parameters as placeholders, so "same text" means "same
+statement shape with different ids" — the N+1 signature. When one shape
+runs more than ``NPLUSONE_THRESHOLD`` times in a request, the detector
+records who did it:
+
+- the view (``RequestViewSet.list``) and path;
+- the DRF serializer field being rendered at that moment
+  (``RequestSerializer.comments``), found by walking the stack;
+- the innermost frame in our own code.
+
+With ``NPLUSONE_RAISE`` it raises ``NPlusOneError`` right there, para
+lumabas sa 500 traceback; otherwise it logs one warning per shape on the
+``config.nplusone`` logger when the request ends, with the final count.
+Defaults: threshold 10 when DEBUG, off (0) otherwise.
+"""
+
+import logging
+import os
+import sys
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(Exception):
+    """A statement shape ran more than NPLUSONE_THRESHOLD times in one request."""
+
+
+def _serializer_field(frame):
+    """Innermost ``Serializer.to_representation`` frame → ``'RequestSerializer.comments'``."""
+    from rest_framework.serializers import Serializer
+
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation':
+            owner = frame.f_locals.get('self')
+            field = frame.f_locals.get('field')
+            if isinstance(owner, Serializer) and field is not None:
+                return f'{type(owner).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return ''
+
+
+def _project_frame(frame):
+    # apps/ only; middleware __call__ frames are on every stack, kaya skip din
+    base = str(settings.BASE_DIR)
+    apps_dir = os.path.join(base, 'apps') + os.sep
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(apps_dir) and frame.f_code.co_name != '__call__':
+            return f'{os.path.relpath(filename, base)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ''
+
+
+def count(timing, sql, threshold):
+    """Called from the DB wrapper after each statement of a timed request."""
+    raising = getattr(settings, 'NPLUSONE_RAISE', False)
+    if (raising and timing.nplusone) or sql.lstrip()[:6].upper() != 'SELECT':
+        return  # one error per request; the 500 page's own queries don't count
+    seen = timing.query_shapes
+    n = seen.get(sql, 0) + 1
+    seen[sql] = n
+    if n != threshold + 1:
+        return
+
+    from .metrics import route_name
+
+    frame = sys._getframe(2)  # skip this function and the DB wrapper
+    culprit = {
+        'route': route_name(timing.request),
+        'field': _serializer_field(frame),
+        'location': _project_frame(frame),
+    }
+    timing.nplusone[sql] = culprit
+    if raising:
+        raise NPlusOneError(_message(timing, sql, n, culprit))
+
+
+def _message(timing, sql, n, culprit):
+    from .slow_queries import normalize
+
+    parts = [
+        f'N+1: {normalize(sql)[:300]!r} ran {n} times',
+        f'in {culprit["route"]} ({timing.request.method} {timing.request.path})',
+    ]
+    if culprit['field']:
+        parts.append(f'while rendering {culprit["field"]}')
+    if culprit['location']:
+        parts.append(f'from {culprit["location"]}')
+    return ' '.join(parts)
+
+
+def report(timing):
+    """Log the shapes that crossed the threshold, with their final counts."""
+    if getattr(settings, 'NPLUSONE_RAISE', False):
+        return  # already raised
+    for sql, culprit in timing.nplusone.items():
+        logger.warning(_message(timing, sql, timing.query_shapes[sql], culprit))
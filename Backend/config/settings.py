@@ -6,6 +6,7 @@ na-reference sa official docs: https://docs.djangoproject.com/en/6.0/ref/setting
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -47,7 +48,6 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'drf_spectacular',
-    'django_ratelimit',
 
     # Local apps
     'apps.authentication',
@@ -58,7 +58,11 @@ INSTALLED_APPS = [
 
 # ===== Middleware =====
 MIDDLEWARE = [
+    # per-request timing → Server-Timing, /metrics, slow query log, N+1 detector (see the settings below)
+    'config.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # status fast path + write blocking during maintenance; before sessions/auth on purpose
+    'apps.authentication.maintenance.MaintenanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'config.middleware.CSPMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -70,6 +74,43 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request timing (config/instrumentation.py) — off by default, i-on lang
+# kapag nag-iimbestiga ng mabagal na endpoint
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'False') == 'True'
+
+# Prometheus /metrics (config/metrics.py). Each gunicorn worker writes its
+# numbers to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds; /metrics sums them.
+# Off by default like SERVER_TIMING — when on, InstrumentationMiddleware runs on every request
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'plmun-metrics'))
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+
+# Slow query log (config/slow_queries.py): statements >= SLOW_QUERY_MS during a
+# request are saved with their EXPLAIN plan; 0 = off (default, like SERVER_TIMING).
+# Newest SLOW_QUERY_KEEP lang. Parameter values are only stored with
+# SLOW_QUERY_PARAMS=True (password/token/email/secret columns still redacted)
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', '0'))
+SLOW_QUERY_KEEP = int(os.environ.get('SLOW_QUERY_KEEP', '1000'))
+SLOW_QUERY_PARAMS = os.environ.get('SLOW_QUERY_PARAMS', 'False') == 'True'
+
+# N+1 detector (config/nplusone.py): warn when the same SELECT runs more than
+# NPLUSONE_THRESHOLD times in one request; NPLUSONE_RAISE=True para mag-500 instead.
+# On by default lang sa DEBUG — set it on staging too
+NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', '10' if DEBUG else '0'))
+NPLUSONE_RAISE = os.environ.get('NPLUSONE_RAISE', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'config.nplusone': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'config.urls'
 
 # ===== Templates =====
@@ -116,7 +157,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ===== REST Framework =====
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + cached user snapshot (see apps/authentication/backends.py)
+        'apps.authentication.backends.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -136,6 +178,30 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# POST /api/users/provision/ hashes passwords inside the request (~0.4s each),
+# kaya small files lang; enrollment-sized CSVs go through manage.py provision_users
+PROVISION_API_MAX_ROWS = int(os.environ.get('PROVISION_API_MAX_ROWS', '25'))
+
+# Gaano katagal naka-cache yung user snapshot (id/role/is_active/is_flagged)
+# per access token user. Role/status changes invalidate it right away; without
+# Redis the other workers notice within SYSTEM_SETTINGS_POLL_MS (settings_store
+# revision, see apps/authentication/backends.py).
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', '30'))
+
+
+# ===== Audit Log Writer =====
+# Off by default: audit entries are security records, kaya one INSERT per
+# action, committed with the request. Buffered (True) = log_action() queues
+# entries and a background thread bulk-inserts them every N entries or T ms
+# (apps/authentication/audit.py) — faster, but a killed worker loses its queue.
+AUDIT_LOG_BUFFERED = os.environ.get('AUDIT_LOG_BUFFERED', 'False') == 'True'
+AUDIT_LOG_FLUSH_EVERY = int(os.environ.get('AUDIT_LOG_FLUSH_EVERY', '50'))
+AUDIT_LOG_FLUSH_INTERVAL_MS = int(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL_MS', '500'))
+
+# SystemSetting store (maintenance, clear code): each worker re-checks the
+# shared revision row at most this often; reads in between are in-memory.
+SYSTEM_SETTINGS_POLL_MS = int(os.environ.get('SYSTEM_SETTINGS_POLL_MS', '1000'))
+
 
 # ===== CORS Settings =====
 # whitelist lang - lagay ng production URLs sa CORS_ORIGINS env var (comma-separated)
@@ -187,7 +253,7 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Cache (required by django-ratelimit)
+# Cache (auth user snapshots; rate limit counters too when REDIS_URL is set)
 # gamitin Redis sa production (set REDIS_URL env var), LocMemCache for dev lang
 _redis_url = os.environ.get('REDIS_URL')
 if _redis_url:
@@ -204,10 +270,17 @@ else:
             'LOCATION': 'plmun-ratelimit',
         }
     }
-RATELIMIT_USE_CACHE = 'default'
-
-# LocMemCache works fine for development; silence the ratelimit warnings
-SILENCED_SYSTEM_CHECKS = ['django_ratelimit.W001', 'django_ratelimit.E003']
+# Rate limit counters (apps/ratelimit.py). Walang Redis → one SQLite file per
+# machine, shared by all workers; keep it on local disk, not a network mount
+RATELIMIT_DB_PATH = os.environ.get(
+    'RATELIMIT_DB_PATH', os.path.join(tempfile.gettempdir(), 'plmun-ratelimit.sqlite3')
+)
+# Proxies in front of the app that append to X-Forwarded-For (Render: 1).
+# 0 → rate limit by REMOTE_ADDR; never set it higher than the real hop count,
+# or clients can pick their own bucket by sending the header
+RATELIMIT_TRUSTED_PROXIES = int(os.environ.get(
+    'RATELIMIT_TRUSTED_PROXIES', '1' if 'RENDER' in os.environ else '0'
+))
 
 
 # ===== XSS Defense-in-Depth Headers =====
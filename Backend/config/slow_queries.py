@@ -0,0 +1,184 @@
+"""
+Slow query log: which SQL made a request slow, saan galing, and its plan.
+
+The instrumentation middleware's DB wrapper (config/instrumentation.py)
+times every statement run while handling a request. Anything at or over
+``SLOW_QUERY_MS`` (0 = off, the default) is captured with the route
+(``ItemViewSet.list``) and path and the innermost frames of the call stack.
+Parameters are only stored with ``SLOW_QUERY_PARAMS = True``, and even then
+a statement that writes or filters on a password/token/secret/email column
+(or writes system_settings, e.g. the clear code) gets all of its parameters
+redacted — placeholders are positional, kaya the whole set goes.
+
+Nothing extra touches the database while the request is running. After
+the response is built, the middleware calls ``save()``, which:
+
+- runs ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite) for each captured
+  statement inside a savepoint, so a failed EXPLAIN can't break anything;
+- inserts them into ``SlowQuery`` (one ``bulk_create``), a table shared by
+  all workers and trimmed to the newest ``SLOW_QUERY_KEEP`` rows.
+
+``normalize()`` turns a statement into its grouping key — literals and
+placeholders become ``?`` and IN-lists collapse — kaya the admin endpoint
+(GET /api/auth/slow-queries/) can group repeats of the same query.
+Statements outside HTTP requests (management commands, the audit writer
+thread) are not recorded.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import traceback
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 8
+PARAM_MAX_LEN = 200
+SQL_MAX_LEN = 10000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+_EXPLAINABLE = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_SENSITIVE = r'"\w*(?:password|token|jti|secret|email|otp)\w*"'
+# writes naming a sensitive column (or the settings table), and reads comparing one to a parameter
+_SENSITIVE_WRITE = re.compile(
+    rf'^\s*(?:INSERT|UPDATE)\b.*(?:{_SENSITIVE}|"system_settings")', re.IGNORECASE | re.DOTALL,
+)
+_SENSITIVE_FILTER = re.compile(
+    rf'{_SENSITIVE}(?:::\w+)?\)?\s*(?:=|<|>|!=|IN\b|LIKE\b|ILIKE\b|GLOB\b)', re.IGNORECASE,
+)
+
+
+def normalize(sql):
+    """``... WHERE "id" IN (%s, %s, %s) LIMIT 21`` → ``... WHERE "id" IN (...) LIMIT ?``."""
+    statement = _STRING.sub('?', sql).replace('%s', '?')
+    statement = _NUMBER.sub('?', statement)
+    statement = _IN_LIST.sub('(...)', statement)
+    return _SPACE.sub(' ', statement).strip()
+
+
+def fingerprint(statement):
+    return hashlib.sha1(statement.encode()).hexdigest()
+
+
+def _param(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return str(value)[:PARAM_MAX_LEN]
+
+
+def _safe_params(sql, params, many):
+    if many:
+        return [f'<{len(params)} parameter sets>']
+    if not params or not getattr(settings, 'SLOW_QUERY_PARAMS', False):
+        return []
+    values = list(params.values()) if isinstance(params, dict) else list(params)
+    if _SENSITIVE_WRITE.match(sql) or _SENSITIVE_FILTER.search(sql):
+        return ['<redacted>'] * len(values)  # hashes, refresh tokens, emails stay out of the log
+    return [_param(value) for value in values]
+
+
+def _stack():
+    """Innermost frames, ORM internals skipped. Library frames stay — kadalasan
+    DRF yung tumatawag (nested serializers), and it says which field did it."""
+    base = str(settings.BASE_DIR)
+    own = (os.path.join(base, 'config', 'instrumentation.py'), os.path.join(base, 'config', 'slow_queries.py'))
+    frames = []
+    for frame in traceback.extract_stack():
+        filename = frame.filename
+        if 'site-packages' in filename:
+            filename = filename.split('site-packages' + os.sep, 1)[1]
+            if filename.startswith(os.path.join('django', 'db')):
+                continue
+        elif filename.startswith(base) and filename not in own:
+            filename = os.path.relpath(filename, base)
+        else:
+            continue  # stdlib, or this module
+        frames.append(f'{filename}:{frame.lineno} in {frame.name}')
+    return frames[-STACK_DEPTH:]
+
+
+def capture(timing, sql, params, many, duration_ms, alias):
+    """Called from the DB wrapper for a slow statement; keeps it on the request's timing."""
+    from .metrics import route_name
+
+    request = timing.request
+    timing.slow_queries.append({
+        'sql': sql,
+        'raw_params': params,
+        'params': _safe_params(sql, params, many),
+        'many': many,
+        'alias': alias,
+        'duration_ms': duration_ms,
+        'route': route_name(request),
+        'path': request.path[:255],
+        'stack': _stack(),
+    })
+
+
+def _explain(record):
+    from django.db import connections, transaction
+
+    if record['many'] or not _EXPLAINABLE.match(record['sql']):
+        return ''
+    conn = connections[record['alias']]
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with transaction.atomic(using=record['alias']):
+            with conn.cursor() as cursor:
+                cursor.execute(prefix + record['sql'], record['raw_params'])
+                rows = cursor.fetchall()
+    except Exception as exc:
+        return f'EXPLAIN failed: {exc}'
+    if conn.vendor == 'sqlite':
+        # (id, parent, notused, detail) — indent by depth in the plan tree
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' | '.join(str(col) for col in row) for row in rows)
+
+
+def _trim():
+    from apps.authentication.models import SlowQuery
+
+    keep = max(getattr(settings, 'SLOW_QUERY_KEEP', 1000), 1)
+    cutoff = list(SlowQuery.objects.order_by('-id').values_list('id', flat=True)[keep:keep + 1])
+    if cutoff:
+        SlowQuery.objects.filter(id__lte=cutoff[0]).delete()
+
+
+def save(records):
+    """EXPLAIN and store the slow statements of one finished request."""
+    from django.utils import timezone
+    from apps.authentication.models import SlowQuery
+
+    now = timezone.now()
+    try:
+        rows = []
+        for record in records:
+            statement = normalize(record['sql'])
+            rows.append(SlowQuery(
+                fingerprint=fingerprint(statement),
+                statement=statement[:SQL_MAX_LEN],
+                sql=record['sql'][:SQL_MAX_LEN],
+                params=record['params'],
+                duration_ms=round(record['duration_ms'], 2),
+                route=record['route'][:150],
+                path=record['path'],
+                stack=record['stack'],
+                plan=_explain(record),
+                captured_at=now,
+            ))
+        SlowQuery.objects.bulk_create(rows)
+        _trim()
+    except Exception:
+        # diagnostics lang 'to; never fail the request over it
+        logger.exception('Could not save %d slow queries', len(records))
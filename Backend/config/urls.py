@@ -6,6 +6,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from apps.authentication.views import SessionHeartbeatView
+from config.metrics import metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -20,6 +22,7 @@ urlpatterns = [
     path('api/inventory/', include('apps.inventory.urls')),
     path('api/requests/', include('apps.requests.urls')),
     path('api/users/', include('apps.users.urls')),
+    path('api/session/heartbeat/', SessionHeartbeatView.as_view(), name='session_heartbeat'),
 
     # API docs (Swagger / Redoc)
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -27,5 +30,9 @@ urlpatterns = [
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 
+# Prometheus scrape target (admins or localhost only, see config/metrics.py)
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect } from 'react';
 import { NavLink, useNavigate, useLocation } from 'react-router-dom';
 import {
     LayoutDashboard,
@@ -15,7 +15,7 @@ import {
 import useAuthStore from '../../store/authStore';
 import plmunLogo from '../../assets/images/logo.png';
 import { ROLES, hasMinRole } from '../../utils/roles';
-import { requestService } from '../../services';
+import useSessionStore from '../../store/sessionStore';
 
 // navigation groups depende sa role ng user
 const getNavGroups = (userRole) => {
@@ -56,32 +56,14 @@ const Sidebar = ({ collapsed, setCollapsed, mobileOpen, setMobileOpen }) => {
     const navigate = useNavigate();
     const location = useLocation();
     const { user, logout } = useAuthStore();
-    const [pendingCount, setPendingCount] = useState(0);
+    // pending count para sa badge ng Requests link — galing sa session heartbeat
+    // (server scopes it: staff = all, others = own)
+    const pendingCount = useSessionStore((s) => s.heartbeat?.pendingRequests ?? 0);
 
     useEffect(() => {
         setMobileOpen?.(false);
     }, [location.pathname, setMobileOpen]);
 
-    // pending count para sa badge ng Requests link
-    // TODO: ang daming api call nito every minute, gawing shared state na lang
-    const fetchPendingCount = useCallback(async () => {
-        try {
-            const data = await requestService.getAll();
-            const items = Array.isArray(data) ? data : data.results || [];
-            const isStaffPlus = hasMinRole(user?.role, ROLES.STAFF);
-            const pending = items.filter(r =>
-                r.status === 'PENDING' && (isStaffPlus || r.requestedById === user?.id)
-            ).length;
-            setPendingCount(pending);
-        } catch { /* non-critical */ }
-    }, [user?.role, user?.id]);
-
-    useEffect(() => {
-        fetchPendingCount();
-        const interval = setInterval(fetchPendingCount, 60000);
-        return () => clearInterval(interval);
-    }, [fetchPendingCount]);
-
     const handleLogout = () => {
         logout();
         navigate('/login');
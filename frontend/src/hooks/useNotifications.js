@@ -1,15 +1,16 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
 import notificationService from '../services/notificationService';
-
-// dropped from 10s to 5s — users were complaining notifs felt "late"
-const POLL_INTERVAL = 5000;
+import useSessionStore from '../store/sessionStore';
 
 const useNotifications = () => {
     const [notifications, setNotifications] = useState([]);
     const [unreadCount, setUnreadCount] = useState(0);
     const [loading, setLoading] = useState(false);
-    const intervalRef = useRef(null);
     const hasFetchedOnce = useRef(false);
+    // dati 5s interval na full list fetch; ngayon refetch lang pag nagbago
+    // yung notifications.version sa session heartbeat
+    const version = useSessionStore((s) => s.heartbeat?.notifications?.version);
+    const seenVersion = useRef(null);
 
     const fetchNotifications = useCallback(async () => {
         try {
@@ -94,27 +95,14 @@ const useNotifications = () => {
         }
     }, []);
 
-    // poll only when logged in
+    // first heartbeat → full load; after that, only when the version moves
     useEffect(() => {
-        const hasToken = () => {
-            try {
-                const stored = localStorage.getItem('auth-storage');
-                const parsed = stored ? JSON.parse(stored) : null;
-                return Boolean(parsed?.state?.token);
-            } catch { return false; }
-        };
-
-        if (!hasToken()) return;
-
-        fetchNotifications();
-        intervalRef.current = setInterval(() => {
-            if (hasToken()) pollNotifications();
-            else clearInterval(intervalRef.current);
-        }, POLL_INTERVAL);
-        return () => {
-            if (intervalRef.current) clearInterval(intervalRef.current);
-        };
-    }, [fetchNotifications, pollNotifications]);
+        if (!version || version === seenVersion.current) return;
+        const first = seenVersion.current === null;
+        seenVersion.current = version;
+        if (first) fetchNotifications();
+        else pollNotifications();
+    }, [version, fetchNotifications, pollNotifications]);
 
     return {
         notifications,
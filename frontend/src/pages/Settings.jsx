@@ -394,12 +394,13 @@ const Settings = () => {
         flashMessage('');
         try {
             const response = await api.get('/auth/backup/', { responseType: 'blob' });
-            const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/json' }));
+            // gzip-compressed JSON Lines, streamed by the backend
+            const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/gzip' }));
             const link = document.createElement('a');
             const now = new Date();
             const ts = now.toISOString().replace(/[:.]/g, '-').slice(0, 19);
             link.href = url;
-            link.setAttribute('download', `plmun_nexus_backup_${ts}.json`);
+            link.setAttribute('download', `plmun_nexus_backup_${ts}.jsonl.gz`);
             document.body.appendChild(link);
             link.click();
             link.remove();
@@ -6,7 +6,7 @@ import { Dashboard, Inventory, Requests, Reports, Login, Register, Settings, Use
 import { NotificationDropdown, AnimatedBackground } from '../components/ui';
 import { useIsMobile } from '../hooks';
 import useAuthStore from '../store/authStore';
-import api from '../services/api';
+import useSessionStore from '../store/sessionStore';
 import { RoleGuard } from '../components/auth';
 import { ROLES, hasMinRole } from '../utils/roles';
 
@@ -36,14 +36,24 @@ const DashboardLayout = () => {
         setFlagDismissed(false);
     }, [location.pathname]);
 
-    // poll the backend every 30s to pick up flag/active changes
-    // runs immediately on mount so flagging doesn't wait for the first tick
+    // one heartbeat poll (see store/sessionStore.js) instead of separate
+    // profile / maintenance / notification / pending-count intervals
+    const heartbeat = useSessionStore((s) => s.heartbeat);
+    const userId = user?.id;
     useEffect(() => {
-        if (!user) return;
-        refreshProfile(); // check right away
-        const id = setInterval(refreshProfile, 30_000);
-        return () => clearInterval(id);
-    }, [user, refreshProfile]);
+        if (!userId) return;
+        refreshProfile(); // full profile once on mount
+        useSessionStore.getState().start();
+        return () => useSessionStore.getState().stop();
+    }, [userId, refreshProfile]);
+
+    // flag/active changed server-side → reload the full profile
+    // (refreshProfile handles the deactivated redirect)
+    const hbUser = heartbeat?.user;
+    useEffect(() => {
+        if (!hbUser || !user) return;
+        if (hbUser.isFlagged !== user.isFlagged || hbUser.isActive === false) refreshProfile();
+    }, [hbUser, user, refreshProfile]);
 
     // ── Maintenance mode check (server-side) ──
     const [maintenanceActive, setMaintenanceActive] = useState(false);
@@ -54,26 +64,19 @@ const DashboardLayout = () => {
     const userRole = user?.role || 'STUDENT';
     const isBlocked = maintenanceActive && !hasMinRole(userRole, 'STAFF');
 
+    // maintenance state comes with the heartbeat; no heartbeat yet = keep current state
+    const hbMaintenance = heartbeat?.maintenance;
     useEffect(() => {
-        const check = async () => {
-            try {
-                const res = await api.get('/auth/maintenance/');
-                const { enabled, endTime } = res.data;
-                if (enabled && endTime > Date.now()) {
-                    setMaintenanceActive(true);
-                    setMaintenanceEnd(endTime);
-                } else {
-                    setMaintenanceActive(false);
-                    setMaintenanceEnd(0);
-                }
-            } catch {
-                // API unreachable — keep current state
-            }
-        };
-        check();
-        const interval = setInterval(check, 10_000); // poll every 10s
-        return () => clearInterval(interval);
-    }, []);
+        if (!hbMaintenance) return;
+        const { enabled, endTime } = hbMaintenance;
+        if (enabled && endTime > Date.now()) {
+            setMaintenanceActive(true);
+            setMaintenanceEnd(endTime);
+        } else {
+            setMaintenanceActive(false);
+            setMaintenanceEnd(0);
+        }
+    }, [hbMaintenance]);
 
     // Live countdown
     useEffect(() => {
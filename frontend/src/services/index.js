@@ -4,3 +4,4 @@ export { default as inventoryService } from './inventoryService';
 export { default as requestService } from './requestService';
 export { default as userService } from './userService';
 export { default as notificationService } from './notificationService';
+export { default as sessionService } from './sessionService';
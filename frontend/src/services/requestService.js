@@ -49,6 +49,14 @@ const requestService = {
         return response.data;
     },
 
+    // pending approval queue — ?limit=0 returns just the counts (cheap badge poll)
+    getQueue: async ({ limit = 20, cursor } = {}) => {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.append('cursor', cursor);
+        const response = await api.get(`/requests/queue/?${params.toString()}`);
+        return response.data;
+    },
+
     getStats: async () => {
         const response = await api.get('/requests/stats/');
         return response.data;
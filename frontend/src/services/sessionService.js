@@ -0,0 +1,12 @@
+import api from './api';
+
+const sessionService = {
+    // flag/active state, maintenance, unread count + version, pending count — one call.
+    // Browser cache sends If-None-Match for us; unchanged = 304 (same etag back).
+    heartbeat: async () => {
+        const response = await api.get('/session/heartbeat/');
+        return { data: response.data, etag: response.headers?.etag ?? null };
+    },
+};
+
+export default sessionService;
@@ -1,2 +1,3 @@
 export { default as useAuthStore } from './authStore';
 export { default as useUIStore } from './uiStore';
+export { default as useSessionStore } from './sessionStore';
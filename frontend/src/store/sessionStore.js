@@ -0,0 +1,67 @@
+import { create } from 'zustand';
+import sessionService from '../services/sessionService';
+
+/**
+ * Session heartbeat — replaces the separate profile (30s), maintenance (10s),
+ * notification (5s) and pending-count (60s) polls with one request.
+ * One loop per tab, started by DashboardLayout. The server suggests the next
+ * interval (faster during maintenance, slower when the tab is hidden).
+ */
+
+const DEFAULT_NEXT_MS = 10_000;
+const DEFAULT_HIDDEN_MS = 60_000;
+
+let running = false;
+let loopId = 0;
+let timer = null;
+
+const onVisible = () => {
+    // balik sa tab → check agad instead of waiting out the hidden interval
+    if (!document.hidden && running) useSessionStore.getState().refresh();
+};
+
+const useSessionStore = create((set, get) => ({
+    heartbeat: null,
+    etag: null,
+
+    _tick: async (id) => {
+        try {
+            const { data, etag } = await sessionService.heartbeat();
+            // same etag = walang nagbago, skip setState para walang re-render
+            if (!etag || etag !== get().etag) set({ heartbeat: data, etag });
+        } catch {
+            // network blip — next tick will retry
+        }
+        if (!running || id !== loopId) return;
+        const poll = get().heartbeat?.poll || {};
+        const delay = document.hidden
+            ? (poll.hiddenMs ?? DEFAULT_HIDDEN_MS)
+            : (poll.nextMs ?? DEFAULT_NEXT_MS);
+        clearTimeout(timer);
+        timer = setTimeout(() => get()._tick(id), delay);
+    },
+
+    start: () => {
+        if (running) return;
+        running = true;
+        document.addEventListener('visibilitychange', onVisible);
+        get()._tick(++loopId);
+    },
+
+    // poll now (e.g. after the tab becomes visible again)
+    refresh: () => {
+        if (!running) return;
+        clearTimeout(timer);
+        get()._tick(++loopId);
+    },
+
+    stop: () => {
+        running = false;
+        loopId += 1;
+        clearTimeout(timer);
+        document.removeEventListener('visibilitychange', onVisible);
+        set({ heartbeat: null, etag: null });
+    },
+}));
+
+export default useSessionStore;